@@ -0,0 +1,723 @@
+# -*- coding: utf-8 -*-
+
+import os
+import uuid
+import asyncio
+import copy
+import mimetypes
+
+try:
+    import httpx
+except ImportError:  # pragma: no cover
+    httpx = None
+
+from . import utils
+from . import feedreader
+from . import jsoncodec
+from . import exceptions as exp
+from .client import DEFAULT_BASE_URL, _id_to_path, _attachment_added
+from .resource import Resource
+
+
+class _SessionLogin(object):
+    """
+    Pending session login shared by a resource and its children, so that
+    concurrent first requests wait for a single ``_session`` request.
+    """
+
+    def __init__(self, credentials, url):
+        self.credentials = credentials
+        self.url = url
+        self.lock = None
+
+
+class AsyncResource(object):
+    """
+    Asyncio counterpart of :py:class:`~pycouchdb.resource.Resource`
+    built on top of ``httpx.AsyncClient``.
+
+    Session authentication can not be done from the constructor, so it
+    is performed lazily before the first request is sent.
+    """
+
+    def __init__(self, base_url, full_commit=True, client=None,
+                 credentials=None, authmethod="session", verify=False,
+                 max_connections=100, codec=None):
+
+        if httpx is None:
+            raise RuntimeError("httpx is required for the asyncio client, "
+                               "install it with `pip install pycouchdb[async]`")
+
+        self.base_url = base_url
+        self.codec = jsoncodec.get_codec(codec)
+        self._login = None
+
+        if not client:
+            headers = {"accept": "application/json",
+                       "content-type": "application/json"}
+            if not full_commit:
+                headers['X-Couch-Full-Commit'] = 'false'
+
+            limits = httpx.Limits(max_connections=max_connections,
+                                  max_keepalive_connections=max_connections)
+            self.client = httpx.AsyncClient(headers=headers, verify=verify,
+                                            limits=limits, timeout=None)
+            self._setup_authentication(credentials, authmethod)
+        else:
+            self.client = client
+
+    def _setup_authentication(self, credentials, method):
+        if not credentials:
+            return
+
+        if method == "session":
+            self._login = _SessionLogin(
+                credentials, utils.urljoin(self.base_url, "_session"))
+        elif method == "basic":
+            self.client.auth = credentials
+        else:
+            raise RuntimeError("Invalid authentication method")
+
+    async def _authenticate(self):
+        login = self._login
+        if login.lock is None:
+            # Created on first use to be bound to the running event loop.
+            login.lock = asyncio.Lock()
+
+        async with login.lock:
+            credentials = login.credentials
+            if credentials is None:
+                # Logged in by a concurrent request.
+                return
+
+            data = {"name": credentials[0], "password": credentials[1]}
+            data = self.codec.dumps(data)
+
+            r = await self.client.post(login.url, content=data)
+            if r.status_code != 200:
+                raise exp.AuthenticationFailed()
+            login.credentials = None
+
+    def __call__(self, *path):
+        base_url = utils.urljoin(self.base_url, *path)
+        resource = self.__class__(base_url, client=self.client,
+                                  codec=self.codec)
+        resource._login = self._login
+        return resource
+
+    _check_result = Resource._check_result
+
+    async def request(self, method, path, params=None, data=None,
+                      headers=None, stream=False, **kwargs):
+
+        if self._login is not None and self._login.credentials is not None:
+            await self._authenticate()
+
+        if headers is None:
+            headers = {}
+
+        headers.setdefault('Accept', 'application/json')
+
+        if path:
+            if not isinstance(path, (list, tuple)):
+                path = [path]
+            url = utils.urljoin(self.base_url, *path)
+        else:
+            url = self.base_url
+
+        request = self.client.build_request(method, url, content=data,
+                                            params=params, headers=headers,
+                                            **kwargs)
+        response = await self.client.send(request, stream=stream)
+
+        # Ignore result validation if
+        # request is with stream mode
+        if stream and response.status_code < 400:
+            return response, None
+
+        if stream:
+            await response.aread()
+            await response.aclose()
+
+        result = utils.as_json(response, self.codec)
+
+        if result is None:
+            return response, result
+
+        if isinstance(result, list):
+            for res in result:
+                self._check_result(response, res)
+        else:
+            self._check_result(response, result)
+
+        return response, result
+
+    async def get(self, path=None, **kwargs):
+        return await self.request("GET", path, **kwargs)
+
+    async def put(self, path=None, **kwargs):
+        return await self.request("PUT", path, **kwargs)
+
+    async def post(self, path=None, **kwargs):
+        return await self.request("POST", path, **kwargs)
+
+    async def delete(self, path=None, **kwargs):
+        return await self.request("DELETE", path, **kwargs)
+
+    async def head(self, path=None, **kwargs):
+        return await self.request("HEAD", path, **kwargs)
+
+    async def aclose(self):
+        await self.client.aclose()
+
+
+async def _listen_feed(object, node, feed_reader, **kwargs):
+    if not callable(feed_reader):
+        raise exp.UnexpectedError("feed_reader must be callable or class")
+
+    if isinstance(feed_reader, feedreader.BaseFeedReader):
+        reader = feed_reader(object)
+    else:
+        reader = feedreader.SimpleFeedReader()(object, feed_reader)
+
+    # Possible options: "continuous", "longpoll"
+    kwargs.setdefault("feed", "continuous")
+    data = object.codec.dumps(kwargs.pop('data', {}))
+
+    (resp, result) = await object.resource(node).post(
+        params=kwargs, data=data, stream=True)
+    try:
+        async for line in resp.aiter_lines():
+            # ignore heartbeats
+            if not line:
+                reader.on_heartbeat()
+            else:
+                reader.on_message(object.codec.loads(line))
+    except exp.FeedReaderExited:
+        reader.on_close()
+    finally:
+        await resp.aclose()
+
+
+class _AsyncStreamResponse(object):
+    """
+    Proxy object for httpx stream response.
+    """
+
+    def __init__(self, response):
+        self._response = response
+
+    def aiter_content(self, chunk_size=None):
+        return self._response.aiter_bytes(chunk_size=chunk_size)
+
+    def aiter_lines(self):
+        return self._response.aiter_lines()
+
+    async def aclose(self):
+        await self._response.aclose()
+
+    @property
+    def url(self):
+        return str(self._response.url)
+
+
+class AsyncServer(object):
+    """
+    Asyncio version of :py:class:`~pycouchdb.client.Server`.
+
+    Every method that talks to couchdb is a coroutine. Requires the
+    optional ``httpx`` dependency.
+
+    :param max_connections: maximum number of simultaneous connections
+                            kept by the underlying http client.
+    :param codec: json codec, see :py:class:`~pycouchdb.client.Server`.
+
+    .. versionadded: 1.17
+    """
+
+    def __init__(self, base_url=DEFAULT_BASE_URL, full_commit=True,
+                 authmethod="basic", verify=False, max_connections=100,
+                 codec=None):
+
+        self.base_url, credentials = utils.extract_credentials(base_url)
+        self.codec = jsoncodec.get_codec(codec)
+        self.resource = AsyncResource(self.base_url, full_commit,
+                                      credentials=credentials,
+                                      authmethod=authmethod,
+                                      verify=verify,
+                                      max_connections=max_connections,
+                                      codec=self.codec)
+
+    def __repr__(self):
+        return '<CouchDB AsyncServer "{}">'.format(self.base_url)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
+
+    async def aclose(self):
+        """
+        Close all connections of the underlying http client.
+        """
+        await self.resource.aclose()
+
+    async def exists(self, name):
+        """
+        Check if a database exists.
+        """
+        try:
+            await self.resource.head(name)
+        except exp.NotFound:
+            return False
+        else:
+            return True
+
+    async def all_dbs(self):
+        """
+        Get the list of all database names.
+        """
+        (r, result) = await self.resource.get('_all_dbs')
+        return result
+
+    async def info(self):
+        """
+        Get server info.
+
+        :returns: dict with all data that couchdb returns.
+        :rtype: dict
+        """
+        (r, result) = await self.resource.get()
+        return result
+
+    async def version(self):
+        """
+        Get the current version of a couchdb server.
+        """
+        result = await self.info()
+        return result["version"]
+
+    async def delete(self, name):
+        """
+        Delete some database.
+
+        :param name: database name
+        :raises: :py:exc:`~pycouchdb.exceptions.NotFound`
+            if a database does not exists
+        """
+        await self.resource.delete(name)
+
+    async def database(self, name):
+        """
+        Get a database instance.
+
+        :param name: database name
+        :raises: :py:exc:`~pycouchdb.exceptions.NotFound`
+            if a database does not exists
+
+        :returns: a :py:class:`~pycouchdb.aio.AsyncDatabase` instance
+        """
+        (r, result) = await self.resource.head(name)
+        if r.status_code == 404:
+            raise exp.NotFound("Database '{0}' does not exists".format(name))
+
+        return AsyncDatabase(self.resource(name), name, codec=self.codec)
+
+    async def create(self, name):
+        """
+        Create a database.
+
+        :param name: database name
+        :raises: :py:exc:`~pycouchdb.exceptions.Conflict`
+            if a database already exists
+        :returns: a :py:class:`~pycouchdb.aio.AsyncDatabase` instance
+        """
+        (resp, result) = await self.resource.put(name)
+        if resp.status_code in (200, 201):
+            return await self.database(name)
+
+    async def replicate(self, source, target, **kwargs):
+        """
+        Replicate the source database to the target one.
+
+        :param source: full URL to the source database
+        :param target: full URL to the target database
+        """
+        data = {'source': source, 'target': target}
+        data.update(kwargs)
+
+        data = self.codec.dumps(data)
+
+        (resp, result) = await self.resource.post('_replicate', data=data)
+        return result
+
+    async def changes_feed(self, feed_reader, **kwargs):
+        """
+        Subscribe to changes feed of the whole CouchDB server.
+
+        :param feed_reader: callable or :py:class:`~BaseFeedReader`
+                            instance
+        """
+        await _listen_feed(self, "_db_updates", feed_reader, **kwargs)
+
+
+class AsyncDatabase(object):
+    """
+    Asyncio version of :py:class:`~pycouchdb.client.Database`.
+
+    View methods (:py:meth:`all`, :py:meth:`query`) return a list of
+    rows instead of a lazy generator.
+    """
+
+    def __init__(self, resource, name, codec=None):
+        self.resource = resource
+        self.name = name
+        self.codec = jsoncodec.get_codec(codec)
+
+    def __repr__(self):
+        return '<CouchDB AsyncDatabase "{}">'.format(self.name)
+
+    async def exists(self, doc_id):
+        """
+        Check if a document exists.
+        """
+        try:
+            (resp, result) = await self.resource.head(_id_to_path(doc_id))
+            return resp.status_code < 206
+        except exp.NotFound:
+            return False
+
+    async def config(self):
+        """
+        Get database status data such as document count, update sequence etc.
+        :return: dict
+        """
+        (resp, result) = await self.resource.get()
+        return result
+
+    async def length(self):
+        """
+        Get the number of documents in the database.
+        """
+        result = await self.config()
+        return result['doc_count']
+
+    async def delete(self, doc_or_id):
+        """
+        Delete document by id.
+
+        :param doc_or_id: document or id
+        :raises: :py:exc:`~pycouchdb.exceptions.NotFound` if a document
+                 not exists
+        :raises: :py:exc:`~pycouchdb.exceptions.Conflict` if delete with
+                 wrong revision.
+        """
+        if isinstance(doc_or_id, dict):
+            if "_id" not in doc_or_id:
+                raise ValueError("Invalid document, missing _id attr")
+            _id = doc_or_id['_id']
+        else:
+            _id = doc_or_id
+
+        resource = self.resource(*_id_to_path(_id))
+
+        (r, result) = await resource.head()
+        (r, result) = await resource.delete(
+            params={"rev": r.headers["etag"].strip('"')})
+
+    async def delete_bulk(self, docs, transaction=True):
+        """
+        Delete a bulk of documents.
+
+        :param docs: list of docs
+        :raises: :py:exc:`~pycouchdb.exceptions.Conflict` if a delete
+                 is not success
+        :returns: raw results from server
+        """
+        _docs = [dict(doc) for doc in docs]
+        for doc in _docs:
+            if "_deleted" not in doc:
+                doc["_deleted"] = True
+
+        data = self.codec.dumps({"docs": _docs})
+        params = {"all_or_nothing": "true" if transaction else "false"}
+        (resp, results) = await self.resource.post(
+            "_bulk_docs", data=data, params=params)
+
+        for result, doc in zip(results, _docs):
+            if "error" in result:
+                raise exp.Conflict("one or more docs are not saved")
+
+        return results
+
+    async def get(self, doc_id, **kwargs):
+        """
+        Get a document by id.
+
+        :param doc_id: document id
+        :raises: :py:exc:`~pycouchdb.exceptions.NotFound` if a document
+                 not exists
+
+        :returns: document (dict)
+        """
+        (resp, result) = await self.resource(*_id_to_path(doc_id)).get(
+            params=kwargs)
+        return result
+
+    async def save(self, doc, batch=False):
+        """
+        Save or update a document.
+
+        :param doc: document
+        :param batch: allow batch=ok inserts (default False)
+        :raises: :py:exc:`~pycouchdb.exceptions.Conflict` if save with wrong
+                 revision.
+        :returns: doc
+        """
+        _doc = copy.copy(doc)
+        if "_id" not in _doc:
+            _doc['_id'] = uuid.uuid4().hex
+
+        if batch:
+            params = {'batch': 'ok'}
+        else:
+            params = {}
+
+        data = self.codec.dumps(_doc)
+        (resp, result) = await self.resource(_doc['_id']).put(
+            data=data, params=params)
+
+        if resp.status_code == 409:
+            raise exp.Conflict(result['reason'])
+
+        if "rev" in result and result["rev"] is not None:
+            _doc["_rev"] = result["rev"]
+
+        return _doc
+
+    async def save_bulk(self, docs, try_setting_ids=True, transaction=True):
+        """
+        Save a bulk of documents.
+
+        :param docs: list of docs
+        :param try_setting_ids: if ``True``, we loop through docs and
+                                generate/set an id in each doc if none exists
+        :param transaction: if ``True``, couchdb do a insert in transaction
+                            model.
+        :returns: docs
+        """
+        _docs = [dict(doc) for doc in docs]
+
+        if try_setting_ids:
+            for doc in _docs:
+                if "_id" not in doc:
+                    doc["_id"] = uuid.uuid4().hex
+
+        data = self.codec.dumps({"docs": _docs})
+        params = {"all_or_nothing": "true" if transaction else "false"}
+
+        (resp, results) = await self.resource.post("_bulk_docs", data=data,
+                                                   params=params)
+
+        for result, doc in zip(results, _docs):
+            if "rev" in result:
+                doc['_rev'] = result['rev']
+
+        return _docs
+
+    async def all(self, wrapper=None, flat=None, **kwargs):
+        """
+        Execute a builtin view for get all documents.
+
+        :param wrapper: wrap result into a specific class.
+        :param flat: get a specific field from a object instead
+            of a complete object.
+
+        :returns: list of rows
+        """
+        params = {"include_docs": "true"}
+        params.update(kwargs)
+
+        data = None
+
+        if "keys" in params:
+            data = {"keys": params.pop("keys")}
+            data = self.codec.dumps(data)
+
+        params = utils.encode_view_options(params, self.codec)
+        return await self._query(self.resource("_all_docs"), wrapper=wrapper,
+                                 flat=flat, params=params, data=data)
+
+    async def _query(self, resource, data=None, params=None, headers=None,
+                     flat=None, wrapper=None):
+
+        if data is None:
+            (resp, result) = await resource.get(params=params,
+                                                headers=headers)
+        else:
+            (resp, result) = await resource.post(
+                data=data, params=params, headers=headers)
+
+        if wrapper is None:
+            wrapper = lambda row: row
+
+        if flat is not None:
+            wrapper = lambda row: row[flat]
+
+        return [wrapper(row) for row in result["rows"]]
+
+    async def query(self, name, wrapper=None, flat=None, **kwargs):
+        """
+        Execute a design document view query.
+
+        :param name: name of the view (eg: docidname/viewname).
+        :param wrapper: wrap result into a specific class.
+        :param flat: get a specific field from a object instead
+            of a complete object.
+
+        :returns: list of rows
+        """
+        params = copy.copy(kwargs)
+        path = utils._path_from_name(name, '_view')
+        data = None
+
+        if "keys" in params:
+            data = {"keys": params.pop('keys')}
+
+        if data:
+            data = self.codec.dumps(data)
+
+        params = utils.encode_view_options(params, self.codec)
+        return await self._query(self.resource(*path), wrapper=wrapper,
+                                 flat=flat, params=params, data=data)
+
+    async def one(self, name, flat=None, wrapper=None, **kwargs):
+        """
+        Execute a design document view query and returns a first
+        result.
+
+        :returns: object or None
+        """
+        params = {"limit": 1}
+        params.update(kwargs)
+
+        result = await self.query(name, flat=flat, wrapper=wrapper, **params)
+        return result[0] if len(result) > 0 else None
+
+    async def delete_attachment(self, doc, filename):
+        """
+        Delete attachment by filename from document.
+
+        :param doc: document dict
+        :param filename: name of attachment.
+        :raises: :py:exc:`~pycouchdb.exceptions.Conflict`
+            if save with wrong revision.
+        :returns: doc
+        """
+        _doc = copy.deepcopy(doc)
+        resource = self.resource(_doc['_id'])
+
+        (resp, result) = await resource.delete(filename,
+                                               params={'rev': _doc['_rev']})
+        if resp.status_code == 404:
+            raise exp.NotFound("filename {0} not found".format(filename))
+
+        if resp.status_code > 205:
+            raise exp.Conflict(result['reason'])
+
+        _doc['_rev'] = result['rev']
+        try:
+            del _doc['_attachments'][filename]
+
+            if not _doc['_attachments']:
+                del _doc['_attachments']
+        except KeyError:
+            pass
+
+        return _doc
+
+    async def get_attachment(self, doc, filename, stream=False, **kwargs):
+        """
+        Get attachment by filename from document.
+
+        :param doc: document dict
+        :param filename: attachment file name.
+        :param stream: setup streaming output (default: False). The
+                       returned stream response must be closed with
+                       ``aclose()``.
+
+        :returns: binary data or stream response
+        """
+        params = {"rev": doc["_rev"]}
+        params.update(kwargs)
+
+        r, result = await self.resource(doc['_id']).get(
+            filename, stream=stream, params=params)
+        if stream:
+            return _AsyncStreamResponse(r)
+
+        return r.content
+
+    async def put_attachment(self, doc, content, filename=None,
+                             content_type=None, refetch=True):
+        """
+        Put a attachment to a document.
+
+        :param doc: document dict.
+        :param content: the content to upload, either bytes or an async
+            iterable of bytes
+        :param filename: the name of the attachment file; if omitted, this
+                         function tries to get the filename from the
+                         file-like object passed as the `content` argument
+        :param refetch: if ``False``, build the returned document from the
+                        upload response instead of downloading it again.
+        :raises: :py:exc:`~pycouchdb.exceptions.Conflict`
+            if save with wrong revision.
+        :raises: ValueError
+        :returns: doc
+        """
+        if filename is None:
+            if hasattr(content, 'name'):
+                filename = os.path.basename(content.name)
+            else:
+                raise ValueError('no filename specified for attachment')
+
+        if hasattr(content, 'read'):
+            content = content.read()
+
+        if content_type is None:
+            content_type = ';'.join(
+                filter(None, mimetypes.guess_type(filename)))
+
+        headers = {"Content-Type": content_type}
+        resource = self.resource(doc['_id'])
+
+        (resp, result) = await resource.put(
+            filename, data=content, params={'rev': doc['_rev']},
+            headers=headers)
+
+        if resp.status_code < 206:
+            if refetch:
+                return await self.get(doc["_id"])
+            length = len(content) if isinstance(content, bytes) else None
+            return _attachment_added(doc, filename, content_type,
+                                     result["rev"], length)
+
+        raise exp.Conflict(result['reason'])
+
+    async def changes_feed(self, feed_reader, **kwargs):
+        """
+        Subscribe to changes feed of couchdb database.
+
+        :param feed_reader: callable or :py:class:`~BaseFeedReader`
+                            instance
+        """
+        await _listen_feed(self, "_changes", feed_reader, **kwargs)
+
+    async def changes_list(self, **kwargs):
+        """
+        Obtain a list of changes from couchdb.
+        """
+        (resp, result) = await self.resource("_changes").get(params=kwargs)
+        return result['last_seq'], result['results']
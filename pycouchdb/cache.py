@@ -0,0 +1,392 @@
+# -*- coding: utf-8 -*-
+
+import time
+import sqlite3
+import threading
+import collections
+from collections import OrderedDict
+
+
+class RevisionCache(object):
+    """
+    Bounded, thread safe, least recently used mapping of document id to
+    its last known revision.
+
+    A :py:class:`~pycouchdb.client.Database` with a revision cache keeps
+    it up to date from the documents it saves, fetches and deletes, and
+    from the changes feed, and uses it to skip the ``HEAD`` request that
+    would otherwise be needed to delete a document by id.
+
+    :param max_size: maximum number of ids to remember.
+
+    .. versionadded: 1.17
+    """
+
+    def __init__(self, max_size=10000):
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self._revs = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._revs)
+
+    def get(self, doc_id):
+        """
+        Return the cached revision of a document or ``None``.
+        """
+        with self._lock:
+            rev = self._revs.get(doc_id)
+            if rev is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+                self._revs.move_to_end(doc_id)
+            return rev
+
+    def set(self, doc_id, rev):
+        with self._lock:
+            self._revs[doc_id] = rev
+            self._revs.move_to_end(doc_id)
+            while len(self._revs) > self.max_size:
+                self._revs.popitem(last=False)
+
+    def invalidate(self, doc_id):
+        with self._lock:
+            self._revs.pop(doc_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._revs.clear()
+
+    def update_from_change(self, change):
+        """
+        Update the cache from a changes feed message.
+        """
+        if "id" not in change:
+            return
+        if change.get("deleted") or not change.get("changes"):
+            self.invalidate(change["id"])
+        else:
+            self.set(change["id"], change["changes"][0]["rev"])
+
+    def stats(self):
+        """
+        Return ``hits``, ``misses`` and current ``size`` of the cache.
+        """
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses,
+                    "size": len(self._revs), "max_size": self.max_size}
+
+
+CacheEntry = collections.namedtuple("CacheEntry", "etag data stored_at")
+
+
+class MemoryBackend(object):
+    """
+    In process storage of :py:class:`ResponseCache` entries, evicted in
+    least recently used order.
+
+    Backends store :py:class:`CacheEntry` tuples by string key and are
+    responsible for their own locking. Any object with the same methods
+    can be used as a backend.
+
+    .. versionadded: 1.17
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._size = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def size(self):
+        """
+        Total size in bytes of the stored bodies.
+        """
+        return self._size
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key, entry, max_bytes):
+        """
+        Store `entry`, then evict the least recently used entries until
+        the stored bodies fit in `max_bytes`.
+        """
+        with self._lock:
+            self._pop(key)
+            self._entries[key] = entry
+            self._size += len(entry.data)
+            while self._size > max_bytes:
+                self._pop(next(iter(self._entries)))
+
+    def touch(self, key, stored_at):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries[key] = entry._replace(stored_at=stored_at)
+
+    def _pop(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._size -= len(entry.data)
+
+    def delete(self, key):
+        with self._lock:
+            self._pop(key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+
+class SQLiteBackend(object):
+    """
+    Persistent storage of :py:class:`ResponseCache` entries in a SQLite
+    database, so a new process can revalidate what a previous one
+    downloaded instead of downloading it again. The database can be
+    shared by several processes.
+
+    :param path: path of the SQLite database file.
+    :param table: name of the table holding the entries.
+
+    .. versionadded: 1.17
+    """
+
+    def __init__(self, path, table="pycouchdb_cache"):
+        assert table.isidentifier(), "table should be a valid identifier"
+        self.path = path
+        self.table = table
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=30,
+                                     check_same_thread=False,
+                                     isolation_level=None)
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS {0} ("
+                "key TEXT PRIMARY KEY, etag TEXT NOT NULL, "
+                "data BLOB NOT NULL, size INTEGER NOT NULL, "
+                "stored_at REAL NOT NULL, used_at REAL NOT NULL)"
+                .format(table))
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS {0}_used_at ON {0} (used_at)"
+                .format(table))
+
+    def _execute(self, sql, *args):
+        with self._lock:
+            return self._conn.execute(sql.format(self.table), args).fetchall()
+
+    def __len__(self):
+        return self._execute("SELECT COUNT(*) FROM {0}")[0][0]
+
+    def __contains__(self, key):
+        return bool(self._execute("SELECT 1 FROM {0} WHERE key = ?", key))
+
+    def size(self):
+        return self._execute("SELECT COALESCE(SUM(size), 0) FROM {0}")[0][0]
+
+    def get(self, key):
+        rows = self._execute(
+            "SELECT etag, data, stored_at FROM {0} WHERE key = ?", key)
+        if not rows:
+            return None
+        self._execute("UPDATE {0} SET used_at = ? WHERE key = ?",
+                      time.time(), key)
+        etag, data, stored_at = rows[0]
+        return CacheEntry(etag, bytes(data), stored_at)
+
+    def set(self, key, entry, max_bytes):
+        data = bytes(entry.data)
+        with self._lock:
+            with self._conn:
+                self._conn.execute("BEGIN IMMEDIATE")
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO {0} VALUES (?, ?, ?, ?, ?, ?)"
+                    .format(self.table),
+                    (key, entry.etag, data, len(data), entry.stored_at,
+                     time.time()))
+                self._evict(max_bytes)
+
+    def _evict(self, max_bytes):
+        total = self._conn.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM {0}"
+            .format(self.table)).fetchone()[0]
+        if total <= max_bytes:
+            return
+
+        evicted = []
+        rows = self._conn.execute(
+            "SELECT key, size FROM {0} ORDER BY used_at"
+            .format(self.table)).fetchall()
+        for key, size in rows:
+            if total <= max_bytes:
+                break
+            evicted.append((key,))
+            total -= size
+        self._conn.executemany(
+            "DELETE FROM {0} WHERE key = ?".format(self.table), evicted)
+
+    def touch(self, key, stored_at):
+        self._execute("UPDATE {0} SET stored_at = ?, used_at = ? "
+                      "WHERE key = ?", stored_at, time.time(), key)
+
+    def delete(self, key):
+        self._execute("DELETE FROM {0} WHERE key = ?", key)
+
+    def clear(self):
+        self._execute("DELETE FROM {0}")
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class ResponseCache(object):
+    """
+    Bounded, thread safe, least recently used cache of encoded response
+    bodies and the token that validates them, usually an ``ETag``.
+
+    Entries younger than `ttl` can be used without contacting the server;
+    older ones are revalidated by the caller, e.g. with a conditional
+    ``If-None-Match`` request. Bodies are kept encoded, so every read
+    decodes a fresh copy that callers are free to modify.
+
+    :param max_bytes: maximum total size of the cached bodies.
+    :param ttl: seconds an entry is served without revalidation, ``None``
+                to always revalidate.
+    :param backend: storage of the entries, a :py:class:`MemoryBackend`
+                    by default or a :py:class:`SQLiteBackend` to keep
+                    them across processes.
+
+    .. versionadded: 1.17
+    """
+
+    def __init__(self, max_bytes=64 * 1024 * 1024, ttl=None, backend=None):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.backend = MemoryBackend() if backend is None else backend
+        self._lock = threading.Lock()
+        self.lookups = 0
+        self.hits = 0
+        self.revalidated = 0
+
+    def __len__(self):
+        return len(self.backend)
+
+    def __contains__(self, key):
+        return key in self.backend
+
+    def get(self, key):
+        """
+        Return the :py:class:`CacheEntry` stored for `key` or ``None``.
+        """
+        with self._lock:
+            self.lookups += 1
+        return self.backend.get(key)
+
+    def is_fresh(self, entry):
+        """
+        Tell if `entry` can be used without revalidation. Fresh entries
+        count as hits.
+        """
+        fresh = (self.ttl is not None and
+                 time.time() - entry.stored_at < self.ttl)
+        if fresh:
+            self.record_hit()
+        return fresh
+
+    def record_hit(self):
+        """
+        Record an entry used without downloading it again.
+        """
+        with self._lock:
+            self.hits += 1
+
+    def set(self, key, etag, data):
+        if len(data) > self.max_bytes:
+            self.backend.delete(key)
+            return
+        self.backend.set(key, CacheEntry(etag, data, time.time()),
+                         self.max_bytes)
+
+    def touch(self, key):
+        """
+        Record a successful revalidation of `key`, restarting its ttl.
+        """
+        with self._lock:
+            self.revalidated += 1
+        self.backend.touch(key, time.time())
+
+    def invalidate(self, key):
+        self.backend.delete(key)
+
+    def clear(self):
+        self.backend.clear()
+
+    def stats(self):
+        """
+        Return ``hits`` served locally, ``revalidated`` entries confirmed
+        by a ``304`` answer, ``misses`` that downloaded the body again,
+        the ``hit_rate`` of lookups that did not download anything, and
+        the current ``size`` and ``bytes`` of the cache.
+        """
+        with self._lock:
+            misses = self.lookups - self.hits - self.revalidated
+            hit_rate = 0.0
+            if self.lookups:
+                hit_rate = (self.hits + self.revalidated) / self.lookups
+            stats = {"hits": self.hits, "revalidated": self.revalidated,
+                     "misses": misses, "hit_rate": hit_rate}
+        stats.update(size=len(self.backend), bytes=self.backend.size(),
+                     max_bytes=self.max_bytes)
+        return stats
+
+
+class DocumentCache(ResponseCache):
+    """
+    Document cache used by :py:meth:`~pycouchdb.client.Database.get`.
+
+    Documents younger than `ttl` are served without contacting the
+    server, older ones are revalidated with ``If-None-Match``: a
+    ``304 Not Modified`` answer has no body and reuses the cached one.
+
+    .. versionadded: 1.17
+    """
+
+
+class ViewCache(ResponseCache):
+    """
+    View result cache used by :py:meth:`~pycouchdb.client.Database.query`.
+
+    Results are keyed by view path, query parameters and ``keys`` body,
+    and validated either with the view ``ETag`` (``validate="etag"``,
+    a conditional request that the server answers with an empty ``304``
+    if the index did not change) or with the database ``update_seq``
+    (``validate="update_seq"``, a database info request, then no view
+    request at all while the database is unchanged).
+
+    :param validate: ``"etag"`` or ``"update_seq"``.
+
+    .. versionadded: 1.17
+    """
+
+    def __init__(self, max_bytes=64 * 1024 * 1024, ttl=None, backend=None,
+                 validate="etag"):
+        assert validate in ("etag", "update_seq"), \
+            "validate should be 'etag' or 'update_seq'"
+        super(ViewCache, self).__init__(max_bytes=max_bytes, ttl=ttl,
+                                        backend=backend)
+        self.validate = validate
@@ -1,18 +1,38 @@
 # -*- coding: utf-8 -*-
 
+import io
 import os
+import mmap
+import stat
 import json
+import time
 import uuid
 import copy
+import queue
+import hashlib
 import mimetypes
 import warnings
+import threading
+import collections
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlencode
+
+import requests
 
 from . import utils
 from . import feedreader
+from . import jsoncodec
+from . import mango
+from .cache import RevisionCache, DocumentCache, ViewCache
 from . import exceptions as exp
 from .resource import Resource
 
 DEFAULT_BASE_URL = os.environ.get('COUCHDB_URL', 'http://localhost:5984/')
+DEFAULT_CHUNK_SIZE = 64 * 1024
+DEFAULT_BULK_CHUNK_BYTES = 8 * 1024 * 1024
+DEFAULT_BULK_GET_CHUNK_SIZE = 500
+DEFAULT_PARTITION_BATCH_SIZE = 1000
+DEFAULT_FIND_PAGE_SIZE = 1000
 
 
 def _id_to_path(_id):
@@ -32,7 +52,7 @@ def _listen_feed(object, node, feed_reader, **kwargs):
 
     # Possible options: "continuous", "longpoll"
     kwargs.setdefault("feed", "continuous")
-    data = utils.force_bytes(json.dumps(kwargs.pop('data', {})))
+    data = object.codec.dumps(kwargs.pop('data', {}))
 
     (resp, result) = object.resource(node).post(
         params=kwargs, data=data, stream=True)
@@ -42,11 +62,219 @@ def _listen_feed(object, node, feed_reader, **kwargs):
             if not line:
                 reader.on_heartbeat()
             else:
-                reader.on_message(json.loads(utils.force_text(line)))
+                message = object.codec.loads(line)
+                reader.on_message(message)
+                rev_cache = getattr(object, "rev_cache", None)
+                if rev_cache is not None:
+                    rev_cache.update_from_change(message)
     except exp.FeedReaderExited:
         reader.on_close()
 
 
+def _attachment_added(doc, filename, content_type, rev, length=None):
+    """
+    Build the document that results from uploading an attachment from
+    the original document and the revision returned by the server.
+    """
+    _doc = copy.copy(doc)
+    _doc["_rev"] = rev
+
+    stub = {"content_type": content_type, "stub": True,
+            "revpos": int(rev.split("-", 1)[0])}
+    if length is not None:
+        stub["length"] = length
+
+    _doc["_attachments"] = dict(_doc.get("_attachments") or {})
+    _doc["_attachments"][filename] = stub
+    return _doc
+
+
+def _content_length(content):
+    """
+    Number of bytes that will be uploaded from `content`, or ``None`` if
+    it can not be known in advance.
+    """
+    if isinstance(content, str):
+        return len(content.encode("utf-8"))
+    if isinstance(content, (bytes, bytearray, memoryview)):
+        return memoryview(content).nbytes
+
+    if hasattr(content, "seek") and hasattr(content, "tell"):
+        try:
+            position = content.tell()
+            end = content.seek(0, os.SEEK_END)
+            content.seek(position)
+            return max(end - position, 0)
+        except (OSError, ValueError, io.UnsupportedOperation):
+            pass
+    return None
+
+
+def _is_mappable(fileobj):
+    try:
+        st = os.fstat(fileobj.fileno())
+        return stat.S_ISREG(st.st_mode) and st.st_size > fileobj.tell()
+    except (OSError, ValueError, AttributeError, io.UnsupportedOperation):
+        return False
+
+
+def _iter_view(view, start, chunk_size):
+    # Every chunk is a slice of the same buffer: nothing is copied and
+    # slices are released as soon as they are consumed, so the buffer
+    # can be closed afterwards.
+    for offset in range(start, view.nbytes, chunk_size):
+        chunk = view[offset:offset + chunk_size]
+        try:
+            yield chunk
+        finally:
+            chunk.release()
+
+
+def _iter_mmap(fileobj, chunk_size):
+    position = fileobj.tell()
+    mapped = mmap.mmap(fileobj.fileno(), 0, access=mmap.ACCESS_READ)
+    try:
+        with memoryview(mapped) as view:
+            for chunk in _iter_view(view, position, chunk_size):
+                yield chunk
+    finally:
+        mapped.close()
+
+
+def _iter_file(fileobj, chunk_size):
+    while True:
+        chunk = fileobj.read(chunk_size)
+        if not chunk:
+            break
+        if isinstance(chunk, str):
+            chunk = chunk.encode("utf-8")
+        yield chunk
+
+
+def _upload_chunks(content, chunk_size, use_mmap=True):
+    if isinstance(content, str):
+        content = content.encode("utf-8")
+    if isinstance(content, (bytes, bytearray, memoryview)):
+        return _iter_view(memoryview(content).cast("B"), 0, chunk_size)
+    if hasattr(content, "read"):
+        if use_mmap and _is_mappable(content):
+            return _iter_mmap(content, chunk_size)
+        return _iter_file(content, chunk_size)
+    return iter(content)
+
+
+class _UploadBody(object):
+    """
+    Iterable request body that reports upload progress. Without a known
+    length requests sends it with chunked transfer-encoding.
+    """
+
+    def __init__(self, chunks, length=None, progress=None):
+        self._chunks = chunks
+        self.length = length
+        self._progress = progress
+
+    def __iter__(self):
+        sent = 0
+        for chunk in self._chunks:
+            size = len(chunk)
+            yield chunk
+            sent += size
+            if self._progress is not None:
+                self._progress(sent, self.length)
+
+
+class _SizedUploadBody(_UploadBody):
+    """
+    Upload body of known length, sent with a ``Content-Length`` header.
+    """
+
+    def __len__(self):
+        return self.length
+
+
+def _iter_pages(fetch, params, next_params, prefetch=True):
+    """
+    Yield ``fetch(params)`` for successive pages. The parameters of each
+    following page are computed by ``next_params(result, params)``, which
+    returns ``None`` after the last one. With `prefetch`, the next page is
+    requested from a background thread as soon as the current one is
+    received, while the caller consumes it.
+    """
+    if not prefetch:
+        while params is not None:
+            result = fetch(params)
+            params = next_params(result, params)
+            yield result
+        return
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        future = executor.submit(fetch, params)
+        while future is not None:
+            result = future.result()
+            params = next_params(result, params)
+            future = None
+            if params is not None:
+                future = executor.submit(fetch, params)
+            yield result
+
+
+def _is_unsupported_endpoint(error):
+    """
+    Tell if an error answered to a request to an endpoint means that the
+    server does not know the endpoint, rather than a failure of the
+    request itself.
+    """
+    if isinstance(error, exp.NotFound):
+        return True
+    if isinstance(error, exp.BadRequest):
+        return "queries" in str(error)
+    if isinstance(error, exp.GenericError) and error.args:
+        result = error.args[0]
+        return (isinstance(result, dict) and
+                result.get("error") == "method_not_allowed")
+    return False
+
+
+def _range_header(start, end=None):
+    """
+    >>> _range_header(10, 19)
+    'bytes=10-19'
+    >>> _range_header(10)
+    'bytes=10-'
+    """
+    return "bytes={0}-{1}".format(start, "" if end is None else end)
+
+
+def _load_download_state(part_path, etag, size):
+    # Ranges still to download by an interrupted download_attachment, or
+    # None if they were recorded for another version of the attachment.
+    try:
+        with open(part_path + ".json") as fileobj:
+            state = json.load(fileobj)
+    except (OSError, ValueError):
+        return None
+    if state.get("etag") != etag or state.get("size") != size:
+        return None
+    return state
+
+
+def _save_download_state(part_path, state):
+    tmp_path = part_path + ".json.tmp"
+    with open(tmp_path, "w") as fileobj:
+        json.dump(state, fileobj)
+    os.replace(tmp_path, part_path + ".json")
+
+
+def _stream_rows(response, chunk_size=DEFAULT_CHUNK_SIZE, key="rows"):
+    try:
+        for row in utils.iter_json_rows(response.iter_content(chunk_size),
+                                        key=key):
+            yield row
+    finally:
+        response.close()
+
+
 class _StreamResponse(object):
     """
     Proxy object for python-requests stream response.
@@ -57,11 +285,90 @@ class _StreamResponse(object):
 
     def __init__(self, response):
         self._response = response
+        # Decoded bytes read by readinto that did not fit the buffer.
+        self._pending = None
 
-    def iter_content(self, chunk_size=1, decode_unicode=False):
+    def iter_content(self, chunk_size=DEFAULT_CHUNK_SIZE,
+                     decode_unicode=False):
+        """
+        .. versionchanged: 1.17
+            Default chunk_size is 64KiB instead of a single byte.
+        """
         return self._response.iter_content(chunk_size=chunk_size,
                                            decode_unicode=decode_unicode)
 
+    def _identity_readinto(self):
+        # Without content encoding the bytes on the wire are the content:
+        # they are read straight into the caller buffer from the underlying
+        # http.client response, urllib3 would allocate a bytes object on
+        # every read. Compressed bodies are decoded by urllib3 instead.
+        encoding = self._response.headers.get("content-encoding", "identity")
+        fp = getattr(self._response.raw, "_fp", None)
+        if encoding.lower() == "identity" and hasattr(fp, "readinto"):
+            return fp.readinto
+        return None
+
+    def readinto(self, buffer):
+        """
+        Read the next bytes of the response into a writable buffer such
+        as a ``bytearray`` or ``memoryview``. Compressed responses are
+        decoded, as with :py:meth:`iter_content`.
+
+        .. versionadded: 1.17
+
+        :returns: number of bytes read, 0 at the end of the response.
+        """
+        with memoryview(buffer) as target, target.cast("B") as view:
+            readinto = self._identity_readinto()
+            if self._pending is None and readinto is not None:
+                return readinto(view) or 0
+
+            if self._pending is None:
+                # requests leaves the decoding to the caller of raw.read.
+                data = self._response.raw.read(view.nbytes,
+                                               decode_content=True)
+                if not data:
+                    return 0
+                self._pending = memoryview(data)
+
+            size = min(self._pending.nbytes, view.nbytes)
+            view[:size] = self._pending[:size]
+            self._pending = self._pending[size:] or None
+            return size
+
+    def write_to(self, target, chunk_size=DEFAULT_CHUNK_SIZE, buffer=None):
+        """
+        Copy the remaining content to a file object or a file descriptor
+        reusing a single buffer.
+
+        .. versionadded: 1.17
+
+        :param target: object with a ``write`` method or file descriptor.
+        :param chunk_size: size of the buffer allocated when none is given.
+        :param buffer: writable buffer to read into.
+        :returns: number of bytes written.
+        """
+        if buffer is None:
+            buffer = bytearray(chunk_size)
+
+        total = 0
+        with memoryview(buffer) as view:
+            while True:
+                size = self.readinto(view)
+                if not size:
+                    break
+                if isinstance(target, int):
+                    written = 0
+                    while written < size:
+                        written += os.write(target, view[written:size])
+                else:
+                    target.write(view[:size])
+                total += size
+        return total
+
+    def close(self):
+        self._response.close()
+
     def iter_lines(self, chunk_size=512, decode_unicode=None):
         return self._response.iter_lines(chunk_size=chunk_size,
                                          decode_unicode=decode_unicode)
@@ -70,11 +377,65 @@ class _StreamResponse(object):
     def raw(self):
         return self._response.raw
 
+    @property
+    def status_code(self):
+        return self._response.status_code
+
+    @property
+    def headers(self):
+        return self._response.headers
+
     @property
     def url(self):
         return self._response.url
 
 
+class FindResult(object):
+    """
+    Lazy iterator over the documents matching a mango query, returned by
+    :py:meth:`Database.find`. Pages are requested as the iteration
+    proceeds, following the ``bookmark`` returned with each page.
+
+    .. versionadded: 1.17
+
+    :ivar bookmark: bookmark of the last page received, that can be
+        passed to :py:meth:`Database.find` to continue the query later.
+    :ivar execution_stats: statistics of the pages received so far,
+        summed over pages, if requested with ``execution_stats=True``.
+    :ivar warning: warning returned by the server, e.g. when no index
+        matches the query.
+    """
+
+    def __init__(self, pages, wrapper=None):
+        self._pages = pages
+        self._wrapper = wrapper
+        self._rows = self._iterate()
+        self.bookmark = None
+        self.execution_stats = None
+        self.warning = None
+
+    def _iterate(self):
+        for result in self._pages:
+            self.bookmark = result.get("bookmark", self.bookmark)
+            self.warning = result.get("warning", self.warning)
+            stats = result.get("execution_stats")
+            if stats is not None:
+                if self.execution_stats is None:
+                    self.execution_stats = dict(stats)
+                else:
+                    for name, value in stats.items():
+                        total = self.execution_stats.get(name, 0)
+                        self.execution_stats[name] = total + value
+            for doc in result["docs"]:
+                yield doc if self._wrapper is None else self._wrapper(doc)
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        return next(self._rows)
+
+
 class Server(object):
     """
     Class that represents a couchdb connection.
@@ -86,6 +447,22 @@ class Server(object):
     :param authmethod: specify a authentication method. By default "basic"
                        method is used but also exists "session" (that requires
                        some server configuration changes).
+    :param codec: json codec used to encode requests and decode responses.
+                  ``None`` (default) uses the standard library, ``"auto"``
+                  picks the fastest installed backend among orjson, msgspec
+                  and ujson. See :py:func:`~pycouchdb.jsoncodec.get_codec`.
+    :param pool_connections: number of per-host connection pools to cache.
+    :param pool_maxsize: maximum number of connections kept open per host;
+                         size it to the number of threads sharing the
+                         server instance.
+    :param pool_block: if ``True``, requests wait for a free connection
+                       when the pool is exhausted instead of opening
+                       connections that are discarded after use.
+    :param keep_alive: if ``False``, connections are closed after every
+                       request.
+    :param retry: a :py:class:`~pycouchdb.retry.RetryPolicy` applied to
+                  transient errors of idempotent requests, ``None`` to
+                  disable retries.
 
     .. versionchanged: 1.4
        Set basic auth method as default instead of session method.
@@ -93,20 +470,45 @@ class Server(object):
     .. versionchanged: 1.5
         Add verify parameter for setup ssl verificaton
 
+    .. versionchanged: 1.17
+        Add codec, connection pool and retry parameters.
+
     """
 
     def __init__(self, base_url=DEFAULT_BASE_URL, full_commit=True,
-                 authmethod="basic", verify=False):
+                 authmethod="basic", verify=False, codec=None,
+                 pool_connections=10, pool_maxsize=10, pool_block=False,
+                 keep_alive=True, retry=None):
 
         self.base_url, credentials = utils.extract_credentials(base_url)
+        self.codec = jsoncodec.get_codec(codec)
+        self.retry = retry
         self.resource = Resource(self.base_url, full_commit,
                                  credentials=credentials,
                                  authmethod=authmethod,
-                                 verify=verify)
+                                 verify=verify,
+                                 codec=self.codec,
+                                 pool_connections=pool_connections,
+                                 pool_maxsize=pool_maxsize,
+                                 pool_block=pool_block,
+                                 keep_alive=keep_alive,
+                                 retry=retry)
 
     def __repr__(self):
         return '<CouchDB Server "{}">'.format(self.base_url)
 
+    def pool_stats(self):
+        """
+        Get connection pool utilisation counters: requests sent,
+        requests in flight and its high-water mark, connections opened
+        and idle, and the configured pool limits.
+
+        .. versionadded: 1.17
+
+        :rtype: dict
+        """
+        return self.resource.pool_stats()
+
     def __contains__(self, name):
         try:
             self.resource.head(name)
@@ -144,10 +546,14 @@ class Server(object):
 
         self.resource.delete(name)
 
-    def database(self, name):
+    def database(self, name, **kwargs):
         """
         Get a database instance.
 
+        .. versionchanged: 1.17
+            Extra keyword arguments are passed to
+            :py:class:`~pycouchdb.client.Database`.
+
         :param name: database name
         :raises: :py:exc:`~pycouchdb.exceptions.NotFound`
             if a database does not exists
@@ -158,7 +564,8 @@ class Server(object):
         if r.status_code == 404:
             raise exp.NotFound("Database '{0}' does not exists".format(name))
 
-        db = Database(self.resource(name), name)
+        kwargs.setdefault("codec", self.codec)
+        db = Database(self.resource(name), name, **kwargs)
         return db
 
     # TODO: Config in 2.0 are applicable for nodes only
@@ -178,10 +585,14 @@ class Server(object):
     # def stats(self, name=None):
     #     pass
 
-    def create(self, name):
+    def create(self, name, **kwargs):
         """
         Create a database.
 
+        .. versionchanged: 1.17
+            Extra keyword arguments are passed to
+            :py:class:`~pycouchdb.client.Database`.
+
         :param name: database name
         :raises: :py:exc:`~pycouchdb.exceptions.Conflict`
             if a database already exists
@@ -189,7 +600,7 @@ class Server(object):
         """
         (resp, result) = self.resource.put(name)
         if resp.status_code in (200, 201):
-            return self.database(name)
+            return self.database(name, **kwargs)
 
     def replicate(self, source, target, **kwargs):
         """
@@ -204,7 +615,7 @@ class Server(object):
         data = {'source': source, 'target': target}
         data.update(kwargs)
 
-        data = utils.force_bytes(json.dumps(data))
+        data = self.codec.dumps(data)
 
         (resp, result) = self.resource.post('_replicate', data=data)
         return result
@@ -229,11 +640,45 @@ class Server(object):
 class Database(object):
     """
     Class that represents a couchdb database.
+
+    :param rev_cache: ``True`` or a :py:class:`~pycouchdb.cache.RevisionCache`
+                      to remember the last known revision of documents and
+                      delete them by id without a ``HEAD`` request.
+    :param doc_cache: ``True`` or a :py:class:`~pycouchdb.cache.DocumentCache`
+                      used by :py:meth:`get` to serve and revalidate
+                      documents by ``ETag``.
+    :param view_cache: ``True`` or a :py:class:`~pycouchdb.cache.ViewCache`
+                       used by :py:meth:`query` to reuse the results of
+                       views whose index did not change.
+
+    .. versionchanged: 1.17
+        Add codec, rev_cache, doc_cache and view_cache parameters.
     """
 
-    def __init__(self, resource, name):
+    def __init__(self, resource, name, codec=None, rev_cache=None,
+                 doc_cache=None, view_cache=None):
         self.resource = resource
         self.name = name
+        self.codec = jsoncodec.get_codec(codec)
+        if rev_cache is True:
+            rev_cache = RevisionCache()
+        elif rev_cache is False:
+            rev_cache = None
+        self.rev_cache = rev_cache
+
+        if doc_cache is True:
+            doc_cache = DocumentCache()
+        elif doc_cache is False:
+            doc_cache = None
+        self.doc_cache = doc_cache
+
+        if view_cache is True:
+            view_cache = ViewCache()
+        elif view_cache is False:
+            view_cache = None
+        self.view_cache = view_cache
+        # Support of the view "queries" endpoint, None until known.
+        self._multi_queries = None
 
     def __repr__(self):
         return '<CouchDB Database "{}">'.format(self.name)
@@ -261,6 +706,41 @@ class Database(object):
     def __len__(self):
         return self.config()['doc_count']
 
+    def _cache_rev(self, doc_id, rev):
+        if self.rev_cache is not None and None not in (doc_id, rev):
+            self.rev_cache.set(doc_id, rev)
+
+    def _invalidate_rev(self, doc_id):
+        if self.rev_cache is not None:
+            self.rev_cache.invalidate(doc_id)
+
+    def _doc_key(self, doc_id):
+        # Keys are scoped by the url of the database: caches, and their
+        # persistent backends, may be shared by databases of several
+        # servers. Encoded as a json array to keep the parts apart.
+        return json.dumps([self.resource.base_url, doc_id])
+
+    def _invalidate_doc(self, doc_id):
+        if self.doc_cache is not None:
+            self.doc_cache.invalidate(self._doc_key(doc_id))
+
+    def invalidate(self, doc_id=None):
+        """
+        Drop a document from the client side caches of this database,
+        or clear them if `doc_id` is ``None``. View results are validated
+        against the server and only dropped when clearing.
+
+        .. versionadded: 1.17
+        """
+        if doc_id is None:
+            for cache in (self.rev_cache, self.doc_cache, self.view_cache):
+                if cache is not None:
+                    cache.clear()
+            return
+
+        self._invalidate_rev(doc_id)
+        self._invalidate_doc(doc_id)
+
     def delete(self, doc_or_id):
         """
         Delete document by id.
@@ -268,6 +748,10 @@ class Database(object):
         .. versionchanged:: 1.2
             Accept document or id.
 
+        .. versionchanged:: 1.17
+            The ``_rev`` of a document, or the revision cache when
+            deleting by id, is used instead of a ``HEAD`` request.
+
         :param doc_or_id: document or id
         :raises: :py:exc:`~pycouchdb.exceptions.NotFound` if a document
                  not exists
@@ -275,19 +759,39 @@ class Database(object):
                  wrong revision.
         """
 
-        _id = None
+        _id, rev = None, None
         if isinstance(doc_or_id, dict):
             if "_id" not in doc_or_id:
                 raise ValueError("Invalid document, missing _id attr")
             _id = doc_or_id['_id']
+            rev = doc_or_id.get('_rev')
         else:
             _id = doc_or_id
 
         resource = self.resource(*_id_to_path(_id))
 
-        (r, result) = resource.head()
-        (r, result) = resource.delete(
-            params={"rev": r.headers["etag"].strip('"')})
+        cached = False
+        if rev is None and self.rev_cache is not None:
+            rev = self.rev_cache.get(_id)
+            cached = rev is not None
+
+        if rev is None:
+            (r, result) = resource.head()
+            rev = r.headers["etag"].strip('"')
+
+        self._invalidate_doc(_id)
+        try:
+            (r, result) = resource.delete(params={"rev": rev})
+        except exp.Conflict:
+            # A stale cached revision, fall back to the current one.
+            if not cached:
+                raise
+            (r, result) = resource.head()
+            (r, result) = resource.delete(
+                params={"rev": r.headers["etag"].strip('"')})
+        finally:
+            self._invalidate_rev(_id)
+            self._invalidate_doc(_id)
 
     def delete_bulk(self, docs, transaction=True):
         """
@@ -295,23 +799,28 @@ class Database(object):
 
         .. versionadded:: 1.2
 
+        .. versionchanged:: 1.17
+            The original docs are no longer modified.
+
         :param docs: list of docs
         :raises: :py:exc:`~pycouchdb.exceptions.Conflict` if a delete
                  is not success
         :returns: raw results from server
         """
 
-        _docs = copy.copy(docs)
+        _docs = [dict(doc) for doc in docs]
         for doc in _docs:
             if "_deleted" not in doc:
                 doc["_deleted"] = True
 
-        data = utils.force_bytes(json.dumps({"docs": _docs}))
+        data = self.codec.dumps({"docs": _docs})
         params = {"all_or_nothing": "true" if transaction else "false"}
         (resp, results) = self.resource.post(
             "_bulk_docs", data=data, params=params)
 
         for result, doc in zip(results, _docs):
+            self._invalidate_rev(doc.get("_id"))
+            self._invalidate_doc(doc.get("_id"))
             if "error" in result:
                 raise exp.Conflict("one or more docs are not saved")
 
@@ -326,6 +835,10 @@ class Database(object):
             instead of params argument. **params** argument is now
             deprecated and will be deleted in future versions.
 
+        .. versionchanged: 1.17
+            Served through the document cache of the database, if any,
+            when no params are given.
+
         :param doc_id: document id
         :raises: :py:exc:`~pycouchdb.exceptions.NotFound` if a document
                  not exists
@@ -342,9 +855,94 @@ class Database(object):
 
         params.update(kwargs)
 
-        (resp, result) = self.resource(*_id_to_path(doc_id)).get(params=params)
+        if self.doc_cache is not None and not params:
+            result = self._get_cached(doc_id)
+        else:
+            (resp, result) = self.resource(*_id_to_path(doc_id)).get(
+                params=params)
+
+        if "rev" not in params and isinstance(result, dict):
+            self._cache_rev(doc_id, result.get("_rev"))
+        return result
+
+    def _get_cached(self, doc_id):
+        resource = self.resource(*_id_to_path(doc_id))
+        key = self._doc_key(doc_id)
+        entry = self.doc_cache.get(key)
+        if entry is None:
+            (resp, result) = resource.get(params={})
+        elif self.doc_cache.is_fresh(entry):
+            return self.codec.loads(entry.data)
+        else:
+            (resp, result) = resource.get(
+                params={}, headers={"If-None-Match": entry.etag})
+            if resp.status_code == 304:
+                self.doc_cache.touch(key)
+                return self.codec.loads(entry.data)
+
+        etag = resp.headers.get("etag")
+        if etag:
+            self.doc_cache.set(key, etag, resp.content)
         return result
 
+    def get_bulk(self, ids, chunk_size=DEFAULT_BULK_GET_CHUNK_SIZE,
+                 workers=1, **kwargs):
+        """
+        Get many documents in as few round trips as possible using the
+        ``_bulk_get`` endpoint.
+
+        .. versionadded: 1.17
+
+        :param ids: iterable of document ids, ``(id, rev)`` pairs or
+                    dicts with ``id`` and optional ``rev`` keys.
+        :param chunk_size: maximum number of documents per request.
+        :param workers: number of chunks requested concurrently.
+        :param kwargs: query parameters such as ``revs``, ``latest`` or
+                       ``attachments``.
+
+        :returns: list of documents in input order, with ``None`` for
+                  documents (or revisions) that do not exist.
+        """
+        assert chunk_size > 0, "chunk_size should be a positive integer"
+
+        entries = []
+        for item in ids:
+            if isinstance(item, dict):
+                entries.append(dict(item))
+            elif isinstance(item, (list, tuple)):
+                entries.append({"id": item[0], "rev": item[1]})
+            else:
+                entries.append({"id": item})
+
+        chunks = [entries[i:i + chunk_size]
+                  for i in range(0, len(entries), chunk_size)]
+
+        def _fetch(chunk):
+            data = self.codec.dumps({"docs": chunk})
+            (resp, result) = self.resource.post("_bulk_get", data=data,
+                                                params=kwargs)
+            docs = []
+            for requested, item in zip(chunk, result["results"]):
+                doc = None
+                for entry in item["docs"]:
+                    if "ok" in entry:
+                        doc = entry["ok"]
+                        break
+                # Explicitly requested revisions may not be the leaf one.
+                if (doc is not None and "rev" not in kwargs and
+                        "rev" not in requested):
+                    self._cache_rev(doc["_id"], doc.get("_rev"))
+                docs.append(doc)
+            return docs
+
+        if workers > 1 and len(chunks) > 1:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                pages = list(executor.map(_fetch, chunks))
+        else:
+            pages = [_fetch(chunk) for chunk in chunks]
+
+        return [doc for page in pages for doc in page]
+
     def save(self, doc, batch=False):
         """
         Save or update a document.
@@ -368,15 +966,21 @@ class Database(object):
         else:
             params = {}
 
-        data = utils.force_bytes(json.dumps(_doc))
-        (resp, result) = self.resource(_doc['_id']).put(
-            data=data, params=params)
+        data = self.codec.dumps(_doc)
+        self._invalidate_doc(_doc['_id'])
+        try:
+            (resp, result) = self.resource(_doc['_id']).put(
+                data=data, params=params, idempotent="_rev" in _doc)
+        finally:
+            # A concurrent get may have cached the old body meanwhile.
+            self._invalidate_doc(_doc['_id'])
 
         if resp.status_code == 409:
             raise exp.Conflict(result['reason'])
 
         if "rev" in result and result["rev"] is not None:
             _doc["_rev"] = result["rev"]
+            self._cache_rev(_doc["_id"], result["rev"])
 
         return _doc
 
@@ -387,6 +991,10 @@ class Database(object):
         .. versionchanged:: 1.2
             Now returns a new document list instead of modify the original.
 
+        .. versionchanged:: 1.17
+            Returned docs are shallow copies: nested values are shared
+            with the original docs.
+
         :param docs: list of docs
         :param try_setting_ids: if ``True``, we loop through docs and generate/set
                             an id in each doc if none exists
@@ -395,7 +1003,9 @@ class Database(object):
         :returns: docs
         """
 
-        _docs = copy.deepcopy(docs)
+        # Only top level keys are assigned, a shallow copy of every
+        # doc is enough to leave the originals untouched.
+        _docs = [dict(doc) for doc in docs]
 
         # Insert _id field if it not exists and try_setting_ids is true
         if try_setting_ids:
@@ -403,19 +1013,111 @@ class Database(object):
                 if "_id" not in doc:
                     doc["_id"] = uuid.uuid4().hex
 
-        data = utils.force_bytes(json.dumps({"docs": _docs}))
+        data = self.codec.dumps({"docs": _docs})
         params = {"all_or_nothing": "true" if transaction else "false"}
 
         (resp, results) = self.resource.post("_bulk_docs", data=data,
                                              params=params)
 
         for result, doc in zip(results, _docs):
+            self._invalidate_doc(result.get("id", doc.get("_id")))
             if "rev" in result:
                 doc['_rev'] = result['rev']
+                self._cache_rev(result.get("id", doc.get("_id")),
+                                result["rev"])
 
         return _docs
 
-    def all(self, wrapper=None, flat=None, as_list=False, **kwargs):
+    def bulk_load(self, docs, chunk_size=1000,
+                  max_chunk_bytes=DEFAULT_BULK_CHUNK_BYTES, workers=4,
+                  try_setting_ids=True, transaction=False):
+        """
+        Save documents from any iterable using several concurrent
+        ``_bulk_docs`` requests.
+
+        Documents are consumed lazily and grouped in chunks of at most
+        ``chunk_size`` documents and ``max_chunk_bytes`` encoded bytes.
+        Up to ``workers`` chunks are sent at the same time; encoding of
+        the next chunks overlaps with the requests in flight and at most
+        one extra chunk is kept ready, so memory stays bounded whatever
+        the size of the input.
+
+        .. versionadded: 1.17
+
+        :param docs: iterable (or generator) of docs
+        :param chunk_size: maximum number of docs per request
+        :param max_chunk_bytes: maximum encoded size of a request body
+        :param workers: number of concurrent requests
+        :param try_setting_ids: if ``True``, generate an id for docs
+                                without one
+        :param transaction: if ``True``, couchdb do a insert in transaction
+                            model for every chunk.
+        :returns: generator of ``(doc, result)`` pairs in input order:
+                  the doc with its ``_id``, and its ``_rev`` if saved, and
+                  the ``_bulk_docs`` result of the doc, either
+                  ``{"ok": True, "id": ..., "rev": ...}`` or
+                  ``{"id": ..., "error": ..., "reason": ...}`` for docs that
+                  are not saved (conflicts, validation errors...).
+        """
+        assert chunk_size > 0, "chunk_size should be a positive integer"
+        assert workers > 0, "workers should be a positive integer"
+
+        params = {"all_or_nothing": "true" if transaction else "false"}
+
+        def _chunks():
+            chunk, encoded, size = [], [], 0
+            for doc in docs:
+                _doc = dict(doc)
+                if try_setting_ids and "_id" not in _doc:
+                    _doc["_id"] = uuid.uuid4().hex
+
+                data = self.codec.dumps(_doc)
+                if chunk and (len(chunk) >= chunk_size or
+                              size + len(data) > max_chunk_bytes):
+                    yield chunk, encoded
+                    chunk, encoded, size = [], [], 0
+
+                chunk.append(_doc)
+                encoded.append(data)
+                size += len(data) + 1
+
+            if chunk:
+                yield chunk, encoded
+
+        def _save(chunk, encoded):
+            data = b'{"docs":[' + b','.join(encoded) + b']}'
+            # The answer is read as a stream: results are not checked one
+            # by one, the first conflict would raise and hide the results
+            # of every other doc. Failed requests still raise.
+            (resp, results) = self.resource.post("_bulk_docs", data=data,
+                                                 params=params, stream=True)
+            if results is None:
+                results = self.codec.loads(resp.content)
+
+            saved = []
+            for result, doc in zip(results, chunk):
+                self._invalidate_doc(result.get("id", doc.get("_id")))
+                if "error" not in result and "rev" in result:
+                    doc['_rev'] = result['rev']
+                    self._cache_rev(result.get("id", doc.get("_id")),
+                                    result["rev"])
+                saved.append((doc, result))
+            return saved
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            pending = collections.deque()
+            for chunk, encoded in _chunks():
+                pending.append(executor.submit(_save, chunk, encoded))
+                while len(pending) > workers:
+                    for item in pending.popleft().result():
+                        yield item
+
+            while pending:
+                for item in pending.popleft().result():
+                    yield item
+
+    def all(self, wrapper=None, flat=None, as_list=False, stream=False,
+            **kwargs):
         """
         Execute a builtin view for get all documents.
 
@@ -424,11 +1126,17 @@ class Database(object):
             default lazy generator.
         :param flat: get a specific field from a object instead
             of a complete object.
+        :param stream: decode the response incrementally and yield each
+            row as soon as it is received instead of loading the whole
+            result in memory first.
 
         .. versionadded: 1.4
            Add as_list parameter.
            Add flat parameter.
 
+        .. versionadded: 1.17
+           Add stream parameter.
+
         :returns: generator object
         """
 
@@ -439,14 +1147,25 @@ class Database(object):
 
         if "keys" in params:
             data = {"keys": params.pop("keys")}
-            data = utils.force_bytes(json.dumps(data))
+            data = self.codec.dumps(data)
 
-        params = utils.encode_view_options(params)
-        if data:
-            (resp, result) = self.resource.post(
-                "_all_docs", params=params, data=data)
+        params = utils.encode_view_options(params, self.codec)
+
+        def _request(**kwargs):
+            if data:
+                return self.resource.post(
+                    "_all_docs", params=params, data=data, **kwargs)
+            return self.resource.get("_all_docs", params=params, **kwargs)
+
+        if stream:
+            def _rows():
+                (resp, result) = _request(stream=True)
+                for row in _stream_rows(resp):
+                    yield row
+            rows = _rows()
         else:
-            (resp, result) = self.resource.get("_all_docs", params=params)
+            (resp, result) = _request()
+            rows = result["rows"]
 
         if wrapper is None:
             wrapper = lambda doc: doc
@@ -455,7 +1174,7 @@ class Database(object):
             wrapper = lambda doc: doc[flat]
 
         def _iterate():
-            for row in result["rows"]:
+            for row in rows:
                 yield wrapper(row)
 
         if as_list:
@@ -499,6 +1218,11 @@ class Database(object):
         """
         Get all revisions of one document.
 
+        .. versionchanged:: 1.17
+            All revisions are fetched with a single ``_bulk_get`` request
+            and decoded lazily as they are received. Revisions that are
+            missing on the server are skipped.
+
         :param doc_id: document id
         :param status: filter of revision status, set empty to list all
         :raises: :py:exc:`~pycouchdb.exceptions.NotFound`
@@ -523,11 +1247,21 @@ class Database(object):
         if resp.status_code == 404:
             raise exp.NotFound("Document id `{0}` not found".format(doc_id))
 
-        for rev in result['_revs_info']:
-            if status and rev['status'] == status:
-                yield self.get(doc_id, rev=rev['rev'])
-            elif not status:
-                yield self.get(doc_id, rev=rev['rev'])
+        revs = [rev['rev'] for rev in result['_revs_info']
+                if not status or rev['status'] == status]
+        if not revs:
+            return
+
+        # Revisions are sent in the body: documents may have hundreds of
+        # them, too many for an ``open_revs`` query string.
+        data = self.codec.dumps(
+            {"docs": [{"id": doc_id, "rev": rev} for rev in revs]})
+        (resp, result) = self.resource.post("_bulk_get", data=data,
+                                            stream=True)
+        for item in _stream_rows(resp, key="results"):
+            for entry in item["docs"]:
+                if "ok" in entry:
+                    yield entry["ok"]
 
     def delete_attachment(self, doc, filename):
         """
@@ -546,7 +1280,12 @@ class Database(object):
         _doc = copy.deepcopy(doc)
         resource = self.resource(_doc['_id'])
 
-        (resp, result) = resource.delete(filename, params={'rev': _doc['_rev']})
+        self._invalidate_doc(_doc['_id'])
+        try:
+            (resp, result) = resource.delete(filename,
+                                             params={'rev': _doc['_rev']})
+        finally:
+            self._invalidate_doc(_doc['_id'])
         if resp.status_code == 404:
             raise exp.NotFound("filename {0} not found".format(filename))
 
@@ -554,6 +1293,7 @@ class Database(object):
             raise exp.Conflict(result['reason'])
 
         _doc['_rev'] = result['rev']
+        self._cache_rev(_doc['_id'], result['rev'])
         try:
             del _doc['_attachments'][filename]
 
@@ -564,44 +1304,242 @@ class Database(object):
 
         return _doc
 
-    def get_attachment(self, doc, filename, stream=False, **kwargs):
+    def get_attachment(self, doc, filename, stream=False, byte_range=None,
+                       **kwargs):
         """
         Get attachment by filename from document.
 
         :param doc: document dict
         :param filename: attachment file name.
         :param stream: setup streaming output (default: False)
+        :param byte_range: ``(start, end)`` tuple to get only a part of the
+                           attachment; ``end`` is inclusive and may be
+                           ``None`` to read up to the end. Compressed
+                           attachments do not support ranges: the server
+                           answers with the whole content, which is then
+                           sliced unless `stream` is ``True``.
 
         .. versionchanged: 1.5
             Add stream parameter for obtain very large attachments
             without load all file to the memory.
 
+        .. versionchanged: 1.17
+            Add byte_range parameter.
+
         :returns: binary data or
         """
 
         params = {"rev": doc["_rev"]}
         params.update(kwargs)
 
+        request_kwargs = {}
+        if byte_range is not None:
+            start, end = byte_range
+            request_kwargs["headers"] = {
+                "Range": _range_header(start, end),
+                "Accept-Encoding": "identity"}
+
         r, result = self.resource(doc['_id']).get(filename, stream=stream,
-                                                  params=params)
+                                                  params=params,
+                                                  **request_kwargs)
         if stream:
             return _StreamResponse(r)
 
+        if byte_range is not None and r.status_code == 200:
+            return r.content[start:None if end is None else end + 1]
+
         return r.content
 
-    def put_attachment(self, doc, content, filename=None, content_type=None):
+    def _download_range(self, resource, filename, params, path, start, end,
+                        chunk_size, max_retries, on_chunk):
+        # Download bytes [start, end] of an attachment into `path` at the
+        # same offsets, reconnecting from the last received byte when the
+        # connection drops.
+        position, failures = start, 0
+        with open(path, "r+b") as fileobj:
+            fileobj.seek(start)
+            while position <= end:
+                headers = {"Accept-Encoding": "identity",
+                           "Range": _range_header(position, end)}
+
+                received = 0
+                try:
+                    (r, result) = resource.get(filename, params=params,
+                                               headers=headers, stream=True)
+                    try:
+                        if r.status_code == 200 and position > 0:
+                            if start > 0:
+                                raise exp.UnexpectedError(
+                                    "server does not support range requests")
+                            # Range ignored: start over from the beginning.
+                            on_chunk(-position)
+                            position = 0
+                            fileobj.seek(0)
+
+                        for chunk in r.iter_content(chunk_size):
+                            chunk = chunk[:end + 1 - position]
+                            fileobj.write(chunk)
+                            fileobj.flush()
+                            position += len(chunk)
+                            received += len(chunk)
+                            on_chunk(len(chunk))
+                            if position > end:
+                                break
+                    finally:
+                        r.close()
+                except requests.RequestException:
+                    failures = 0 if received else failures + 1
+                    if failures > max_retries:
+                        raise
+                    continue
+
+                if position <= end:
+                    raise exp.UnexpectedError(
+                        "attachment ended after {0} bytes, expected {1}"
+                        .format(position, end + 1))
+
+        return position - start
+
+    def download_attachment(self, doc, filename, path, resume=True,
+                            workers=1, chunk_size=DEFAULT_CHUNK_SIZE,
+                            max_retries=5, progress=None, **kwargs):
+        """
+        Download an attachment to a file.
+
+        Dropped connections are resumed from the last received byte with
+        a ``Range`` request. The data is written to ``path + ".part"``,
+        with the ranges received so far recorded in
+        ``path + ".part.json"``, and renamed to `path` once complete: an
+        interrupted download is continued if `resume` is ``True``. With
+        more than one worker, the attachment is split in ranges fetched in
+        parallel over separate pooled connections.
+
+        Range requests are only supported by the server for attachments
+        that are not stored compressed; other attachments are always
+        downloaded from the beginning with a single connection.
+
+        .. versionadded: 1.17
+
+        :param doc: document dict
+        :param filename: attachment file name.
+        :param path: destination file path.
+        :param resume: continue an interrupted download of the same
+                       attachment.
+        :param workers: number of ranges downloaded concurrently.
+        :param chunk_size: size of the blocks read from the network.
+        :param max_retries: number of reconnections allowed in a row
+                            without receiving any data.
+        :param progress: callable invoked as ``progress(received, total)``
+                         after every block is written.
+        :returns: size of the downloaded attachment in bytes.
+        """
+        assert workers > 0, "workers should be a positive integer"
+        assert chunk_size > 0, "chunk_size should be a positive integer"
+
+        params = {"rev": doc["_rev"]}
+        params.update(kwargs)
+        resource = self.resource(doc['_id'])
+
+        (r, result) = resource.head(filename, params=params,
+                                    headers={"Accept-Encoding": "identity"})
+        size = int(r.headers["Content-Length"])
+        ranges = r.headers.get("Accept-Ranges") == "bytes"
+        etag = r.headers.get("ETag") or doc["_rev"]
+
+        part_path = path + ".part"
+        state = None
+        if resume and ranges and os.path.exists(part_path):
+            state = _load_download_state(part_path, etag, size)
+
+        if state is None:
+            # Positions of the ranges still to download, as
+            # [next byte, last byte] pairs.
+            pending = [[0, size - 1]]
+            if ranges and workers > 1 and size > 0:
+                part = -(-size // workers)
+                pending = [[start, min(start + part, size) - 1]
+                           for start in range(0, size, part)]
+            state = {"etag": etag, "size": size, "ranges": pending}
+            _save_download_state(part_path, state)
+            open(part_path, "wb").close()
+
+        lock = threading.Lock()
+        positions = state["ranges"]
+        received = [size - sum(end + 1 - position
+                               for position, end in positions)]
+        saved = [time.monotonic()]
+
+        def _on_chunk(index, length):
+            with lock:
+                positions[index][0] += length
+                received[0] += length
+                if time.monotonic() - saved[0] > 1:
+                    _save_download_state(part_path, state)
+                    saved[0] = time.monotonic()
+                if progress is not None:
+                    progress(received[0], size)
+
+        def _download(index):
+            position, end = positions[index]
+            if position > end:
+                return
+            self._download_range(resource, filename, params, part_path,
+                                 position, end, chunk_size, max_retries,
+                                 lambda length: _on_chunk(index, length))
+
+        try:
+            if len(positions) == 1:
+                _download(0)
+            else:
+                with ThreadPoolExecutor(max_workers=workers) as executor:
+                    futures = [executor.submit(_download, index)
+                               for index in range(len(positions))]
+                    for future in futures:
+                        future.result()
+        finally:
+            with lock:
+                _save_download_state(part_path, state)
+
+        os.replace(part_path, path)
+        os.remove(part_path + ".json")
+        return size
+
+    def put_attachment(self, doc, content, filename=None, content_type=None,
+                       refetch=True, chunk_size=DEFAULT_CHUNK_SIZE,
+                       progress=None, use_mmap=True):
         """
         Put a attachment to a document.
 
+        Files and iterables are streamed, so memory usage does not depend
+        on the attachment size. Regular files are memory mapped and sent
+        straight from the mapping; iterables of unknown length (such as
+        generators) are sent with chunked transfer-encoding.
+
         .. versionchanged:: 1.2
             Now returns a new document instead of modify the original.
 
+        .. versionchanged:: 1.17
+            Add refetch, chunk_size, progress and use_mmap parameters.
+            Accept iterables of bytes as content.
+
         :param doc: document dict.
-        :param content: the content to upload, either a file-like object or
-            bytes
+        :param content: the content to upload, either a file-like object,
+            bytes or an iterable (e.g. a generator) of bytes
         :param filename: the name of the attachment file; if omitted, this
                          function tries to get the filename from the file-like
                          object passed as the `content` argument value
+        :param refetch: if ``True`` (default), the updated document is
+                        downloaded again after the upload. If ``False``, the
+                        returned document is a copy of `doc` with the new
+                        ``_rev`` and an attachment stub built from the upload
+                        response, saving a round trip; the stub has no
+                        ``digest`` and ``length`` is only set when the
+                        content size is known in advance.
+        :param chunk_size: size of the blocks read from files and buffers.
+        :param progress: callable invoked as ``progress(sent, total)`` after
+                         every block is sent; ``total`` is ``None`` when the
+                         content size is unknown.
+        :param use_mmap: memory map regular files instead of reading them.
         :raises: :py:exc:`~pycouchdb.exceptions.Conflict`
             if save with wrong revision.
         :raises: ValueError
@@ -618,14 +1556,38 @@ class Database(object):
             content_type = ';'.join(
                 filter(None, mimetypes.guess_type(filename)))
 
+        assert chunk_size > 0, "chunk_size should be a positive integer"
+
+        length = _content_length(content)
+        if length == 0:
+            data = b""
+        elif (isinstance(content, (bytes, bytearray, memoryview, str)) and
+                progress is None):
+            data = content
+        else:
+            chunks = _upload_chunks(content, chunk_size, use_mmap)
+            if length is None:
+                data = _UploadBody(chunks, progress=progress)
+            else:
+                data = _SizedUploadBody(chunks, length, progress)
+
         headers = {"Content-Type": content_type}
         resource = self.resource(doc['_id'])
 
-        (resp, result) = resource.put(
-            filename, data=content, params={'rev': doc['_rev']}, headers=headers)
+        self._invalidate_doc(doc['_id'])
+        try:
+            (resp, result) = resource.put(
+                filename, data=data, params={'rev': doc['_rev']},
+                headers=headers)
+        finally:
+            self._invalidate_doc(doc['_id'])
 
         if resp.status_code < 206:
-            return self.get(doc["_id"])
+            if refetch:
+                return self.get(doc["_id"])
+            self._cache_rev(doc["_id"], result["rev"])
+            return _attachment_added(doc, filename, content_type,
+                                     result["rev"], length)
 
         raise exp.Conflict(result['reason'])
 
@@ -654,16 +1616,36 @@ class Database(object):
             data = {"keys": params.pop('keys')}
 
         if data:
-            data = utils.force_bytes(json.dumps(data))
+            data = self.codec.dumps(data)
 
-        params = utils.encode_view_options(params)
+        params = utils.encode_view_options(params, self.codec)
         result = list(self._query(self.resource(*path), wrapper=wrapper,
                                   flat=flat, params=params, data=data))
 
         return result[0] if len(result) > 0 else None
 
-    def _query(self, resource, data=None, params=None, headers=None,
-               flat=None, wrapper=None):
+    def _view_cache_key(self, path, params, data):
+        url = utils.urljoin(self.resource.base_url, *path)
+        if params:
+            url += "?" + urlencode(sorted(params.items()))
+        digest = hashlib.sha1(data).hexdigest() if data else None
+        return json.dumps([url, digest])
+
+    def _query_cached(self, resource, key, data=None, params=None,
+                      headers=None):
+        cache = self.view_cache
+        entry = cache.get(key)
+        if entry is not None and cache.is_fresh(entry):
+            return self.codec.loads(entry.data)
+
+        headers = dict(headers or {})
+        if cache.validate == "update_seq":
+            token = self.config()["update_seq"]
+            if entry is not None and entry.etag == token:
+                cache.record_hit()
+                return self.codec.loads(entry.data)
+        elif entry is not None:
+            headers["If-None-Match"] = entry.etag
 
         if data is None:
             (resp, result) = resource.get(params=params, headers=headers)
@@ -671,66 +1653,118 @@ class Database(object):
             (resp, result) = resource.post(
                 data=data, params=params, headers=headers)
 
+        if resp.status_code == 304:
+            cache.touch(key)
+            return self.codec.loads(entry.data)
+
+        if cache.validate == "etag":
+            token = resp.headers.get("etag")
+        if token:
+            cache.set(key, token, resp.content)
+        return result
+
+    def _query(self, resource, data=None, params=None, headers=None,
+               flat=None, wrapper=None, stream=False, cache_key=None):
+
+        kwargs = {"stream": True} if stream else {}
+        if cache_key is not None:
+            result = self._query_cached(resource, cache_key, data=data,
+                                        params=params, headers=headers)
+        elif data is None:
+            (resp, result) = resource.get(params=params, headers=headers,
+                                          **kwargs)
+        else:
+            (resp, result) = resource.post(
+                data=data, params=params, headers=headers, **kwargs)
+
         if wrapper is None:
             wrapper = lambda row: row
 
         if flat is not None:
             wrapper = lambda row: row[flat]
 
-        for row in result["rows"]:
+        rows = _stream_rows(resp) if stream else result["rows"]
+        for row in rows:
             yield wrapper(row)
 
-    def _query_paginate(self, resource, pagesize, data=None, params=None, headers=None,
-                        flat=None, wrapper=None):
+    def _query_paginate(self, resource, pagesize, data=None, params=None,
+                        headers=None, flat=None, wrapper=None, prefetch=True):
         if wrapper is None:
             wrapper = lambda row: row
 
         if flat is not None:
             wrapper = lambda row: row[flat]
 
-        limit = params.get('limit', float('inf'))
-        params['limit'] = pagesize + 1
-
-        if data is None:
-            (resp, result) = resource.get(params=params, headers=headers)
-        else:
-            (resp, result) = resource.post(
-                data=data, params=params, headers=headers)
+        # Params are already encoded, keys are passed through as they are.
+        params = dict(params or {})
+        limit = params.pop("limit", None)
+        remaining = None if limit is None else int(limit)
+        if remaining is not None and remaining <= 0:
+            return
 
-        startkey = result["rows"][0]["key"]
+        if "key" in params:
+            # startkey is ignored by couchdb when key is given.
+            params["startkey"] = params["endkey"] = params.pop("key")
 
-        while len(result["rows"]) == pagesize + 1:
-
-            next_startkey = result["rows"][-1]["key"]
-            next_startkey_docid = result["rows"][-1]["id"]
-
-            for row in result["rows"][:-1]:
-                if limit <= 0: return
-
-                yield wrapper(row)
-                limit -= 1
-
-            # do this regardless?
-            # if startkey == next_startkey:
-            params['startkey_docid'] = next_startkey_docid
-
-            startkey = next_startkey
-            params['startkey'] = startkey
-
-            params = utils.encode_view_options(params)
+        def _limit(page):
+            size = pagesize if remaining is None else min(pagesize, remaining)
+            page["limit"] = size + 1
+            return page
 
+        def _fetch(page):
             if data is None:
-                (resp, result) = resource.get(params=params, headers=headers)
+                (resp, result) = resource.get(params=page, headers=headers)
             else:
                 (resp, result) = resource.post(
-                    data=data, params=params, headers=headers)
-
-        for row in result["rows"]:
-            if limit <= 0: return
-            yield wrapper(row)
-            limit -= 1
+                    data=data, params=page, headers=headers)
+            return page, result["rows"]
+
+        def _next_page(fetched, page):
+            nonlocal remaining
+            page, rows = fetched
+            size = page["limit"] - 1
+            if remaining is not None:
+                remaining -= min(size, len(rows))
+            if len(rows) <= size or remaining == 0:
+                return None
+
+            page = dict(page)
+            if data is not None:
+                # Rows of a keys request can not be keyset paginated.
+                page["skip"] = int(page.get("skip", 0)) + size
+                return _limit(page)
+
+            # The extra row starts the next page. Rows of the current page
+            # sharing its key and id would be returned again: skip them.
+            last = rows[size]
+            position = (last["key"], last.get("id"))
+            startkey = self.codec.dumps(last["key"]).decode("utf-8")
+            skip = 0
+            for row in reversed(rows[:size]):
+                if (row["key"], row.get("id")) != position:
+                    break
+                skip += 1
+            if (skip == size and page.get("startkey") == startkey and
+                    page.get("startkey_docid") == last.get("id")):
+                skip += int(page.get("skip", 0))
+
+            page["startkey"] = startkey
+            page.pop("startkey_docid", None)
+            if "id" in last:
+                page["startkey_docid"] = last["id"]
+            page.pop("skip", None)
+            if skip:
+                page["skip"] = skip
+            return _limit(page)
+
+        pages = _iter_pages(_fetch, _limit(params), _next_page,
+                            prefetch=prefetch)
+        for page, rows in pages:
+            for row in rows[:page["limit"] - 1]:
+                yield wrapper(row)
 
-    def query(self, name, wrapper=None, flat=None, pagesize=None, as_list=False, **kwargs):
+    def query(self, name, wrapper=None, flat=None, pagesize=None, as_list=False,
+              stream=False, prefetch=True, **kwargs):
         """
         Execute a design document view query.
 
@@ -741,13 +1775,28 @@ class Database(object):
         :param flat: get a specific field from a object instead
             of a complete object.
         :param pagesize: Paginate the query response with `pagesize` rows per page.
+        :param stream: decode the response incrementally and yield each
+            row as soon as it is received instead of loading the whole
+            result in memory first. Can not be combined with `pagesize`.
+        :param prefetch: with `pagesize`, request the next page in a
+            background thread while the current one is consumed.
 
         .. versionadded: 1.4
            Add as_list parameter.
            Add flat parameter.
 
+        .. versionadded: 1.17
+           Add stream and prefetch parameters.
+           Pages are fetched by key (``startkey``/``startkey_docid``)
+           instead of re-encoding the previous page parameters.
+           Results are served from the view cache of the database, if
+           any, unless streamed or paginated.
+
         :returns: generator object
         """
+        if stream and pagesize is not None:
+            raise ValueError("stream and pagesize can not be used together")
+
         params = copy.copy(kwargs)
         path = utils._path_from_name(name, '_view')
         data = None
@@ -756,24 +1805,472 @@ class Database(object):
             data = {"keys": params.pop('keys')}
 
         if data:
-            data = utils.force_bytes(json.dumps(data))
+            data = self.codec.dumps(data)
 
-        params = utils.encode_view_options(params)
+        params = utils.encode_view_options(params, self.codec)
 
         if pagesize is None:
+            cache_key = None
+            if self.view_cache is not None and not stream:
+                cache_key = self._view_cache_key(path, params, data)
             result = self._query(self.resource(*path), wrapper=wrapper,
-                                 flat=flat, params=params, data=data)
+                                 flat=flat, params=params, data=data,
+                                 stream=stream, cache_key=cache_key)
         else:
             assert isinstance(pagesize, int), "pagesize should be a positive integer"
             assert pagesize > 0, "pagesize should be a positive integer"
 
             result = self._query_paginate(self.resource(*path), pagesize=pagesize, wrapper=wrapper,
-                                          flat=flat, params=params, data=data)
+                                          flat=flat, params=params, data=data,
+                                          prefetch=prefetch)
 
         if as_list:
             return list(result)
         return result
 
+    def query_many(self, name, queries, wrapper=None, flat=None,
+                   as_list=False, workers=4):
+        """
+        Execute several queries of the same view in a single round trip
+        with the ``queries`` endpoint of the view (or of ``_all_docs``).
+
+        Servers that lack the endpoint (couchdb < 2.2) answer with ``404
+        Not Found`` or ``405 Method Not Allowed``; the queries are then
+        sent as individual requests, `workers` at a time, and the endpoint
+        is not tried again on this database. Other errors are raised.
+
+        .. versionadded: 1.17
+
+        :param name: name of the view (eg: docidname/viewname) or
+            ``"_all_docs"``.
+        :param queries: list of dicts of view parameters, one per query,
+            as accepted by :py:meth:`query` (``keys``, ``startkey``,
+            ``limit``...).
+        :param wrapper: wrap result into a specific class.
+        :param flat: get a specific field from a object instead
+            of a complete object.
+        :param as_list: return lists of results instead of lazy
+            generators.
+        :param workers: number of individual requests sent concurrently
+            by the fallback.
+
+        :returns: list with the rows of each query, in query order.
+        """
+        queries = [dict(query) for query in queries]
+        if name == "_all_docs":
+            path = ["_all_docs"]
+        else:
+            path = utils._path_from_name(name, '_view')
+
+        results = None
+        if queries and self._multi_queries is not False:
+            data = self.codec.dumps({"queries": queries})
+            try:
+                (resp, result) = self.resource(*path).post(
+                    "queries", data=data)
+            except exp.ApiError as e:
+                if self._multi_queries or not _is_unsupported_endpoint(e):
+                    raise
+            else:
+                if result is not None:
+                    self._multi_queries = True
+                    results = [item["rows"] for item in result["results"]]
+                elif self._multi_queries or resp.status_code != 405:
+                    # Answer without a json body, e.g. from a proxy.
+                    raise exp.GenericError(resp.content)
+
+        if results is None:
+            results = self._query_each(self.resource(*path), queries, workers)
+            if queries:
+                self._multi_queries = False
+
+        if wrapper is None:
+            wrapper = lambda row: row
+
+        if flat is not None:
+            wrapper = lambda row: row[flat]
+
+        if as_list:
+            return [[wrapper(row) for row in rows] for rows in results]
+        return [(wrapper(row) for row in rows) for rows in results]
+
+    def _query_each(self, resource, queries, workers):
+        def _fetch(params):
+            params, data = dict(params), None
+            if "keys" in params:
+                data = self.codec.dumps({"keys": params.pop("keys")})
+            params = utils.encode_view_options(params, self.codec)
+            return list(self._query(resource, params=params, data=data))
+
+        with ThreadPoolExecutor(max_workers=max(workers, 1)) as executor:
+            return list(executor.map(_fetch, queries))
+
+    def _sample_split_points(self, resource, params, partitions, workers):
+        # Positions of the range are read from the offsets of its bounds,
+        # then one key is sampled at every partition boundary.
+        base = dict(params, reduce="false")
+
+        def _get(extra):
+            query = utils.encode_view_options(dict(base, **extra), self.codec)
+            (resp, result) = resource.get(params=query)
+            return result
+
+        info = _get({"limit": 0})
+        start, end = info["offset"], info["total_rows"]
+        if "endkey" in params:
+            end = _get({"startkey": params["endkey"], "limit": 0})["offset"]
+
+        count = max(end - start, 0)
+        skips = sorted(set(count * i // partitions
+                           for i in range(1, partitions)) - {0})
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            samples = list(executor.map(
+                lambda skip: _get({"skip": skip, "limit": 1}), skips))
+
+        points = []
+        for result in samples:
+            if result["rows"]:
+                key = result["rows"][0]["key"]
+                if not points or points[-1] != key:
+                    points.append(key)
+        return points
+
+    def query_partitioned(self, name, partitions=4, split_points=None,
+                          ordered=True, workers=None, wrapper=None,
+                          flat=None, as_list=False, max_pending=16,
+                          **kwargs):
+        """
+        Scan a view concurrently by splitting its key range in several
+        sub-ranges, each one queried over its own pooled connection.
+
+        Split points are keys of the view that start each partition but
+        the first one. If not given, they are sampled from the view with
+        one small request per partition, so that partitions hold about
+        the same number of rows.
+
+        .. versionadded: 1.17
+
+        :param name: name of the view (eg: docidname/viewname).
+        :param partitions: number of sub-ranges to sample.
+        :param split_points: explicit keys splitting the range, in the
+            order of the scan.
+        :param ordered: if ``True``, rows are yielded in view order by
+            concatenating the partitions, later partitions being fetched
+            ahead. If ``False``, rows are yielded as soon as received,
+            in no particular order.
+        :param workers: number of partitions queried concurrently,
+            one per partition by default.
+        :param wrapper: wrap result into a specific class.
+        :param flat: get a specific field from a object instead
+            of a complete object.
+        :param as_list: return a list of results instead of a
+            default lazy generator.
+        :param max_pending: maximum number of batches of rows received
+            ahead of the caller per partition, bounding memory usage.
+        :param kwargs: view parameters such as ``startkey``, ``endkey``
+            or ``include_docs``; ``keys``, ``key``, ``limit`` and ``skip``
+            are not supported.
+
+        Reduced results can not be split by key range: the view is always
+        scanned with ``reduce=false``, and ``group``, ``group_level`` and
+        ``reduce=true`` are not supported.
+
+        :returns: generator object
+        """
+        for option in ("keys", "key", "limit", "skip", "group",
+                       "group_level"):
+            if option in kwargs:
+                raise ValueError("{0} is not supported by partitioned "
+                                 "scans".format(option))
+        if kwargs.get("reduce", False) not in (False, "false"):
+            raise ValueError("reduce is not supported by partitioned scans")
+        assert partitions > 0, "partitions should be a positive integer"
+
+        path = utils._path_from_name(name, '_view')
+        resource = self.resource(*path)
+        params = dict(kwargs, reduce="false")
+
+        if split_points is None:
+            split_points = self._sample_split_points(
+                resource, params, partitions, workers or partitions)
+
+        ranges = []
+        bounds = [None] + list(split_points) + [None]
+        for i in range(len(bounds) - 1):
+            part = dict(params)
+            if i > 0:
+                part["startkey"] = bounds[i]
+                part.pop("startkey_docid", None)
+            if i < len(bounds) - 2:
+                part["endkey"] = bounds[i + 1]
+                part["inclusive_end"] = "false"
+                part.pop("endkey_docid", None)
+            ranges.append(utils.encode_view_options(part, self.codec))
+
+        result = self._scan_partitions(resource, ranges, ordered,
+                                       workers or len(ranges), max_pending)
+
+        if wrapper is None:
+            wrapper = lambda row: row
+
+        if flat is not None:
+            wrapper = lambda row: row[flat]
+
+        result = (wrapper(row) for row in result)
+        if as_list:
+            return list(result)
+        return result
+
+    def _scan_partitions(self, resource, ranges, ordered, workers,
+                         max_pending):
+        stop = threading.Event()
+        done = object()
+
+        if ordered:
+            queues = [queue.Queue(maxsize=max_pending) for _ in ranges]
+        else:
+            shared = queue.Queue(maxsize=max_pending * len(ranges))
+            queues = [shared] * len(ranges)
+
+        def _put(out, item):
+            while not stop.is_set():
+                try:
+                    out.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        def _scan(index, params):
+            out = queues[index]
+            try:
+                batch = []
+                for row in self._query(resource, params=params, stream=True):
+                    batch.append(row)
+                    if len(batch) >= DEFAULT_PARTITION_BATCH_SIZE:
+                        if not _put(out, batch):
+                            return
+                        batch = []
+                if batch:
+                    _put(out, batch)
+                _put(out, done)
+            except Exception as e:
+                _put(out, e)
+
+        executor = ThreadPoolExecutor(max_workers=workers)
+        try:
+            for index, params in enumerate(ranges):
+                executor.submit(_scan, index, params)
+
+            pending = len(ranges)
+            for out in (queues if ordered else queues[:1]):
+                while pending:
+                    item = out.get()
+                    if item is done:
+                        pending -= 1
+                        if ordered:
+                            break
+                        continue
+                    if isinstance(item, Exception):
+                        raise item
+                    for row in item:
+                        yield row
+        finally:
+            stop.set()
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def find(self, selector, fields=None, sort=None, use_index=None,
+             limit=None, skip=None, bookmark=None,
+             pagesize=DEFAULT_FIND_PAGE_SIZE, prefetch=True,
+             execution_stats=False, wrapper=None, **kwargs):
+        """
+        Execute a mango query with the ``_find`` endpoint.
+
+        Results are fetched lazily in pages of `pagesize` documents,
+        following the ``bookmark`` of each page until the query is
+        exhausted or `limit` documents were returned.
+
+        .. versionadded: 1.17
+
+        :param selector: mango selector dict.
+        :param fields: list of fields to return, all by default.
+        :param sort: mango sort specification, e.g.
+            ``[{"year": "desc"}]``.
+        :param use_index: design document name, or ``[ddoc, name]`` pair,
+            of the index to use.
+        :param limit: maximum number of documents, all by default.
+        :param skip: number of documents to skip.
+        :param bookmark: bookmark returned by a previous query, to
+            continue it.
+        :param pagesize: number of documents requested per page.
+        :param prefetch: request the next page in a background thread
+            while the current one is consumed.
+        :param execution_stats: ask the server for query statistics,
+            available as ``execution_stats`` of the result.
+        :param wrapper: wrap result into a specific class.
+        :param kwargs: other ``_find`` options such as ``r``,
+            ``conflicts``, ``stable`` or ``update``.
+
+        :returns: :py:class:`FindResult` iterator.
+        """
+        assert isinstance(pagesize, int) and pagesize > 0, \
+            "pagesize should be a positive integer"
+
+        query = dict(kwargs, selector=selector)
+        for name, value in (("fields", fields), ("sort", sort),
+                            ("use_index", use_index), ("skip", skip),
+                            ("bookmark", bookmark)):
+            if value is not None:
+                query[name] = value
+        if execution_stats:
+            query["execution_stats"] = True
+
+        remaining = limit
+
+        def _limit(page):
+            page["limit"] = (pagesize if remaining is None
+                             else min(pagesize, remaining))
+            return page
+
+        def _fetch(page):
+            (resp, result) = self.resource.post(
+                "_find", data=self.codec.dumps(page))
+            return result
+
+        def _next_page(result, page):
+            nonlocal remaining
+            received = len(result["docs"])
+            if remaining is not None:
+                remaining -= received
+            if (received < page["limit"] or remaining == 0 or
+                    not result.get("bookmark")):
+                return None
+
+            page = dict(page, bookmark=result["bookmark"])
+            page.pop("skip", None)
+            return _limit(page)
+
+        if remaining is not None and remaining <= 0:
+            pages = iter(())
+        else:
+            pages = _iter_pages(_fetch, _limit(query), _next_page,
+                                prefetch=prefetch)
+        return FindResult(pages, wrapper=wrapper)
+
+    def create_index(self, fields, name=None, ddoc=None, type="json",
+                     partial_filter_selector=None, **kwargs):
+        """
+        Create a mango index.
+
+        .. versionadded: 1.17
+
+        :param fields: list of field names, or of ``{field: "asc"}``
+            dicts, to index.
+        :param name: name of the index, generated by the server if not
+            given.
+        :param ddoc: design document holding the index, generated by the
+            server if not given.
+        :param type: ``"json"`` or ``"text"``.
+        :param partial_filter_selector: selector restricting the indexed
+            documents.
+
+        :returns: server answer, with the ``id`` and ``name`` of the index
+            and a ``result`` of ``"created"`` or ``"exists"``.
+        """
+        index = {"fields": list(fields)}
+        if partial_filter_selector is not None:
+            index["partial_filter_selector"] = partial_filter_selector
+
+        data = dict(kwargs, index=index, type=type)
+        if name is not None:
+            data["name"] = name
+        if ddoc is not None:
+            data["ddoc"] = ddoc
+
+        (resp, result) = self.resource.post("_index",
+                                            data=self.codec.dumps(data))
+        return result
+
+    def list_indexes(self):
+        """
+        List the mango indexes of the database, including the special
+        ``_all_docs`` index.
+
+        .. versionadded: 1.17
+
+        :returns: list of index definitions.
+        """
+        (resp, result) = self.resource.get("_index")
+        return result["indexes"]
+
+    def delete_index(self, ddoc, name, type="json"):
+        """
+        Delete a mango index.
+
+        .. versionadded: 1.17
+
+        :param ddoc: design document of the index, with or without the
+            ``_design/`` prefix.
+        :param name: name of the index.
+        :param type: ``"json"`` or ``"text"``.
+        """
+        if ddoc.startswith("_design/"):
+            ddoc = ddoc[len("_design/"):]
+        (resp, result) = self.resource("_index", ddoc, type, name).delete()
+        return result
+
+    def explain(self, selector, fields=None, sort=None, use_index=None,
+                **kwargs):
+        """
+        Ask the server how a mango query would be executed, without
+        running it, with the ``_explain`` endpoint.
+
+        .. versionadded: 1.17
+
+        :param selector: mango selector dict.
+        :param kwargs: other ``_find`` options such as ``limit`` or
+            ``skip``.
+
+        :returns: server answer, with the ``index`` that would be used.
+        """
+        query = dict(kwargs, selector=selector)
+        for name, value in (("fields", fields), ("sort", sort),
+                            ("use_index", use_index)):
+            if value is not None:
+                query[name] = value
+
+        (resp, result) = self.resource.post("_explain",
+                                            data=self.codec.dumps(query))
+        return result
+
+    def advise_index(self, selector, sort=None, **kwargs):
+        """
+        Explain a mango query and tell whether it would scan the whole
+        database, with the definition of an index that would cover its
+        selector and sort. Useful to catch unindexed queries in tests::
+
+            advice = db.advise_index({"type": "movie"}, sort=["year"])
+            assert not advice["full_scan"], advice["suggested_index"]
+
+        .. versionadded: 1.17
+
+        :param selector: mango selector dict.
+        :param sort: mango sort specification.
+        :param kwargs: other ``_find`` options, as for :py:meth:`explain`.
+
+        :returns: dict with the ``index`` chosen by the server, whether
+            it is a ``full_scan`` of ``_all_docs``, the
+            ``suggested_index`` (see :py:func:`pycouchdb.mango.suggest_index`)
+            and the complete ``explain`` answer.
+        """
+        result = self.explain(selector, sort=sort, **kwargs)
+        index = result.get("index", {})
+        return {"index": index,
+                "full_scan": mango.is_full_scan(index),
+                "suggested_index": mango.suggest_index(selector, sort),
+                "explain": result}
+
     def changes_feed(self, feed_reader, **kwargs):
         """
         Subscribe to changes feed of couchdb database.
@@ -798,4 +2295,7 @@ class Database(object):
         """
 
         (resp, result) = self.resource("_changes").get(params=kwargs)
+        if self.rev_cache is not None:
+            for change in result['results']:
+                self.rev_cache.update_from_change(change)
         return result['last_seq'], result['results']
@@ -1,5 +1,11 @@
 # -*- coding: utf-8 -*-
 
+import threading
+
+import requests
+
+from . import exceptions as exp
+
 
 class BaseFeedReader(object):
     """
@@ -49,3 +55,114 @@ class SimpleFeedReader(BaseFeedReader):
 
     def on_message(self, message):
         self.callback(message, db=self.db)
+
+
+class InvalidationFeedReader(BaseFeedReader):
+    """
+    Feed reader that keeps the client side caches of a database coherent
+    with writes made by other clients.
+
+    It follows the continuous changes feed from a background thread and
+    drops (or refreshes) the documents reported as changed through
+    :py:meth:`~pycouchdb.client.Database.invalidate`. The sequence of the
+    last processed change is tracked, so a dropped connection is resumed
+    from where it stopped without missing changes.
+
+    Usage::
+
+        reader = InvalidationFeedReader(db).start()
+        ...
+        reader.stop()
+
+    .. versionadded: 1.17
+
+    :param db: :py:class:`~pycouchdb.client.Database` whose caches are
+               kept up to date.
+    :param since: sequence to start from, ``None`` for the current one.
+    :param refresh: download again the changed documents that are in the
+                    document cache instead of only dropping them.
+    :param heartbeat: milliseconds between heartbeats, which is also the
+                      time :py:meth:`stop` may have to wait.
+    :param reconnect_delay: seconds to wait before reconnecting after an
+                            error.
+    :param kwargs: extra changes feed parameters, such as ``filter``.
+    """
+
+    def __init__(self, db, since=None, refresh=False, heartbeat=5000,
+                 reconnect_delay=1.0, **kwargs):
+        self.db = db
+        self.last_seq = since
+        self.refresh = refresh
+        self.heartbeat = heartbeat
+        self.reconnect_delay = reconnect_delay
+        self.params = kwargs
+        self.processed = 0
+        self.reconnects = 0
+        self.last_error = None
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """
+        Start following the changes feed in a daemon thread.
+        """
+        if self.last_seq is None:
+            self.last_seq = self.db.config()["update_seq"]
+
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self.run, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self, timeout=None):
+        """
+        Stop the background thread and wait for it to exit.
+        """
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def run(self):
+        while not self._stopped.is_set():
+            try:
+                self.db.changes_feed(self, feed="continuous",
+                                     since=self.last_seq,
+                                     heartbeat=self.heartbeat, **self.params)
+            except (requests.RequestException, exp.Error) as e:
+                self.last_error = e
+
+            if self._stopped.wait(self.reconnect_delay):
+                break
+            self.reconnects += 1
+
+    def _check_stopped(self):
+        if self._stopped.is_set():
+            raise exp.FeedReaderExited()
+
+    def on_message(self, message):
+        self._check_stopped()
+
+        if "id" in message:
+            doc_id = message["id"]
+            doc_cache = getattr(self.db, "doc_cache", None)
+            cached = (doc_cache is not None and
+                      self.db._doc_key(doc_id) in doc_cache)
+            self.db.invalidate(doc_id)
+            if self.refresh and cached and not message.get("deleted"):
+                try:
+                    self.db.get(doc_id)
+                except exp.NotFound:
+                    pass
+
+        if "seq" in message:
+            self.last_seq = message["seq"]
+        elif "last_seq" in message:
+            self.last_seq = message["last_seq"]
+        self.processed += 1
+
+    def on_heartbeat(self):
+        self._check_stopped()
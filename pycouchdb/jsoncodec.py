@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+
+import json
+
+
+class JsonCodec(object):
+    """
+    Base json codec based on the python standard library.
+
+    Codecs always encode to utf-8 bytes and are able to decode both
+    bytes and str.
+    """
+
+    name = "json"
+
+    def dumps(self, obj):
+        return json.dumps(obj).encode("utf-8")
+
+    def loads(self, data):
+        return json.loads(data)
+
+
+class OrjsonCodec(JsonCodec):
+    name = "orjson"
+
+    def __init__(self):
+        import orjson
+        self._orjson = orjson
+        self._options = orjson.OPT_NON_STR_KEYS
+
+    def dumps(self, obj):
+        return self._orjson.dumps(obj, option=self._options)
+
+    def loads(self, data):
+        return self._orjson.loads(data)
+
+
+class MsgspecCodec(JsonCodec):
+    name = "msgspec"
+
+    def __init__(self):
+        import msgspec
+        self._encoder = msgspec.json.Encoder()
+        self._decoder = msgspec.json.Decoder()
+
+    def dumps(self, obj):
+        return self._encoder.encode(obj)
+
+    def loads(self, data):
+        return self._decoder.decode(data)
+
+
+class UjsonCodec(JsonCodec):
+    name = "ujson"
+
+    def __init__(self):
+        import ujson
+        self._ujson = ujson
+
+    def dumps(self, obj):
+        return self._ujson.dumps(obj, ensure_ascii=False).encode("utf-8")
+
+    def loads(self, data):
+        return self._ujson.loads(data)
+
+
+CODECS = {c.name: c for c in (JsonCodec, OrjsonCodec, MsgspecCodec, UjsonCodec)}
+
+# Preference order used by ``get_codec("auto")``.
+AUTO_ORDER = ("orjson", "msgspec", "ujson", "json")
+
+default_codec = JsonCodec()
+
+
+def get_codec(codec=None):
+    """
+    Resolve a codec specification to a codec instance.
+
+    :param codec: ``None`` for the standard library codec, ``"auto"``
+                  for the fastest installed backend, a backend name
+                  (``"json"``, ``"orjson"``, ``"msgspec"``, ``"ujson"``)
+                  or an object with ``dumps`` and ``loads`` methods.
+    :raises: ImportError if the requested backend is not installed.
+
+    >>> get_codec().name
+    'json'
+    >>> get_codec("json").dumps({"a": 1})
+    b'{"a": 1}'
+    """
+    if codec is None:
+        return default_codec
+
+    if codec == "auto":
+        for name in AUTO_ORDER:
+            try:
+                return CODECS[name]()
+            except ImportError:
+                continue
+
+    if isinstance(codec, str):
+        if codec not in CODECS:
+            raise ValueError("Unknown json codec: {0}".format(codec))
+        return CODECS[codec]()
+
+    return codec
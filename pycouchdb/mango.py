@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+
+# Operators a json index can answer as a single key.
+EQUALITY_OPERATORS = frozenset(["$eq"])
+# Operators a json index can answer as a contiguous range of keys.
+RANGE_OPERATORS = frozenset(["$gt", "$gte", "$lt", "$lte", "$beginsWith"])
+
+
+def _is_operator_dict(value):
+    return isinstance(value, dict) and any(k.startswith("$") for k in value)
+
+
+def selector_fields(selector, prefix=""):
+    """
+    Return the fields a json index can use for `selector`, as a pair of
+    lists: fields compared by equality and fields compared by range.
+    Fields only used under combination operators such as ``$or`` or
+    ``$not`` can not be served by an index and are left out.
+
+    .. versionadded: 1.17
+
+    >>> selector_fields({"type": "movie", "year": {"$gt": 2000},
+    ...                  "$or": [{"genre": "drama"}, {"genre": "war"}]})
+    (['type'], ['year'])
+    >>> selector_fields({"director": {"name": "x"}, "$and": [{"n": {"$eq": 1}}]})
+    (['director.name', 'n'], [])
+    """
+    equality, ranges = [], []
+
+    def _add(fields, field):
+        if field not in fields:
+            fields.append(field)
+
+    for key, value in selector.items():
+        if key == "$and":
+            for item in value:
+                item_equality, item_ranges = selector_fields(item, prefix)
+                for field in item_equality:
+                    _add(equality, field)
+                for field in item_ranges:
+                    _add(ranges, field)
+            continue
+        if key.startswith("$"):
+            continue
+
+        field = prefix + key
+        if not isinstance(value, dict):
+            _add(equality, field)
+        elif not _is_operator_dict(value):
+            nested_equality, nested_ranges = selector_fields(
+                value, field + ".")
+            for nested in nested_equality:
+                _add(equality, nested)
+            for nested in nested_ranges:
+                _add(ranges, nested)
+        elif EQUALITY_OPERATORS.intersection(value):
+            _add(equality, field)
+        elif RANGE_OPERATORS.intersection(value):
+            _add(ranges, field)
+
+    ranges = [field for field in ranges if field not in equality]
+    return equality, ranges
+
+
+def sort_fields(sort):
+    """
+    Return the field names of a mango sort specification.
+
+    .. versionadded: 1.17
+
+    >>> sort_fields(["year", {"title": "desc"}])
+    ['year', 'title']
+    """
+    fields = []
+    for item in sort or []:
+        fields.extend([item] if isinstance(item, str) else list(item))
+    return fields
+
+
+def suggest_index(selector, sort=None):
+    """
+    Suggest the definition of a json index covering `selector` and
+    `sort`: equality fields first, then sort fields, then range fields,
+    so the matching documents are a contiguous, already sorted range of
+    the index. The result can be passed to
+    :py:meth:`~pycouchdb.client.Database.create_index` as keyword
+    arguments.
+
+    .. versionadded: 1.17
+
+    :returns: dict with the ``fields`` of the index, or ``None`` if no
+        field of the selector can be indexed.
+
+    >>> suggest_index({"type": "movie", "year": {"$gte": 2000}},
+    ...               sort=[{"rating": "desc"}])
+    {'fields': ['type', 'rating', 'year']}
+    """
+    equality, ranges = selector_fields(selector)
+    fields = list(equality)
+    for field in sort_fields(sort) + ranges:
+        if field not in fields:
+            fields.append(field)
+    if not fields:
+        return None
+    return {"fields": fields}
+
+
+def is_full_scan(index):
+    """
+    Tell if an index, as reported by ``_explain``, is the special
+    ``_all_docs`` index that reads every document of the database.
+
+    .. versionadded: 1.17
+    """
+    return index.get("type") == "special" or index.get("name") == "_all_docs"
@@ -1,24 +1,105 @@
 # -*- coding: utf-8 -*-
 
-import json
+import time
+import threading
+
 import requests
+from requests.adapters import HTTPAdapter
 
 from . import utils
+from . import jsoncodec
 from . import exceptions
+from .retry import parse_retry_after
+
+
+class PoolAdapter(HTTPAdapter):
+    """
+    Transport adapter that keeps track of the connection pool usage.
+
+    ``in_flight`` counts requests currently being sent by any thread and
+    ``max_in_flight`` its high-water mark; when it reaches ``pool_maxsize``
+    the pool is saturated and further requests either wait (``pool_block``)
+    or open throwaway connections.
+    """
+
+    def __init__(self, pool_connections=10, pool_maxsize=10,
+                 pool_block=False, **kwargs):
+        self._stats_lock = threading.Lock()
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.requests = 0
+        super(PoolAdapter, self).__init__(pool_connections=pool_connections,
+                                          pool_maxsize=pool_maxsize,
+                                          pool_block=pool_block, **kwargs)
+
+    def send(self, request, **kwargs):
+        with self._stats_lock:
+            self.requests += 1
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            return super(PoolAdapter, self).send(request, **kwargs)
+        finally:
+            with self._stats_lock:
+                self.in_flight -= 1
+
+    def stats(self):
+        """
+        Return a snapshot of the pool utilisation counters.
+
+        ``connections`` is the number of connections opened so far and
+        ``idle`` the number of connections currently waiting for reuse,
+        summed over all hosts.
+        """
+        connections = idle = 0
+        pools = self.poolmanager.pools
+        for key in pools.keys():
+            pool = pools.get(key)
+            if pool is None:
+                continue
+            connections += pool.num_connections
+            if pool.pool is not None:
+                # Free slots are filled with None placeholders
+                idle += sum(1 for conn in list(pool.pool.queue) if conn)
+
+        with self._stats_lock:
+            return {
+                "requests": self.requests,
+                "in_flight": self.in_flight,
+                "max_in_flight": self.max_in_flight,
+                "connections": connections,
+                "idle": idle,
+                "pool_connections": self._pool_connections,
+                "pool_maxsize": self._pool_maxsize,
+                "pool_block": self._pool_block,
+            }
 
 
 class Resource(object):
     def __init__(self, base_url, full_commit=True, session=None,
-                 credentials=None, authmethod="session", verify=False):
+                 credentials=None, authmethod="session", verify=False,
+                 codec=None, pool_connections=10, pool_maxsize=10,
+                 pool_block=False, keep_alive=True, retry=None):
 
         self.base_url = base_url
+        self.codec = jsoncodec.get_codec(codec)
+        self.retry = retry
 #        self.verify = verify
 
         if not session:
             self.session = requests.session()
 
+            adapter = PoolAdapter(pool_connections=pool_connections,
+                                  pool_maxsize=pool_maxsize,
+                                  pool_block=pool_block)
+            self.session.mount("http://", adapter)
+            self.session.mount("https://", adapter)
+
             self.session.headers.update({"accept": "application/json",
                                          "content-type": "application/json"})
+            if not keep_alive:
+                self.session.headers.update({"connection": "close"})
+
             self._authenticate(credentials, authmethod)
 
             if not full_commit:
@@ -33,7 +114,7 @@ class Resource(object):
 
         if method == "session":
             data = {"name": credentials[0], "password": credentials[1]}
-            data = utils.force_bytes(json.dumps(data))
+            data = self.codec.dumps(data)
 
             post_url = utils.urljoin(self.base_url, "_session")
             r = self.session.post(post_url, data=data)
@@ -46,9 +127,21 @@ class Resource(object):
         else:
             raise RuntimeError("Invalid authentication method")
 
+    def pool_stats(self):
+        """
+        Connection pool utilisation counters of the underlying session,
+        see :py:meth:`PoolAdapter.stats`. Returns ``None`` when the
+        session does not use a :py:class:`PoolAdapter`.
+        """
+        adapter = self.session.get_adapter(self.base_url)
+        if not isinstance(adapter, PoolAdapter):
+            return None
+        return adapter.stats()
+
     def __call__(self, *path):
         base_url = utils.urljoin(self.base_url, *path)
-        return self.__class__(base_url, session=self.session)
+        return self.__class__(base_url, session=self.session,
+                              codec=self.codec, retry=self.retry)
 
     def _check_result(self, response, result):
         try:
@@ -63,15 +156,59 @@ class Resource(object):
         if error == 'conflict' or error == "file_exists":
             raise exceptions.Conflict(reason or "Conflict")
 
-        if response.status_code > 205:
+        # 206 is the successful answer to a range request.
+        if response.status_code > 206:
             if response.status_code == 404 or error == 'not_found':
                 raise exceptions.NotFound(reason or 'Not found')
             elif error == 'bad_request':
                 raise exceptions.BadRequest(reason or "Bad request")
             raise exceptions.GenericError(result)
 
+    def _send(self, method, url, idempotent=None, **kwargs):
+        retry = self.retry
+        if retry is None:
+            return self.session.request(method, url, **kwargs)
+
+        if idempotent is None:
+            idempotent = retry.is_idempotent(method, kwargs.get("params"),
+                                             kwargs.get("headers"))
+        data = kwargs.get("data")
+        if not idempotent or not isinstance(data, (type(None), bytes, str)):
+            return self.session.request(method, url, **kwargs)
+
+        started = time.monotonic()
+        attempt = 0
+        while True:
+            attempt += 1
+            try:
+                response = self.session.request(method, url, **kwargs)
+            except (requests.ConnectionError, requests.Timeout):
+                delay = retry.next_delay(attempt, started)
+                if delay is None:
+                    raise
+            else:
+                if response.status_code not in retry.status_codes:
+                    if attempt > 1:
+                        retry.record_recovered()
+                    return response
+
+                retry_after = parse_retry_after(
+                    response.headers.get("retry-after"))
+                delay = retry.next_delay(attempt, started, retry_after)
+                if delay is None:
+                    return response
+                response.close()
+
+            time.sleep(delay)
+
     def request(self, method, path, params=None, data=None,
-                headers=None, stream=False, **kwargs):
+                headers=None, stream=False, idempotent=None, **kwargs):
+        """
+        Send a request relative to the resource url.
+
+        :param idempotent: override the retry policy guess on whether the
+                           request can be safely repeated.
+        """
 
         if headers is None:
             headers = {}
@@ -85,9 +222,9 @@ class Resource(object):
         else:
             url = self.base_url
 
-        response = self.session.request(method, url, stream=stream,
-                                        data=data, params=params,
-                                        headers=headers, **kwargs)
+        response = self._send(method, url, stream=stream, data=data,
+                              params=params, headers=headers,
+                              idempotent=idempotent, **kwargs)
         # Ignore result validation if
         # request is with stream mode
 
@@ -95,7 +232,7 @@ class Resource(object):
             result = None
             self._check_result(response, result)
         else:
-            result = utils.as_json(response)
+            result = utils.as_json(response, self.codec)
 
         if result is None:
             return response, result
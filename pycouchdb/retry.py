@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+
+import time
+import random
+import threading
+
+DEFAULT_STATUS_CODES = frozenset([500, 502, 503, 504])
+IDEMPOTENT_METHODS = frozenset(["GET", "HEAD"])
+
+
+class RetryPolicy(object):
+    """
+    Retry policy applied by :py:class:`~pycouchdb.resource.Resource` to
+    transient failures: connection errors, timeouts and the configured
+    http status codes.
+
+    Only idempotent requests are retried: ``GET`` and ``HEAD`` always,
+    ``PUT`` only when it carries a revision (``rev`` parameter or
+    ``If-Match`` header), unless the caller states otherwise. Requests
+    whose body is a stream can not be replayed and are never retried.
+
+    :param max_attempts: maximum number of attempts, including the first.
+    :param backoff_factor: delay in seconds before the first retry, doubled
+                           on every following one.
+    :param max_backoff: upper bound of a single delay.
+    :param jitter: if ``True``, each delay is drawn uniformly between zero
+                   and the computed backoff ("full jitter") to avoid
+                   synchronised retry storms.
+    :param deadline: total time budget in seconds for all attempts of a
+                     request, ``None`` for no limit.
+    :param status_codes: http status codes considered transient.
+
+    .. versionadded: 1.17
+    """
+
+    def __init__(self, max_attempts=3, backoff_factor=0.1, max_backoff=10.0,
+                 jitter=True, deadline=None,
+                 status_codes=DEFAULT_STATUS_CODES):
+        self.max_attempts = max_attempts
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+        self.jitter = jitter
+        self.deadline = deadline
+        self.status_codes = frozenset(status_codes)
+
+        self._lock = threading.Lock()
+        self.retries = 0
+        self.recovered = 0
+        self.exhausted = 0
+
+    def is_idempotent(self, method, params=None, headers=None):
+        method = method.upper()
+        if method in IDEMPOTENT_METHODS:
+            return True
+        if method == "PUT":
+            return bool((params and "rev" in params) or
+                        (headers and "If-Match" in headers))
+        return False
+
+    def backoff(self, attempt, retry_after=None):
+        """
+        Delay in seconds before the attempt following ``attempt``.
+        """
+        delay = min(self.max_backoff,
+                    self.backoff_factor * (2 ** (attempt - 1)))
+        if self.jitter:
+            delay = random.uniform(0, delay)
+        if retry_after is not None:
+            delay = max(delay, min(retry_after, self.max_backoff))
+        return delay
+
+    def next_delay(self, attempt, started, retry_after=None):
+        """
+        Return the delay before retrying after a failed ``attempt`` or
+        ``None`` if the request must not be retried any more.
+        """
+        if attempt >= self.max_attempts:
+            self._record_exhausted()
+            return None
+
+        delay = self.backoff(attempt, retry_after)
+        if self.deadline is not None:
+            if time.monotonic() - started + delay > self.deadline:
+                self._record_exhausted()
+                return None
+
+        with self._lock:
+            self.retries += 1
+        return delay
+
+    def record_recovered(self):
+        with self._lock:
+            self.recovered += 1
+
+    def _record_exhausted(self):
+        with self._lock:
+            self.exhausted += 1
+
+    def stats(self):
+        """
+        Return retry counters: ``retries`` performed, requests that
+        ``recovered`` after at least one retry, and requests that were
+        given up after retrying (``exhausted``).
+        """
+        with self._lock:
+            return {"retries": self.retries,
+                    "recovered": self.recovered,
+                    "exhausted": self.exhausted}
+
+
+def parse_retry_after(value):
+    """
+    Parse a ``Retry-After`` header expressed in seconds.
+
+    >>> parse_retry_after("2")
+    2.0
+    >>> parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") is None
+    True
+    """
+    try:
+        return max(float(value), 0.0)
+    except (TypeError, ValueError):
+        return None
@@ -1,9 +1,16 @@
 # -*- coding: utf-8 -*-
 
+import re
 import json
+import heapq
+import codecs
+import unicodedata
 from urllib.parse import unquote as _unquote
 from urllib.parse import urlunsplit, urlsplit
-from functools import reduce
+from functools import reduce, lru_cache
+
+from . import exceptions
+from . import jsoncodec
 
 string_type = str
 bytes_type = bytes
@@ -12,6 +19,9 @@ URLSPLITTER = '/'
 
 
 json_encoder = json.JSONEncoder()
+json_decoder = json.JSONDecoder()
+
+_WHITESPACE = re.compile(r'[ \t\n\r]*')
 
 
 def extract_credentials(url):
@@ -74,14 +84,167 @@ def urljoin(base, *path):
     return reduce(_join, path, base)
 
 
-def as_json(response):
-    if "application/json" in response.headers['content-type']:
-        response_src = response.content.decode('utf-8')
-        if response.content != b'':
-            return json.loads(response_src)
+def as_json(response, codec=None):
+    """
+    Decode a json response body.
+
+    The raw bytes are handed to the codec as they are, so codecs able to
+    parse bytes natively never materialise a str copy of the body. Empty
+    bodies are detected from the ``Content-Length`` header when possible.
+    """
+    if codec is None:
+        codec = jsoncodec.default_codec
+
+    if "application/json" not in response.headers.get('content-type', ''):
+        return None
+
+    if response.headers.get('content-length') == '0':
+        return ''
+
+    content = response.content
+    if not content:
+        return ''
+    return codec.loads(content)
+
+
+class _JsonStreamReader(object):
+    """
+    Minimal pull tokenizer over an iterable of utf-8 encoded chunks.
+
+    Only the structural characters of the outer containers are consumed
+    one by one, every other value is decoded at once with the stdlib
+    decoder as soon as it is completely buffered.
+    """
+
+    def __init__(self, chunks):
+        self._chunks = iter(chunks)
+        self._decoder = codecs.getincrementaldecoder("utf-8")()
+        self._eof = False
+        self.buffer = ''
+        self.pos = 0
+
+    def _fill(self, min_size=1):
+        """
+        Append at least ``min_size`` characters to the unconsumed part
+        of the buffer. Returns ``False`` if the stream is exhausted.
+        """
+        if self._eof:
+            return False
+
+        parts = [self.buffer[self.pos:]]
+        size = 0
+        while size < min_size:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                parts.append(self._decoder.decode(b'', final=True))
+                self._eof = True
+                break
+            text = self._decoder.decode(chunk)
+            parts.append(text)
+            size += len(text)
+
+        self.buffer = ''.join(parts)
+        self.pos = 0
+        return size > 0 or len(parts[-1]) > 0
+
+    def peek(self):
+        """
+        Skip whitespace and return the next character without consuming
+        it, or an empty string at the end of the stream.
+        """
+        while True:
+            self.pos = _WHITESPACE.match(self.buffer, self.pos).end()
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self._fill():
+                return ''
+
+    def expect(self, chars):
+        char = self.peek()
+        if not char or char not in chars:
+            raise ValueError("Expecting one of {0!r} at position {1}, "
+                             "got {2!r}".format(chars, self.pos, char))
+        self.pos += 1
+        return char
+
+    def value(self):
+        self.peek()
+        while True:
+            try:
+                obj, end = json_decoder.raw_decode(self.buffer, self.pos)
+            except ValueError:
+                # Grow geometrically so large values are not
+                # re-parsed once per network chunk.
+                if not self._fill(max(len(self.buffer) - self.pos, 1)):
+                    raise
+                continue
+
+            # A number that touches the end of the buffer may continue
+            # in the next chunk.
+            if end == len(self.buffer) and self._fill():
+                continue
+
+            self.pos = end
+            return obj
+
+
+def _iter_array(reader):
+    reader.expect('[')
+    if reader.peek() == ']':
+        reader.expect(']')
+        return
+
+    while True:
+        yield reader.value()
+        if reader.expect(',]') == ']':
+            break
+
+
+def iter_json_rows(chunks, key="rows"):
+    """
+    Incrementally decode a couchdb view-like response body and yield
+    each element of the ``key`` array as soon as it is received. With
+    ``key=None`` the body itself is expected to be an array.
+
+    Only one row is kept decoded in memory at a time. If couchdb reports
+    an error after the rows (e.g. a view timeout) it is raised once the
+    stream is consumed.
+
+    >>> body = [b'{"total_rows":2,"offset":0,"ro', b'ws":[{"id":"a"},',
+    ...         b'{"id":"b"}]}']
+    >>> [row["id"] for row in iter_json_rows(body)]
+    ['a', 'b']
+    >>> list(iter_json_rows([b'[{"ok": 1},', b' {"ok": 2}]'], key=None))
+    [{'ok': 1}, {'ok': 2}]
+    """
+    reader = _JsonStreamReader(chunks)
+
+    if key is None:
+        for item in _iter_array(reader):
+            yield item
+        return
+
+    envelope = {}
+
+    reader.expect('{')
+    if reader.peek() == '}':
+        return
+
+    while True:
+        name = reader.value()
+        reader.expect(':')
+
+        if name == key:
+            for row in _iter_array(reader):
+                yield row
         else:
-            return response_src
-    return None
+            envelope[name] = reader.value()
+
+        if reader.expect(',}') == '}':
+            break
+
+    if "error" in envelope:
+        raise exceptions.GenericError(envelope)
 
 
 def _path_from_name(name, type):
@@ -100,7 +263,7 @@ def _path_from_name(name, type):
     return ['_design', design, type, name]
 
 
-def encode_view_options(options):
+def encode_view_options(options, codec=None):
     """
     Encode any items in the options dict that are sent as a JSON string to a
     view/list function.
@@ -119,7 +282,10 @@ def encode_view_options(options):
 
     for name, value in options.items():
         if name in ('key', 'startkey', 'endkey'):
-            value = json_encoder.encode(value)
+            if codec is None:
+                value = json_encoder.encode(value)
+            else:
+                value = codec.dumps(value).decode('utf-8')
         retval[name] = value
     return retval
 
@@ -134,3 +300,123 @@ def force_text(data, encoding="utf-8"):
     if isinstance(data, bytes_type):
         data = data.decode(encoding)
     return data
+
+
+# Order of ascii punctuation and symbols in the ICU root collation used
+# by couchdb. They sort after whitespace and before digits and letters.
+_ICU_PUNCTUATION = "_-,;:!?.'\"()[]{}@*/\\&#%`^+<=>|~$"
+_ICU_PUNCTUATION_WEIGHTS = {c: i for i, c in enumerate(_ICU_PUNCTUATION)}
+_CHAR_WEIGHTS = {}
+
+
+def _char_weights(char):
+    # Primary weights (an int per base letter: whitespace, punctuation,
+    # digits, letters), secondary (accents) and tertiary (case) weights.
+    category = unicodedata.category(char)
+    if category[0] in "ZC":
+        weights = (ord(char),), "", 0
+    elif char in _ICU_PUNCTUATION_WEIGHTS:
+        weights = (0x110000 + _ICU_PUNCTUATION_WEIGHTS[char],), "", 0
+    elif category[0] in "PS":
+        weights = (0x110000 + len(_ICU_PUNCTUATION) + ord(char),), "", 0
+    elif category == "Nd":
+        weights = (0x330000 + unicodedata.digit(char),), "", 0
+    else:
+        decomposed = unicodedata.normalize("NFD", char)
+        weights = (tuple(0x440000 + ord(c) for c in decomposed[0].casefold()),
+                   decomposed[1:],
+                   int(not char.islower() and char != char.casefold()))
+    _CHAR_WEIGHTS[char] = weights
+    return weights
+
+
+@lru_cache(maxsize=65536)
+def _string_key(value):
+    # Strings are compared by all primary weights first, then by accents,
+    # then by case.
+    weights = _CHAR_WEIGHTS
+    primaries = []
+    secondaries = []
+    tertiaries = bytearray()
+    for char in value:
+        primary, secondary, tertiary = (weights.get(char) or
+                                        _char_weights(char))
+        primaries.extend(primary)
+        secondaries.append(secondary)
+        tertiaries.append(tertiary)
+    return tuple(primaries), tuple(secondaries), bytes(tertiaries)
+
+
+def collation_key(value):
+    """
+    Return a sort key that orders json values like couchdb view
+    collation: ``null`` < ``false`` < ``true`` < numbers < strings <
+    arrays < objects. Strings approximate the ICU root collation used by
+    couchdb: punctuation before digits before letters, letters compared
+    without accents and case first, then accents, then lowercase before
+    uppercase. Arrays and objects are compared element by element.
+
+    The key is computed once per value, so it can be used to sort or merge
+    many values without repeated recursive comparisons.
+
+    .. versionadded: 1.17
+
+    >>> sorted([[1], "b", None, 2, "A", True, "a", {"a": 1}, False],
+    ...        key=collation_key)
+    [None, False, True, 2, 'a', 'A', 'b', [1], {'a': 1}]
+    """
+    if value is None:
+        return (0,)
+    if value is False:
+        return (1,)
+    if value is True:
+        return (2,)
+    if isinstance(value, (int, float)):
+        return (3, value)
+    if isinstance(value, str):
+        return (4,) + _string_key(value)
+    if isinstance(value, (list, tuple)):
+        return (5, tuple(collation_key(item) for item in value))
+    if isinstance(value, dict):
+        return (6, tuple((collation_key(k), collation_key(v))
+                         for k, v in value.items()))
+    raise TypeError("Can not collate {0!r}".format(value))
+
+
+def collate(a, b):
+    """
+    Compare two json values with couchdb view collation.
+
+    .. versionadded: 1.17
+
+    >>> collate("a", "A"), collate(["b"], ["a", "z"]), collate(1, 1.0)
+    (-1, 1, 0)
+    """
+    key_a, key_b = collation_key(a), collation_key(b)
+    return (key_a > key_b) - (key_a < key_b)
+
+
+def merge_rows(*iterables, **kwargs):
+    """
+    Merge view rows from several iterables, each one already sorted, into
+    a single iterator in view order: by ``key`` with couchdb collation,
+    then by document ``id``.
+
+    .. versionadded: 1.17
+
+    :param descending: if ``True``, inputs and output are in descending
+                       order.
+
+    >>> a = [{"key": "a", "id": "1"}, {"key": "B", "id": "2"}]
+    >>> b = [{"key": "A", "id": "3"}, {"key": "b", "id": "4"}]
+    >>> [row["id"] for row in merge_rows(a, b)]
+    ['1', '3', '4', '2']
+    """
+    descending = kwargs.pop("descending", False)
+    if kwargs:
+        raise TypeError("Unexpected arguments: {0}".format(", ".join(kwargs)))
+
+    def _key(row):
+        return collation_key(row.get("key")), row.get("id", "")
+
+    return heapq.merge(*iterables, key=_key, reverse=descending)
@@ -0,0 +1,169 @@
+"""
+Unit tests for pycouchdb.cache module.
+"""
+
+import time
+import pytest
+from unittest.mock import patch
+from pycouchdb.cache import (RevisionCache, DocumentCache, CacheEntry,
+                             MemoryBackend, SQLiteBackend)
+
+
+class TestRevisionCache:
+    """Test RevisionCache class."""
+
+    def test_get_set(self):
+        cache = RevisionCache()
+        assert cache.get("doc1") is None
+        cache.set("doc1", "1-a")
+        assert cache.get("doc1") == "1-a"
+        assert cache.stats() == {"hits": 1, "misses": 1, "size": 1,
+                                 "max_size": 10000}
+
+    def test_evicts_least_recently_used(self):
+        cache = RevisionCache(max_size=2)
+        cache.set("doc1", "1-a")
+        cache.set("doc2", "1-b")
+        cache.get("doc1")
+        cache.set("doc3", "1-c")
+
+        assert len(cache) == 2
+        assert cache.get("doc2") is None
+        assert cache.get("doc1") == "1-a"
+        assert cache.get("doc3") == "1-c"
+
+    def test_invalidate_and_clear(self):
+        cache = RevisionCache()
+        cache.set("doc1", "1-a")
+        cache.set("doc2", "1-b")
+        cache.invalidate("doc1")
+        cache.invalidate("missing")
+        assert cache.get("doc1") is None
+        cache.clear()
+        assert len(cache) == 0
+
+    def test_update_from_change(self):
+        cache = RevisionCache()
+        cache.update_from_change({"id": "doc1", "changes": [{"rev": "2-a"}]})
+        assert cache.get("doc1") == "2-a"
+
+        cache.update_from_change({"id": "doc1", "changes": [{"rev": "3-a"}],
+                                  "deleted": True})
+        assert cache.get("doc1") is None
+
+        cache.update_from_change({"last_seq": "10"})
+        assert len(cache) == 0
+
+
+class TestDocumentCache:
+    """Test DocumentCache class."""
+
+    def test_evicts_by_size(self):
+        cache = DocumentCache(max_bytes=10)
+        cache.set("doc1", '"1-a"', b"aaaa")
+        cache.set("doc2", '"1-b"', b"bbbb")
+        cache.get("doc1")
+        cache.set("doc3", '"1-c"', b"cccc")
+
+        assert cache.get("doc2") is None
+        assert cache.get("doc1").data == b"aaaa"
+        assert cache.stats()["bytes"] == 8
+
+        cache.set("doc4", '"1-d"', b"x" * 11)
+        assert cache.get("doc4") is None
+
+    def test_ttl(self):
+        cache = DocumentCache(ttl=10)
+        with patch("pycouchdb.cache.time.time", return_value=100):
+            cache.set("doc1", '"1-a"', b"{}")
+
+        with patch("pycouchdb.cache.time.time", return_value=105):
+            assert cache.is_fresh(cache.get("doc1"))
+        with patch("pycouchdb.cache.time.time", return_value=111):
+            assert not cache.is_fresh(cache.get("doc1"))
+            cache.touch("doc1")
+        with patch("pycouchdb.cache.time.time", return_value=115):
+            assert cache.is_fresh(cache.get("doc1"))
+
+        assert cache.stats()["hits"] == 2
+        assert cache.stats()["revalidated"] == 1
+        assert cache.stats()["misses"] == 0
+
+    def test_without_ttl_always_revalidates(self):
+        cache = DocumentCache()
+        cache.set("doc1", '"1-a"', b"{}")
+        assert not cache.is_fresh(cache.get("doc1"))
+
+    def test_invalidate_and_clear(self):
+        cache = DocumentCache()
+        cache.set("doc1", '"1-a"', b"{}")
+        cache.set("doc2", '"1-b"', b"{}")
+        cache.invalidate("doc1")
+        assert cache.get("doc1") is None
+        assert cache.stats()["bytes"] == 2
+        cache.clear()
+        assert len(cache) == 0
+        assert cache.stats()["bytes"] == 0
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def backend(request, tmp_path):
+    if request.param == "memory":
+        yield MemoryBackend()
+    else:
+        backend = SQLiteBackend(str(tmp_path / "cache.sqlite"))
+        yield backend
+        backend.close()
+
+
+class TestBackends:
+    """Test cache backends."""
+
+    def test_get_set_delete(self, backend):
+        backend.set("a", CacheEntry('"1"', b"abc", 10.0), max_bytes=100)
+
+        assert backend.get("a") == CacheEntry('"1"', b"abc", 10.0)
+        assert "a" in backend
+        assert len(backend) == 1
+        assert backend.size() == 3
+
+        backend.touch("a", 20.0)
+        assert backend.get("a").stored_at == 20.0
+
+        backend.delete("a")
+        assert backend.get("a") is None
+        assert backend.size() == 0
+
+    def test_evicts_least_recently_used(self, backend):
+        backend.set("a", CacheEntry('"1"', b"aaaa", 0), max_bytes=10)
+        time.sleep(0.01)
+        backend.set("b", CacheEntry('"1"', b"bbbb", 0), max_bytes=10)
+        time.sleep(0.01)
+        backend.get("a")
+        time.sleep(0.01)
+        backend.set("c", CacheEntry('"1"', b"cccc", 0), max_bytes=10)
+
+        assert "b" not in backend
+        assert "a" in backend and "c" in backend
+        assert backend.size() == 8
+
+    def test_clear(self, backend):
+        backend.set("a", CacheEntry('"1"', b"abc", 0), max_bytes=100)
+        backend.clear()
+        assert len(backend) == 0
+
+
+class TestSQLiteBackend:
+    """Test SQLiteBackend persistence."""
+
+    def test_entries_survive_reopening(self, tmp_path):
+        path = str(tmp_path / "cache.sqlite")
+        cache = DocumentCache(backend=SQLiteBackend(path))
+        cache.set("db/doc1", '"1-a"', b'{"_id": "doc1"}')
+        cache.backend.close()
+
+        cache = DocumentCache(backend=SQLiteBackend(path))
+        entry = cache.get("db/doc1")
+        assert entry.etag == '"1-a"'
+        assert entry.data == b'{"_id": "doc1"}'
+        assert cache.stats()["bytes"] == 15
@@ -2,11 +2,19 @@
 Unit tests for pycouchdb.client.Database class.
 """
 
+import io
+import os
+import gzip
 import pytest
+import copy
 import json
+import urllib3
+import threading
+import requests
 import uuid
 from unittest.mock import Mock, patch, MagicMock, call
 from pycouchdb import client, exceptions
+from pycouchdb.cache import DocumentCache, ViewCache
 
 
 class TestDatabase:
@@ -170,6 +178,50 @@ class TestDatabase:
         with pytest.raises(exceptions.NotFound, match="Document not found"):
             db.get("doc123")
 
+    def test_database_get_bulk(self):
+        """Test Database get_bulk returns docs in input order."""
+        mock_resource = Mock()
+
+        def post(path, data, params):
+            results = []
+            for entry in json.loads(data)["docs"]:
+                if entry["id"] == "missing":
+                    docs = [{"error": {"id": "missing", "rev": "undefined",
+                                       "error": "not_found", "reason": "missing"}}]
+                else:
+                    docs = [{"ok": {"_id": entry["id"], "_rev": entry.get("rev", "2-b")}}]
+                results.append({"id": entry["id"], "docs": docs})
+            return (Mock(status_code=200), {"results": results})
+
+        mock_resource.post.side_effect = post
+
+        db = client.Database(mock_resource, "testdb", rev_cache=True)
+        result = db.get_bulk(["doc1", ("doc2", "1-a"), "missing", {"id": "doc3"}],
+                             chunk_size=2, workers=2, revs="true")
+
+        assert result == [{"_id": "doc1", "_rev": "2-b"},
+                          {"_id": "doc2", "_rev": "1-a"},
+                          None,
+                          {"_id": "doc3", "_rev": "2-b"}]
+        assert mock_resource.post.call_count == 2
+        first = mock_resource.post.call_args_list[0]
+        assert first[0] == ("_bulk_get",)
+        assert first[1]["params"] == {"revs": "true"}
+        sent = [json.loads(c[1]["data"])["docs"] for c in mock_resource.post.call_args_list]
+        assert [{"id": "doc1"}, {"id": "doc2", "rev": "1-a"}] in sent
+        assert [{"id": "missing"}, {"id": "doc3"}] in sent
+        # Only the leaf revisions are remembered, not explicitly requested ones.
+        assert [db.rev_cache.get(doc_id) for doc_id in ("doc1", "doc2", "doc3")] == [
+            "2-b", None, "2-b"]
+
+    def test_database_get_bulk_empty(self):
+        """Test Database get_bulk without ids does not send requests."""
+        mock_resource = Mock()
+        db = client.Database(mock_resource, "testdb")
+
+        assert db.get_bulk([]) == []
+        mock_resource.post.assert_not_called()
+
     def test_database_save_new_document(self):
         """Test Database save method with new document."""
         mock_resource = Mock()
@@ -305,6 +357,169 @@ class TestDatabase:
                                                  data=json.dumps({"docs": expected_docs}).encode(),
                                                  params={"all_or_nothing": "false"})
 
+    def test_database_save_bulk_leaves_originals_untouched(self):
+        """Test Database save_bulk only assigns keys on copies."""
+        mock_resource = Mock()
+        mock_resource.post.return_value = (Mock(status_code=201), [{"ok": True, "rev": "1-abc"}])
+
+        db = client.Database(mock_resource, "testdb")
+        docs = [{"name": "doc1", "nested": {"key": "value"}}]
+        result = db.save_bulk(docs)
+
+        assert docs == [{"name": "doc1", "nested": {"key": "value"}}]
+        assert result[0]["_rev"] == "1-abc"
+        assert result[0]["nested"] == {"key": "value"}
+
+    def _nested_docs(self):
+        """Realistic nested documents, as saved by save_bulk."""
+        return [{"_id": "doc{0}".format(i),
+                 "type": "order",
+                 "customer": {"name": "Name {0}".format(i), "address": {"city": "City", "zip": "12345"}},
+                 "lines": [{"sku": "sku{0}".format(j), "qty": j, "price": j * 1.5,
+                            "tags": ["a", "b", "c"]} for j in range(10)]}
+                for i in range(200)]
+
+    def test_database_save_bulk_shallow_copies(self):
+        """Test save_bulk copies only the top level dict of nested documents.
+
+        Realistic nested documents would make deepcopy walk every value, the
+        returned docs share them with the originals instead.
+        """
+        docs = self._nested_docs()
+        mock_resource = Mock()
+        mock_resource.post.return_value = (Mock(status_code=201), [
+            {"ok": True, "id": doc["_id"], "rev": "1-abc"} for doc in docs])
+
+        db = client.Database(mock_resource, "testdb")
+        with patch("copy.deepcopy", side_effect=AssertionError("deepcopy called")), \
+                patch("copy.copy", side_effect=AssertionError("copy called")):
+            result = db.save_bulk(docs)
+
+        assert all(copied is not doc for copied, doc in zip(result, docs))
+        assert all(copied["customer"] is doc["customer"] and copied["lines"] is doc["lines"]
+                   for copied, doc in zip(result, docs))
+        assert all("_rev" not in doc for doc in docs)
+
+    @pytest.mark.slow
+    @pytest.mark.parametrize("strategy", ["deepcopy", "shallow"])
+    def test_database_save_bulk_copy_benchmark(self, request, strategy):
+        """Benchmark the copy of nested docs done by save_bulk.
+
+        The previous deepcopy and the current shallow copy are timed on the
+        same docs and reported in the same group to be compared; timings
+        depend on the machine, so no ratio is asserted. Skipped when
+        pytest-benchmark is not installed.
+        """
+        pytest.importorskip("pytest_benchmark")
+        benchmark = request.getfixturevalue("benchmark")
+        benchmark.group = "save_bulk copies"
+
+        docs = self._nested_docs()
+        copier = copy.deepcopy if strategy == "deepcopy" else dict
+        result = benchmark(lambda: [copier(doc) for doc in docs])
+
+        assert result == docs
+
+    def _bulk_docs_response(self, results):
+        """Streamed _bulk_docs answer with the given per document results."""
+        return Mock(status_code=201, content=json.dumps(results).encode()), None
+
+    def test_database_bulk_load_chunks(self):
+        """Test Database bulk_load splits docs in chunks and keeps order."""
+        mock_resource = Mock()
+
+        def post(path, data, params, stream):
+            docs = json.loads(data)["docs"]
+            return self._bulk_docs_response(
+                [{"ok": True, "id": doc["_id"], "rev": "1-" + doc["_id"]} for doc in docs])
+
+        mock_resource.post.side_effect = post
+
+        db = client.Database(mock_resource, "testdb")
+        docs = ({"_id": "doc{0}".format(i), "value": i} for i in range(5))
+        result = list(db.bulk_load(docs, chunk_size=2, workers=2))
+
+        assert [doc["_id"] for doc, _ in result] == ["doc{0}".format(i) for i in range(5)]
+        assert [doc["_rev"] for doc, _ in result] == ["1-doc{0}".format(i) for i in range(5)]
+        assert [res["rev"] for _, res in result] == ["1-doc{0}".format(i) for i in range(5)]
+        assert mock_resource.post.call_count == 3
+        for call_args in mock_resource.post.call_args_list:
+            assert call_args[1]["params"] == {"all_or_nothing": "false"}
+            assert call_args[1]["stream"] is True
+
+    def test_database_bulk_load_max_chunk_bytes(self):
+        """Test Database bulk_load limits the encoded size of requests."""
+        mock_resource = Mock()
+        sizes = []
+
+        def post(path, data, params, stream):
+            sizes.append(len(json.loads(data)["docs"]))
+            return self._bulk_docs_response([{"ok": True, "rev": "1-abc"}] * sizes[-1])
+
+        mock_resource.post.side_effect = post
+
+        db = client.Database(mock_resource, "testdb")
+        docs = [{"payload": "x" * 100} for i in range(6)]
+        result = list(db.bulk_load(docs, max_chunk_bytes=400, workers=1))
+
+        assert len(result) == 6
+        assert all("_id" in doc for doc, _ in result)
+        assert all("_id" not in doc for doc in docs)
+        assert sizes == [2, 2, 2]
+
+    def test_database_bulk_load_consumes_input_lazily(self):
+        """Test Database bulk_load does not read the whole input upfront."""
+        mock_resource = Mock()
+        mock_resource.post.side_effect = lambda path, data, params, stream: self._bulk_docs_response(
+            [{"ok": True, "rev": "1-abc"}] * len(json.loads(data)["docs"]))
+        consumed = []
+
+        def docs():
+            for i in range(1000):
+                consumed.append(i)
+                yield {"_id": "doc{0}".format(i)}
+
+        db = client.Database(mock_resource, "testdb")
+        result = db.bulk_load(docs(), chunk_size=10, workers=2)
+        next(result)
+
+        assert len(consumed) <= 10 * 4 + 1
+
+    def test_database_bulk_load_per_document_errors(self):
+        """Test Database bulk_load reports per document errors without stopping."""
+        mock_resource = Mock()
+
+        def post(path, data, params, stream):
+            results = []
+            for doc in json.loads(data)["docs"]:
+                if doc["_id"] == "doc1":
+                    results.append({"id": "doc1", "error": "conflict",
+                                    "reason": "Document update conflict."})
+                elif doc["_id"] == "doc2":
+                    results.append({"id": "doc2", "error": "forbidden", "reason": "invalid"})
+                else:
+                    results.append({"ok": True, "id": doc["_id"], "rev": "1-a"})
+            return self._bulk_docs_response(results)
+
+        mock_resource.post.side_effect = post
+
+        db = client.Database(mock_resource, "testdb")
+        result = list(db.bulk_load([{"_id": "doc{0}".format(i)} for i in range(4)], chunk_size=2))
+
+        assert [(doc["_id"], doc.get("_rev"), res.get("error")) for doc, res in result] == [
+            ("doc0", "1-a", None), ("doc1", None, "conflict"),
+            ("doc2", None, "forbidden"), ("doc3", "1-a", None)]
+
+    def test_database_bulk_load_request_error(self):
+        """Test Database bulk_load propagates errors of whole requests."""
+        mock_resource = Mock()
+        mock_resource.post.side_effect = exceptions.AuthenticationFailed("unauthorized")
+
+        db = client.Database(mock_resource, "testdb")
+
+        with pytest.raises(exceptions.AuthenticationFailed):
+            list(db.bulk_load([{"_id": "doc1"}]))
+
     def test_database_delete_by_id(self):
         """Test Database delete method by document ID."""
         mock_resource = Mock()
@@ -345,6 +560,158 @@ class TestDatabase:
         
         assert result is None  # delete method doesn't return anything
         mock_resource.assert_called_once_with("doc123")
+        mock_resource.return_value.head.assert_not_called()
+        mock_resource.return_value.delete.assert_called_once_with(params={"rev": "1-abc"})
+
+    def test_database_delete_by_id_uses_rev_cache(self):
+        """Test Database delete skips the HEAD for ids with a cached revision."""
+        mock_resource = Mock()
+        mock_resource.return_value.put.return_value = (
+            Mock(status_code=201), {"ok": True, "id": "doc123", "rev": "1-abc"})
+        mock_resource.return_value.delete.return_value = (
+            Mock(status_code=200), {"ok": True, "id": "doc123", "rev": "2-def"})
+
+        db = client.Database(mock_resource, "testdb", rev_cache=True)
+        db.save({"_id": "doc123"})
+        db.delete("doc123")
+
+        mock_resource.return_value.head.assert_not_called()
+        mock_resource.return_value.delete.assert_called_once_with(params={"rev": "1-abc"})
+        assert len(db.rev_cache) == 0
+        assert db.rev_cache.stats()["hits"] == 1
+
+    def test_database_delete_stale_rev_cache(self):
+        """Test Database delete falls back to HEAD when the cached revision is stale."""
+        mock_resource = Mock()
+        mock_resource.return_value.head.return_value = (
+            Mock(headers={"etag": '"2-xyz"'}), None)
+        mock_resource.return_value.delete.side_effect = [
+            exceptions.Conflict("Document update conflict."),
+            (Mock(status_code=200), {"ok": True, "id": "doc123", "rev": "3-def"}),
+        ]
+
+        db = client.Database(mock_resource, "testdb", rev_cache=True)
+        db.rev_cache.set("doc123", "1-abc")
+        db.delete("doc123")
+
+        mock_resource.return_value.head.assert_called_once()
+        assert mock_resource.return_value.delete.call_args_list == [
+            call(params={"rev": "1-abc"}), call(params={"rev": "2-xyz"})]
+        assert db.rev_cache.get("doc123") is None
+
+    def test_database_get_with_doc_cache(self):
+        """Test Database get revalidates cached documents with If-None-Match."""
+        body = b'{"_id": "doc1", "_rev": "1-a", "name": "test"}'
+        mock_resource = Mock(base_url="http://localhost:5984/testdb")
+        mock_resource.return_value.get.side_effect = [
+            (Mock(status_code=200, headers={"etag": '"1-a"'}, content=body),
+             json.loads(body)),
+            (Mock(status_code=304, headers={"etag": '"1-a"'}), None),
+        ]
+
+        db = client.Database(mock_resource, "testdb", doc_cache=True)
+        first = db.get("doc1")
+        first["name"] = "changed"
+        second = db.get("doc1")
+
+        assert second == {"_id": "doc1", "_rev": "1-a", "name": "test"}
+        assert mock_resource.return_value.get.call_args_list == [
+            call(params={}), call(params={}, headers={"If-None-Match": '"1-a"'})]
+        assert db.doc_cache.stats()["revalidated"] == 1
+        assert db.doc_cache.stats()["misses"] == 1
+
+    def test_database_doc_cache_ttl_and_invalidation(self):
+        """Test fresh entries are served locally until the document is saved."""
+        body = b'{"_id": "doc1", "_rev": "1-a"}'
+        mock_resource = Mock(base_url="http://localhost:5984/testdb")
+        mock_resource.return_value.get.return_value = (
+            Mock(status_code=200, headers={"etag": '"1-a"'}, content=body),
+            json.loads(body))
+        mock_resource.return_value.put.return_value = (
+            Mock(status_code=201), {"ok": True, "id": "doc1", "rev": "2-a"})
+
+        db = client.Database(mock_resource, "testdb",
+                             doc_cache=DocumentCache(ttl=60))
+        db.get("doc1")
+        db.get("doc1")
+        assert mock_resource.return_value.get.call_count == 1
+        assert db.doc_cache.stats()["hits"] == 1
+
+        db.save({"_id": "doc1", "_rev": "1-a"})
+        db.get("doc1")
+        assert mock_resource.return_value.get.call_count == 2
+
+        db.invalidate("doc1")
+        assert len(db.doc_cache) == 0
+
+    @pytest.mark.parametrize("write", [
+        lambda db: db.save({"_id": "doc1", "_rev": "1-a"}),
+        lambda db: db.delete({"_id": "doc1", "_rev": "1-a"}),
+        lambda db: db.put_attachment({"_id": "doc1", "_rev": "1-a"}, b"data", "a.txt",
+                                   refetch=False),
+        lambda db: db.delete_attachment({"_id": "doc1", "_rev": "1-a"}, "a.txt"),
+    ], ids=["save", "delete", "put_attachment", "delete_attachment"])
+    def test_database_doc_cache_invalidated_after_write(self, write):
+        """Test a document cached by a get racing a write is dropped once the write succeeds."""
+        body = b'{"_id": "doc1", "_rev": "1-a"}'
+        mock_resource = Mock(base_url="http://localhost:5984/testdb")
+        mock_resource.return_value.get.return_value = (
+            Mock(status_code=200, headers={"etag": '"1-a"'}, content=body),
+            json.loads(body))
+        db = client.Database(mock_resource, "testdb",
+                             doc_cache=DocumentCache(ttl=60))
+
+        def racing_write(*args, **kwargs):
+            db.get("doc1")
+            assert len(db.doc_cache) == 1
+            return Mock(status_code=201), {"ok": True, "id": "doc1", "rev": "2-a"}
+
+        mock_resource.return_value.put.side_effect = racing_write
+        mock_resource.return_value.delete.side_effect = racing_write
+
+        write(db)
+
+        assert len(db.doc_cache) == 0
+
+    def test_database_doc_cache_shared_by_servers(self):
+        """Test a shared document cache keeps databases of different servers apart."""
+        cache = DocumentCache(ttl=60)
+        dbs = []
+        for url, name in [("http://one:5984/testdb", "one"), ("http://two:5984/testdb", "two"),
+                          ("http://one:5984/testdb/a", "three")]:
+            body = json.dumps({"_id": "doc1", "server": name}).encode()
+            mock_resource = Mock(base_url=url)
+            mock_resource.return_value.get.return_value = (
+                Mock(status_code=200, headers={"etag": '"1-a"'}, content=body), json.loads(body))
+            dbs.append(client.Database(mock_resource, "testdb", doc_cache=cache))
+
+        # "testdb/a" + "doc1" and "testdb" + "a/doc1" must not share a key either.
+        assert dbs[0]._doc_key("a/doc1") != dbs[2]._doc_key("doc1")
+        for i in range(2):
+            assert [db.get("doc1")["server"] for db in dbs] == ["one", "two", "three"]
+        assert len(cache) == 3
+
+    def test_database_rev_cache_populated(self):
+        """Test revision cache is fed by get, save_bulk and the changes list."""
+        mock_resource = Mock()
+        mock_resource.return_value.get.return_value = (
+            Mock(), {"_id": "doc1", "_rev": "1-a"})
+        mock_resource.post.return_value = (
+            Mock(), [{"ok": True, "id": "doc2", "rev": "1-b"}])
+
+        db = client.Database(mock_resource, "testdb", rev_cache=True)
+        db.get("doc1")
+        db.save_bulk([{"_id": "doc2"}])
+        assert db.rev_cache.get("doc1") == "1-a"
+        assert db.rev_cache.get("doc2") == "1-b"
+
+        mock_resource.return_value.get.return_value = (Mock(), {
+            "last_seq": "3", "results": [
+                {"id": "doc1", "changes": [{"rev": "2-a"}]},
+                {"id": "doc2", "changes": [{"rev": "2-b"}], "deleted": True}]})
+        db.changes_list()
+        assert db.rev_cache.get("doc1") == "2-a"
+        assert db.rev_cache.get("doc2") is None
 
     def test_database_delete_invalid_document(self):
         """Test Database delete method with invalid document."""
@@ -527,6 +894,24 @@ class TestDatabase:
         assert len(result) == 1
         assert result[0]["id"] == "doc1"
 
+    def test_database_all_stream(self):
+        """Test Database all method with stream=True."""
+        mock_resource = Mock()
+        mock_response = Mock()
+        mock_response.iter_content.return_value = iter([
+            b'{"total_rows":2,"offset":0,"rows":[\r\n{"id":"doc1","key":"doc1"}',
+            b',\r\n{"id":"doc2","key":"doc2"}\r\n]}'
+        ])
+        mock_resource.get.return_value = (mock_response, None)
+
+        db = client.Database(mock_resource, "testdb")
+        result = list(db.all(flat="id", stream=True))
+
+        assert result == ["doc1", "doc2"]
+        mock_resource.get.assert_called_once_with("_all_docs", params={"include_docs": "true"},
+                                                  stream=True)
+        mock_response.close.assert_called_once_with()
+
     def test_database_cleanup(self):
         """Test Database cleanup method."""
         mock_resource = Mock()
@@ -593,64 +978,82 @@ class TestDatabase:
         with pytest.raises(exceptions.NotFound, match="Design document not found"):
             db.compact_view("nonexistent_design")
 
+    def _bulk_get_response(self, *revs):
+        """Stream response of _bulk_get, with None for a missing revision."""
+        results = []
+        for rev in revs:
+            if rev is None:
+                doc = {"error": {"id": "doc123", "rev": "1-abc", "error": "not_found",
+                                 "reason": "missing"}}
+            else:
+                doc = {"ok": {"_id": "doc123", "_rev": rev}}
+            results.append({"id": "doc123", "docs": [doc]})
+        body = json.dumps({"results": results}).encode()
+        response = Mock(status_code=200)
+        response.iter_content.return_value = iter([body[:20], body[20:]])
+        return response
+
     def test_database_revisions_success(self):
-        """Test Database revisions method success."""
+        """Test Database revisions method fetches every revision at once."""
         mock_resource = Mock()
-        mock_response = Mock()
-        mock_response.status_code = 200
-        mock_response.json.return_value = {
+        revs_info_response = Mock(status_code=200)
+        revs_info = {
             "_id": "doc123",
             "_rev": "3-ghi",
             "_revs_info": [
                 {"rev": "3-ghi", "status": "available"},
                 {"rev": "2-def", "status": "available"},
-                {"rev": "1-abc", "status": "available"}
+                {"rev": "1-abc", "status": "missing"}
             ]
         }
-        # Mock the initial call to get _revs_info
-        mock_resource.return_value.get.return_value = (mock_response, {
-            "_id": "doc123",
-            "_rev": "3-ghi",
-            "_revs_info": [
-                {"rev": "3-ghi", "status": "available"},
-                {"rev": "2-def", "status": "available"},
-                {"rev": "1-abc", "status": "available"}
-            ]
-        })
-        
-        # Mock the subsequent calls to get each revision
-        def mock_get_side_effect(*args, **kwargs):
-            if 'rev' in kwargs.get('params', {}):
-                rev = kwargs['params']['rev']
-                if rev == "3-ghi":
-                    return (Mock(status_code=200), {"_id": "doc123", "_rev": "3-ghi"})
-                elif rev == "2-def":
-                    return (Mock(status_code=200), {"_id": "doc123", "_rev": "2-def"})
-                elif rev == "1-abc":
-                    return (Mock(status_code=200), {"_id": "doc123", "_rev": "1-abc"})
-            # Default response for _revs_info call
-            return (mock_response, {
-                "_id": "doc123",
-                "_rev": "3-ghi",
-                "_revs_info": [
-                    {"rev": "3-ghi", "status": "available"},
-                    {"rev": "2-def", "status": "available"},
-                    {"rev": "1-abc", "status": "available"}
-                ]
-            })
-        
-        mock_resource.return_value.get.side_effect = mock_get_side_effect
-        
+        bulk_get_response = self._bulk_get_response("3-ghi", "2-def")
+        mock_resource.return_value.get.return_value = (revs_info_response, revs_info)
+        mock_resource.post.return_value = (bulk_get_response, None)
+
         db = client.Database(mock_resource, "testdb")
         result = list(db.revisions("doc123"))
-        
-        assert len(result) == 3
+
+        assert [doc["_rev"] for doc in result] == ["3-ghi", "2-def"]
         assert result[0]["_id"] == "doc123"
-        assert result[0]["_rev"] == "3-ghi"
-        assert result[1]["_rev"] == "2-def"
-        assert result[2]["_rev"] == "1-abc"
-        # The method calls resource 4 times: once for _revs_info, then once for each revision
-        assert mock_resource.call_count == 4
+        # One request for _revs_info and a single one for all revisions
+        assert mock_resource.return_value.get.call_count == 1
+        args, kwargs = mock_resource.post.call_args
+        assert args == ("_bulk_get",)
+        assert kwargs["stream"] is True
+        assert json.loads(kwargs["data"]) == {"docs": [{"id": "doc123", "rev": "3-ghi"},
+                                                       {"id": "doc123", "rev": "2-def"}]}
+        bulk_get_response.close.assert_called_once_with()
+
+    def test_database_revisions_all_status(self):
+        """Test Database revisions method skips missing revisions."""
+        mock_resource = Mock()
+        revs_info = {"_id": "doc123", "_revs_info": [
+            {"rev": "2-def", "status": "available"},
+            {"rev": "1-abc", "status": "missing"}
+        ]}
+        mock_resource.return_value.get.return_value = (Mock(status_code=200), revs_info)
+        mock_resource.post.return_value = (self._bulk_get_response("2-def", None), None)
+
+        db = client.Database(mock_resource, "testdb")
+        result = list(db.revisions("doc123", status=""))
+
+        assert [doc["_rev"] for doc in result] == ["2-def"]
+        assert [doc["rev"] for doc in json.loads(mock_resource.post.call_args[1]["data"])["docs"]] == [
+            "2-def", "1-abc"]
+
+    def test_database_revisions_many(self):
+        """Test hundreds of revisions are sent in the request body, not the url."""
+        mock_resource = Mock()
+        revs = ["{0}-abc".format(i) for i in range(500, 0, -1)]
+        mock_resource.return_value.get.return_value = (Mock(status_code=200), {
+            "_id": "doc123", "_revs_info": [{"rev": rev, "status": "available"} for rev in revs]})
+        mock_resource.post.return_value = (self._bulk_get_response(*revs), None)
+
+        db = client.Database(mock_resource, "testdb")
+
+        assert [doc["_rev"] for doc in db.revisions("doc123")] == revs
+        assert mock_resource.post.call_count == 1
+        assert "params" not in mock_resource.post.call_args[1]
 
     def test_database_revisions_not_found(self):
         """Test Database revisions method with not found."""
@@ -665,47 +1068,31 @@ class TestDatabase:
     def test_database_revisions_with_params(self):
         """Test Database revisions method with parameters."""
         mock_resource = Mock()
-        mock_response = Mock()
-        mock_response.status_code = 200
-        mock_response.json.return_value = {
-            "_id": "doc123",
-            "_rev": "1-abc",
-            "_revs_info": [
-                {"rev": "1-abc", "status": "available"}
-            ]
-        }
-        # Mock the initial call to get _revs_info
-        mock_resource.return_value.get.return_value = (mock_response, {
-            "_id": "doc123",
-            "_rev": "1-abc",
-            "_revs_info": [
-                {"rev": "1-abc", "status": "available"}
-            ]
-        })
-        
-        # Mock the subsequent call to get the revision
-        def mock_get_side_effect(*args, **kwargs):
-            if 'rev' in kwargs.get('params', {}):
-                rev = kwargs['params']['rev']
-                if rev == "1-abc":
-                    return (Mock(status_code=200), {"_id": "doc123", "_rev": "1-abc"})
-            # Default response for _revs_info call
-            return (mock_response, {
-                "_id": "doc123",
-                "_rev": "1-abc",
-                "_revs_info": [
-                    {"rev": "1-abc", "status": "available"}
-                ]
-            })
-        
-        mock_resource.return_value.get.side_effect = mock_get_side_effect
-        
+        revs_info = {"_id": "doc123", "_rev": "1-abc",
+                     "_revs_info": [{"rev": "1-abc", "status": "available"}]}
+        mock_resource.return_value.get.return_value = (Mock(status_code=200), revs_info)
+        mock_resource.post.return_value = (self._bulk_get_response("1-abc"), None)
+
         db = client.Database(mock_resource, "testdb")
         result = list(db.revisions("doc123", status="available", limit=10))
-        
+
         assert len(result) == 1
-        # The method calls get twice: once for _revs_info, once for the actual revision
-        assert mock_resource.return_value.get.call_count == 2
+        first = mock_resource.return_value.get.call_args_list[0]
+        assert first[1]["params"] == {"limit": 10, "revs_info": "true"}
+        # One request for _revs_info and one for the revisions
+        assert mock_resource.return_value.get.call_count == 1
+        assert mock_resource.post.call_count == 1
+
+    def test_database_revisions_no_match(self):
+        """Test Database revisions method without matching revisions."""
+        mock_resource = Mock()
+        mock_resource.return_value.get.return_value = (Mock(status_code=200), {
+            "_id": "doc123", "_revs_info": [{"rev": "1-abc", "status": "missing"}]})
+
+        db = client.Database(mock_resource, "testdb")
+
+        assert list(db.revisions("doc123")) == []
+        assert mock_resource.return_value.get.call_count == 1
 
     def test_database_put_attachment_success(self):
         """Test Database put_attachment method success."""
@@ -759,6 +1146,88 @@ class TestDatabase:
         
         assert result["_attachments"]["test.txt"]["content_type"] == "text/plain"
 
+    def test_database_put_attachment_without_refetch(self):
+        """Test Database put_attachment builds the doc from the PUT response."""
+        mock_resource = Mock()
+        mock_resource.return_value.put.return_value = (
+            Mock(status_code=201), {"ok": True, "id": "doc123", "rev": "3-def"})
+
+        db = client.Database(mock_resource, "testdb")
+        doc = {"_id": "doc123", "_rev": "2-abc", "name": "test",
+               "_attachments": {"a.txt": {"content_type": "text/plain", "stub": True}}}
+
+        result = db.put_attachment(doc, b"Hello, World!", "test.txt",
+                                   content_type="text/plain", refetch=False)
+
+        mock_resource.return_value.get.assert_not_called()
+        assert result["_rev"] == "3-def"
+        assert result["_attachments"] == {
+            "a.txt": {"content_type": "text/plain", "stub": True},
+            "test.txt": {"content_type": "text/plain", "stub": True,
+                         "revpos": 3, "length": 13}}
+        assert doc["_rev"] == "2-abc"
+        assert "test.txt" not in doc["_attachments"]
+
+    def _put_attachment_body(self, content, **kwargs):
+        mock_resource = Mock()
+        mock_resource.return_value.put.return_value = (
+            Mock(status_code=201), {"ok": True, "id": "doc123", "rev": "2-def"})
+
+        db = client.Database(mock_resource, "testdb")
+        doc = {"_id": "doc123", "_rev": "1-abc"}
+        result = db.put_attachment(doc, content, "test.bin", refetch=False,
+                                   content_type="application/octet-stream",
+                                   **kwargs)
+        return mock_resource.return_value.put.call_args[1]["data"], result
+
+    def test_database_put_attachment_mmap_file(self, tmp_path):
+        """Test Database put_attachment streams regular files from a memory map."""
+        path = tmp_path / "test.bin"
+        path.write_bytes(b"0123456789" * 1000)
+        progress = []
+
+        with open(str(path), "rb") as fileobj:
+            body, result = self._put_attachment_body(
+                fileobj, chunk_size=4096,
+                progress=lambda sent, total: progress.append((sent, total)))
+
+            prepared = requests.Request("PUT", "http://localhost/", data=body).prepare()
+            assert prepared.headers["Content-Length"] == "10000"
+            assert "Transfer-Encoding" not in prepared.headers
+
+            chunks = [bytes(chunk) for chunk in body]
+
+        assert [len(chunk) for chunk in chunks] == [4096, 4096, 1808]
+        assert b"".join(chunks) == path.read_bytes()
+        assert progress == [(4096, 10000), (8192, 10000), (10000, 10000)]
+        assert result["_attachments"]["test.bin"]["length"] == 10000
+
+    def test_database_put_attachment_without_mmap(self):
+        """Test Database put_attachment reads file-like objects in chunks."""
+        body, result = self._put_attachment_body(
+            io.BytesIO(b"x" * 100), chunk_size=30, use_mmap=False)
+
+        assert len(body) == 100
+        assert [len(chunk) for chunk in body] == [30, 30, 30, 10]
+
+    def test_database_put_attachment_generator(self):
+        """Test Database put_attachment sends generators chunked."""
+        progress = []
+        body, result = self._put_attachment_body(
+            (part for part in [b"abc", b"def"]),
+            progress=lambda sent, total: progress.append((sent, total)))
+
+        prepared = requests.Request("PUT", "http://localhost/", data=body).prepare()
+        assert prepared.headers["Transfer-Encoding"] == "chunked"
+        assert list(body) == [b"abc", b"def"]
+        assert progress == [(3, None), (6, None)]
+        assert "length" not in result["_attachments"]["test.bin"]
+
+    def test_database_put_attachment_bytes_unchanged(self):
+        """Test Database put_attachment passes bytes as is without progress."""
+        body, result = self._put_attachment_body(b"abc")
+        assert body == b"abc"
+
     def test_database_get_attachment_success(self):
         """Test Database get_attachment method success."""
         mock_resource = Mock()
@@ -794,6 +1263,152 @@ class TestDatabase:
         assert hasattr(result, 'raw')
         assert hasattr(result, 'url')
 
+    def test_database_get_attachment_byte_range(self):
+        """Test Database get_attachment method with a byte range."""
+        mock_resource = Mock()
+        mock_resource.return_value.get.return_value = (
+            Mock(status_code=206, content=b"World"), None)
+
+        db = client.Database(mock_resource, "testdb")
+        doc = {"_id": "doc123", "_rev": "1-abc"}
+
+        assert db.get_attachment(doc, "test.txt", byte_range=(7, 11)) == b"World"
+        mock_resource.return_value.get.assert_called_once_with(
+            "test.txt", stream=False, params={"rev": "1-abc"},
+            headers={"Range": "bytes=7-11", "Accept-Encoding": "identity"})
+
+        # Servers ignoring the range answer with the whole content.
+        mock_resource.return_value.get.return_value = (
+            Mock(status_code=200, content=b"Hello, World!"), None)
+        assert db.get_attachment(doc, "test.txt", byte_range=(7, None)) == b"World!"
+
+    def _attachment_resource(self, content, drop_after=None, offline=False):
+        """Mock resource serving `content` with range support.
+
+        The first request drops after `drop_after` bytes. If `offline`, only
+        that request connects, the following ones fail.
+        """
+        requests_seen = []
+
+        def get(filename, params=None, headers=None, stream=False):
+            if offline and requests_seen:
+                raise requests.exceptions.ConnectionError("refused")
+            match = headers.get("Range", "bytes=0-")[6:].split("-")
+            start = int(match[0])
+            end = int(match[1]) if match[1] else len(content) - 1
+            requests_seen.append((start, end))
+            body = content[start:end + 1]
+            first = len(requests_seen) == 1
+
+            def iter_content(chunk_size):
+                for offset in range(0, len(body), chunk_size):
+                    if drop_after is not None and first and offset >= drop_after:
+                        raise requests.exceptions.ChunkedEncodingError("dropped")
+                    yield body[offset:offset + chunk_size]
+
+            response = Mock(status_code=206 if "Range" in headers else 200)
+            response.iter_content = iter_content
+            return response, None
+
+        mock_resource = Mock()
+        mock_resource.return_value.head.return_value = (
+            Mock(headers={"Content-Length": str(len(content)),
+                          "Accept-Ranges": "bytes", "ETag": '"abc"'}), None)
+        mock_resource.return_value.get.side_effect = get
+        return mock_resource, requests_seen
+
+    def test_database_download_attachment_reconnects(self, tmp_path):
+        """Test download_attachment resumes from the last byte after a drop."""
+        content = bytes(range(256)) * 40
+        mock_resource, requests_seen = self._attachment_resource(content, drop_after=4000)
+        progress = []
+
+        db = client.Database(mock_resource, "testdb")
+        path = str(tmp_path / "out.bin")
+        size = db.download_attachment({"_id": "doc123", "_rev": "1-abc"}, "a.bin", path,
+                                      chunk_size=1000,
+                                      progress=lambda got, total: progress.append(got))
+
+        assert size == len(content)
+        assert requests_seen == [(0, 10239), (4000, 10239)]
+        assert progress[-1] == len(content)
+        with open(path, "rb") as fileobj:
+            assert fileobj.read() == content
+        assert os.listdir(str(tmp_path)) == ["out.bin"]
+
+    def test_database_download_attachment_resume_file(self, tmp_path):
+        """Test an interrupted download_attachment is continued by the next one."""
+        content = bytes(range(256)) * 40
+        mock_resource, requests_seen = self._attachment_resource(
+            content, drop_after=4000, offline=True)
+        path = tmp_path / "out.bin"
+        doc = {"_id": "doc123", "_rev": "1-abc"}
+
+        db = client.Database(mock_resource, "testdb")
+        with pytest.raises(requests.exceptions.ConnectionError):
+            db.download_attachment(doc, "a.bin", str(path), chunk_size=1000, max_retries=0)
+        assert not path.exists()
+
+        mock_resource, requests_seen = self._attachment_resource(content)
+        db = client.Database(mock_resource, "testdb")
+        assert db.download_attachment(doc, "a.bin", str(path)) == len(content)
+
+        assert requests_seen == [(4000, 10239)]
+        assert path.read_bytes() == content
+        assert os.listdir(str(tmp_path)) == ["out.bin"]
+
+    def test_database_download_attachment_resume_parallel(self, tmp_path):
+        """Test an interrupted parallel download only fetches the missing ranges."""
+        content = bytes(range(256)) * 40
+        mock_resource, requests_seen = self._attachment_resource(
+            content, drop_after=1000, offline=True)
+        path = tmp_path / "out.bin"
+        doc = {"_id": "doc123", "_rev": "1-abc"}
+
+        db = client.Database(mock_resource, "testdb")
+        with pytest.raises(requests.exceptions.ConnectionError):
+            db.download_attachment(doc, "a.bin", str(path), workers=4, chunk_size=500,
+                                   max_retries=0)
+        assert not path.exists()
+        (start, end), = requests_seen
+
+        mock_resource, requests_seen = self._attachment_resource(content)
+        db = client.Database(mock_resource, "testdb")
+        db.download_attachment(doc, "a.bin", str(path), workers=4)
+
+        expected = [(0, 2559), (2560, 5119), (5120, 7679), (7680, 10239)]
+        expected[expected.index((start, end))] = (start + 1000, end)
+        assert sorted(requests_seen) == expected
+        assert path.read_bytes() == content
+
+    def test_database_download_attachment_changed(self, tmp_path):
+        """Test a partial download of another attachment version is discarded."""
+        content = b"0123456789" * 100
+        mock_resource, requests_seen = self._attachment_resource(content)
+        path = tmp_path / "out.bin"
+        (tmp_path / "out.bin.part").write_bytes(b"x" * 300)
+        (tmp_path / "out.bin.part.json").write_text(
+            json.dumps({"etag": '"old"', "size": 1000, "ranges": [[300, 999]]}))
+
+        db = client.Database(mock_resource, "testdb")
+        db.download_attachment({"_id": "doc123", "_rev": "1-abc"}, "a.bin", str(path))
+
+        assert requests_seen == [(0, 999)]
+        assert path.read_bytes() == content
+
+    def test_database_download_attachment_parallel(self, tmp_path):
+        """Test download_attachment fetches ranges concurrently."""
+        content = bytes(range(256)) * 40
+        mock_resource, requests_seen = self._attachment_resource(content)
+        path = tmp_path / "out.bin"
+
+        db = client.Database(mock_resource, "testdb")
+        db.download_attachment({"_id": "doc123", "_rev": "1-abc"}, "a.bin", str(path),
+                               workers=4, resume=False)
+
+        assert sorted(requests_seen) == [(0, 2559), (2560, 5119), (5120, 7679), (7680, 10239)]
+        assert path.read_bytes() == content
+
     def test_database_get_attachment_not_found(self):
         """Test Database get_attachment method with not found."""
         mock_resource = Mock()
@@ -921,6 +1536,49 @@ class TestDatabase:
         assert result[1]["id"] == "doc2"
         mock_resource.assert_called_once_with("_design", "test", "_view", "view")
 
+    def test_database_query_view_cache_etag(self):
+        """Test Database query revalidates cached view results by ETag."""
+        body = b'{"total_rows": 1, "offset": 0, "rows": [{"id": "doc1", "key": 1, "value": null}]}'
+        mock_resource = Mock(base_url="http://localhost:5984/testdb")
+        mock_resource.return_value.get.side_effect = [
+            (Mock(status_code=200, headers={"etag": '"abc"'}, content=body), json.loads(body)),
+            (Mock(status_code=304, headers={"etag": '"abc"'}), None),
+        ]
+
+        db = client.Database(mock_resource, "testdb", view_cache=True)
+        first = db.query("test/view", as_list=True, limit=10)
+        second = db.query("test/view", as_list=True, limit=10)
+
+        assert first == second == [{"id": "doc1", "key": 1, "value": None}]
+        assert mock_resource.return_value.get.call_args_list == [
+            call(params={"limit": 10}, headers={}),
+            call(params={"limit": 10}, headers={"If-None-Match": '"abc"'})]
+        stats = db.view_cache.stats()
+        assert (stats["misses"], stats["revalidated"], stats["hit_rate"]) == (1, 1, 0.5)
+
+    def test_database_query_view_cache_update_seq(self):
+        """Test Database query skips the view request while update_seq is unchanged."""
+        body = b'{"rows": [{"id": "doc1", "key": "a", "value": 1}]}'
+        mock_resource = Mock(base_url="http://localhost:5984/testdb")
+        mock_resource.get.return_value = (Mock(), {"update_seq": "5-a"})
+        mock_resource.return_value.post.return_value = (
+            Mock(status_code=200, headers={}, content=body), json.loads(body))
+
+        db = client.Database(mock_resource, "testdb",
+                             view_cache=ViewCache(validate="update_seq"))
+        for i in range(3):
+            assert db.query("test/view", keys=["a"], as_list=True) == [
+                {"id": "doc1", "key": "a", "value": 1}]
+        assert mock_resource.return_value.post.call_count == 1
+
+        db.query("test/view", keys=["b"], as_list=True)
+        assert mock_resource.return_value.post.call_count == 2
+
+        mock_resource.get.return_value = (Mock(), {"update_seq": "6-a"})
+        db.query("test/view", keys=["a"], as_list=True)
+        assert mock_resource.return_value.post.call_count == 3
+        assert db.view_cache.stats()["hits"] == 2
+
     def test_database_query_with_pagination(self):
         """Test Database query method with pagination."""
         mock_resource = Mock()
@@ -943,6 +1601,354 @@ class TestDatabase:
         assert len(result) == 1
         assert result[0]["id"] == "doc1"
 
+    def _view_resource(self, rows):
+        """Mock view resource applying couchdb keyset parameters to `rows`."""
+        requests_seen = []
+
+        def get(params=None, headers=None):
+            requests_seen.append(dict(params))
+            descending = params.get("descending") in (True, "true")
+            ordered = sorted(rows, key=lambda r: (r["key"], r["id"]), reverse=descending)
+            if "startkey" in params:
+                start = (json.loads(params["startkey"]), params.get("startkey_docid"))
+
+                def after(row):
+                    if start[1] is None:
+                        position, bound = row["key"], start[0]
+                    else:
+                        position, bound = (row["key"], row["id"]), start
+                    return position <= bound if descending else position >= bound
+                ordered = [row for row in ordered if after(row)]
+            skip = int(params.get("skip", 0))
+            return Mock(), {"rows": ordered[skip:skip + int(params["limit"])]}
+
+        mock_resource = Mock()
+        mock_resource.return_value.get.side_effect = get
+        return mock_resource, requests_seen
+
+    def test_database_query_paginate_keyset(self):
+        """Test pagination keysets on startkey and startkey_docid without repeating rows."""
+        rows = [{"id": "doc%d" % i, "key": [i // 3, "x"], "value": i} for i in range(10)]
+        rows.append({"id": "doc9", "key": [3, "x"], "value": 10})
+        mock_resource, requests_seen = self._view_resource(rows)
+
+        db = client.Database(mock_resource, "testdb")
+        result = db.query("test/view", pagesize=2, as_list=True)
+
+        assert [row["value"] for row in result] == list(range(11))
+        assert requests_seen[0] == {"limit": 3}
+        assert requests_seen[1] == {"limit": 3, "startkey": '[0, "x"]', "startkey_docid": "doc2"}
+
+    def test_database_query_paginate_duplicate_positions(self):
+        """Test rows emitted several times with the same key by a document."""
+        rows = [{"id": "doc1", "key": 1, "value": i} for i in range(5)]
+        rows.append({"id": "doc2", "key": 2, "value": 5})
+        mock_resource, requests_seen = self._view_resource(rows)
+
+        db = client.Database(mock_resource, "testdb")
+        result = db.query("test/view", pagesize=2, as_list=True, prefetch=False)
+
+        assert len(result) == 6
+        assert [row["id"] for row in result] == ["doc1"] * 5 + ["doc2"]
+        assert [r.get("skip") for r in requests_seen] == [None, 2, 4]
+
+    def test_database_query_paginate_descending_and_limit(self):
+        """Test pagination of descending views honours limit."""
+        rows = [{"id": "doc%d" % i, "key": i, "value": i} for i in range(10)]
+        mock_resource, requests_seen = self._view_resource(rows)
+
+        db = client.Database(mock_resource, "testdb")
+        result = db.query("test/view", pagesize=3, descending=True, limit=5, as_list=True)
+
+        assert [row["key"] for row in result] == [9, 8, 7, 6, 5]
+        assert [r["limit"] for r in requests_seen] == [4, 3]
+
+    def test_database_query_paginate_empty(self):
+        """Test pagination of an empty view."""
+        mock_resource, requests_seen = self._view_resource([])
+
+        db = client.Database(mock_resource, "testdb")
+        assert db.query("test/view", pagesize=3, as_list=True) == []
+
+    def test_database_query_paginate_keys(self):
+        """Test pagination of a keys request advances with skip."""
+        mock_resource = Mock()
+        mock_resource.return_value.post.side_effect = [
+            (Mock(), {"rows": [{"id": "a", "key": 1}, {"id": "b", "key": 2}, {"id": "c", "key": 3}]}),
+            (Mock(), {"rows": [{"id": "c", "key": 3}]}),
+        ]
+
+        db = client.Database(mock_resource, "testdb")
+        result = db.query("test/view", keys=[1, 2, 3], pagesize=2, as_list=True)
+
+        assert [row["id"] for row in result] == ["a", "b", "c"]
+        assert mock_resource.return_value.post.call_args_list[1][1]["params"] == {
+            "limit": 3, "skip": 2}
+
+    def test_database_query_paginate_prefetch(self):
+        """Test the next page is requested before the current one is consumed."""
+        rows = [{"id": "doc%d" % i, "key": i, "value": i} for i in range(4)]
+        mock_resource, requests_seen = self._view_resource(rows)
+        second_page = threading.Event()
+        get = mock_resource.return_value.get.side_effect
+
+        def tracking_get(**kwargs):
+            if requests_seen:
+                second_page.set()
+            return get(**kwargs)
+        mock_resource.return_value.get.side_effect = tracking_get
+
+        db = client.Database(mock_resource, "testdb")
+        result = db.query("test/view", pagesize=2)
+
+        assert next(result)["key"] == 0
+        assert second_page.wait(5)
+        assert [row["key"] for row in result] == [1, 2, 3]
+
+    def _partitioned_view_resource(self, rows):
+        """Mock view resource answering range, sampling and streamed requests."""
+        requests_seen = []
+
+        def get(params=None, headers=None, stream=False):
+            requests_seen.append(dict(params))
+            selected = sorted(rows, key=lambda r: (r["key"], r["id"]))
+            offset = 0
+            if "startkey" in params:
+                startkey = json.loads(params["startkey"])
+                offset = len([r for r in selected if r["key"] < startkey])
+                selected = [r for r in selected if r["key"] >= startkey]
+            if "endkey" in params:
+                endkey = json.loads(params["endkey"])
+                if params.get("inclusive_end") == "false":
+                    selected = [r for r in selected if r["key"] < endkey]
+                else:
+                    selected = [r for r in selected if r["key"] <= endkey]
+            skip = int(params.get("skip", 0))
+            limit = int(params.get("limit", len(selected)))
+            result = {"total_rows": len(rows), "offset": offset + skip,
+                      "rows": selected[skip:skip + limit]}
+            if not stream:
+                return Mock(), result
+            response = Mock()
+            response.iter_content.return_value = iter([json.dumps(result).encode()])
+            return response, None
+
+        mock_resource = Mock()
+        mock_resource.return_value.get.side_effect = get
+        return mock_resource, requests_seen
+
+    def test_database_query_partitioned_sampled(self):
+        """Test partitioned scans sample split points and keep view order."""
+        rows = [{"id": "doc%02d" % i, "key": i // 2, "value": i} for i in range(40)]
+        mock_resource, requests_seen = self._partitioned_view_resource(rows)
+
+        db = client.Database(mock_resource, "testdb")
+        result = db.query_partitioned("test/view", partitions=4, as_list=True)
+
+        assert result == rows
+        scans = [r for r in requests_seen if "limit" not in r]
+        assert set((r.get("startkey"), r.get("endkey")) for r in scans) == {
+            (None, "5"), ("5", "10"), ("10", "15"), ("15", None)}
+        assert all(r["inclusive_end"] == "false" for r in scans if "endkey" in r)
+
+    def test_database_query_partitioned_unordered(self):
+        """Test unordered partitioned scans with explicit split points."""
+        rows = [{"id": "doc%02d" % i, "key": i, "value": i} for i in range(30)]
+        mock_resource, requests_seen = self._partitioned_view_resource(rows)
+
+        db = client.Database(mock_resource, "testdb")
+        result = list(db.query_partitioned("test/view", split_points=[10, 20], ordered=False,
+                                           startkey=5, flat="value"))
+
+        assert sorted(result) == list(range(5, 30))
+        assert len(requests_seen) == 3
+
+    def test_database_query_partitioned_errors(self):
+        """Test partitioned scans propagate errors and reject unsupported options."""
+        mock_resource = Mock()
+        mock_resource.return_value.get.side_effect = exceptions.NotFound("missing")
+
+        db = client.Database(mock_resource, "testdb")
+        with pytest.raises(exceptions.NotFound):
+            list(db.query_partitioned("test/view", split_points=[1]))
+
+        with pytest.raises(ValueError):
+            db.query_partitioned("test/view", limit=10)
+
+    @pytest.mark.parametrize("option", [{"group": True}, {"group_level": 1}, {"reduce": True},
+                                        {"reduce": "true"}])
+    def test_database_query_partitioned_rejects_reduce(self, option):
+        """Test partitioned scans reject reduced queries."""
+        db = client.Database(Mock(), "testdb")
+
+        with pytest.raises(ValueError):
+            db.query_partitioned("test/view", split_points=[1], **option)
+
+    def test_database_query_partitioned_disables_reduce(self):
+        """Test every partition of a view with a reduce function is scanned unreduced."""
+        rows = [{"id": "doc%02d" % i, "key": i, "value": i} for i in range(30)]
+        mock_resource, requests_seen = self._partitioned_view_resource(rows)
+
+        db = client.Database(mock_resource, "testdb")
+        result = db.query_partitioned("test/view", split_points=[10, 20], as_list=True)
+        assert result == rows
+        assert [r["reduce"] for r in requests_seen] == ["false"] * 3
+
+        requests_seen.clear()
+        db.query_partitioned("test/view", partitions=2, reduce=False, as_list=True)
+        assert all(r["reduce"] == "false" for r in requests_seen)
+
+    def test_database_query_many(self):
+        """Test several view queries are sent in a single request."""
+        mock_resource = Mock()
+        mock_resource.return_value.post.return_value = (Mock(), {"results": [
+            {"total_rows": 3, "offset": 0, "rows": [{"id": "doc1", "key": 1, "value": "a"}]},
+            {"total_rows": 3, "offset": 1, "rows": [{"id": "doc2", "key": 2, "value": "b"},
+                                                   {"id": "doc3", "key": 3, "value": "c"}]},
+        ]})
+
+        db = client.Database(mock_resource, "testdb")
+        result = db.query_many("test/view", [{"key": 1}, {"startkey": 2, "limit": 2}], flat="value")
+
+        assert [list(rows) for rows in result] == [["a"], ["b", "c"]]
+        mock_resource.assert_called_once_with("_design", "test", "_view", "view")
+        args, kwargs = mock_resource.return_value.post.call_args
+        assert args == ("queries",)
+        assert json.loads(kwargs["data"]) == {"queries": [{"key": 1}, {"startkey": 2, "limit": 2}]}
+
+    def test_database_query_many_fallback(self):
+        """Test queries are sent one by one when the endpoint is missing."""
+        mock_resource = Mock()
+        view = mock_resource.return_value
+
+        def post(*args, **kwargs):
+            if args == ("queries",):
+                raise exceptions.NotFound("missing")
+            keys = json.loads(kwargs["data"])["keys"]
+            return Mock(), {"rows": [{"id": k, "key": k} for k in keys]}
+
+        view.post.side_effect = post
+        view.get.side_effect = lambda params=None, headers=None: (
+            Mock(), {"rows": [{"id": "doc1", "key": json.loads(params["key"])}]})
+
+        db = client.Database(mock_resource, "testdb")
+        result = db.query_many("_all_docs", [{"key": "doc1"}, {"keys": ["doc2", "doc3"]}],
+                               flat="id", as_list=True)
+
+        assert result == [["doc1"], ["doc2", "doc3"]]
+        mock_resource.assert_called_with("_all_docs")
+        assert view.post.call_args_list[0][0] == ("queries",)
+        assert view.get.call_args[1]["params"] == {"key": '"doc1"'}
+
+        # The endpoint is not tried again.
+        view.post.side_effect = None
+        view.post.return_value = (Mock(), {"rows": []})
+        assert db.query_many("_all_docs", [{"keys": []}], as_list=True) == [[]]
+        assert view.post.call_args[0] == ()
+
+    def _find_resource(self, docs):
+        """Mock _find endpoint returning `docs` in pages linked by bookmarks."""
+        requests_seen = []
+
+        def post(path, data=None):
+            query = json.loads(data)
+            requests_seen.append(query)
+            start = int(query.get("bookmark", query.get("skip", 0)))
+            page = docs[start:start + query["limit"]]
+            result = {"docs": page, "bookmark": str(start + len(page))}
+            if query.get("execution_stats"):
+                result["execution_stats"] = {"total_docs_examined": len(page),
+                                             "results_returned": len(page)}
+            return Mock(), result
+
+        mock_resource = Mock()
+        mock_resource.post.side_effect = post
+        return mock_resource, requests_seen
+
+    @pytest.mark.parametrize("prefetch", [True, False])
+    def test_database_find_bookmark_pages(self, prefetch):
+        """Test find follows bookmarks lazily and sums execution stats."""
+        docs = [{"_id": "doc%02d" % i, "n": i} for i in range(25)]
+        mock_resource, requests_seen = self._find_resource(docs)
+
+        db = client.Database(mock_resource, "testdb")
+        result = db.find({"n": {"$gte": 0}}, fields=["_id", "n"], sort=["n"], pagesize=10,
+                         prefetch=prefetch, execution_stats=True)
+
+        assert list(result) == docs
+        assert [r.get("bookmark") for r in requests_seen] == [None, "10", "20"]
+        assert requests_seen[0] == {"selector": {"n": {"$gte": 0}}, "fields": ["_id", "n"],
+                                    "sort": ["n"], "execution_stats": True, "limit": 10}
+        assert result.bookmark == "25"
+        assert result.execution_stats == {"total_docs_examined": 25, "results_returned": 25}
+
+    def test_database_find_limit_and_skip(self):
+        """Test find stops at limit and only skips on the first page."""
+        docs = [{"_id": "doc%02d" % i} for i in range(25)]
+        mock_resource, requests_seen = self._find_resource(docs)
+
+        db = client.Database(mock_resource, "testdb")
+        result = list(db.find({}, skip=5, limit=12, pagesize=10, wrapper=lambda d: d["_id"]))
+
+        assert result == ["doc%02d" % i for i in range(5, 17)]
+        assert [(r.get("skip"), r["limit"]) for r in requests_seen] == [(5, 10), (None, 2)]
+        assert list(db.find({}, limit=0)) == []
+
+    def test_database_find_error(self):
+        """Test find raises server errors while iterating."""
+        mock_resource = Mock()
+        mock_resource.post.side_effect = exceptions.BadRequest("invalid selector")
+
+        db = client.Database(mock_resource, "testdb")
+        with pytest.raises(exceptions.BadRequest):
+            list(db.find({"$bad": 1}))
+
+    def test_database_indexes(self):
+        """Test mango index management helpers."""
+        mock_resource = Mock()
+        mock_resource.post.return_value = (Mock(), {"result": "created", "id": "_design/idx",
+                                                    "name": "by-year"})
+        mock_resource.get.return_value = (Mock(), {"total_rows": 1, "indexes": [
+            {"ddoc": None, "name": "_all_docs", "type": "special",
+             "def": {"fields": [{"_id": "asc"}]}}]})
+        mock_resource.return_value.delete.return_value = (Mock(), {"ok": True})
+
+        db = client.Database(mock_resource, "testdb")
+        result = db.create_index(["year"], name="by-year", ddoc="idx",
+                                 partial_filter_selector={"type": "movie"})
+
+        assert result["result"] == "created"
+        args, kwargs = mock_resource.post.call_args
+        assert args == ("_index",)
+        assert json.loads(kwargs["data"]) == {
+            "index": {"fields": ["year"], "partial_filter_selector": {"type": "movie"}},
+            "type": "json", "name": "by-year", "ddoc": "idx"}
+
+        assert db.list_indexes()[0]["name"] == "_all_docs"
+        mock_resource.get.assert_called_with("_index")
+
+        assert db.delete_index("_design/idx", "by-year") == {"ok": True}
+        mock_resource.assert_called_with("_index", "idx", "json", "by-year")
+
+    def test_database_query_many_errors(self):
+        """Test only unsupported endpoint errors fall back to individual queries."""
+        mock_resource = Mock()
+        view = mock_resource.return_value
+        view.get.return_value = (Mock(), {"rows": [{"id": "doc1", "key": 1}]})
+
+        db = client.Database(mock_resource, "testdb")
+        view.post.side_effect = exceptions.GenericError(
+            {"error": "unknown_error", "reason": "service unavailable"})
+        with pytest.raises(exceptions.GenericError):
+            db.query_many("test/view", [{"key": 1}])
+        view.get.assert_not_called()
+        assert db._multi_queries is None
+
+        view.post.side_effect = exceptions.GenericError(
+            {"error": "method_not_allowed", "reason": "Only GET,HEAD allowed"})
+        assert db.query_many("test/view", [{"key": 1}], flat="id", as_list=True) == [["doc1"]]
+        assert db._multi_queries is False
+
     def test_database_query_invalid_pagesize(self):
         """Test Database query method with invalid pagesize."""
         db = client.Database(Mock(), "testdb")
@@ -975,6 +1981,40 @@ class TestDatabase:
         assert len(result) == 1
         assert result[0]["id"] == "doc1"
 
+    def test_database_query_stream(self):
+        """Test Database query method yields rows before the body is consumed."""
+        chunks = [
+            b'{"total_rows":2,"offset":0,"rows":[{"id":"doc1","key":"a","value":1},',
+            b'{"id":"doc2","key":"b","value":2}]}'
+        ]
+        consumed = []
+
+        def iter_content(chunk_size):
+            for chunk in chunks:
+                consumed.append(chunk)
+                yield chunk
+
+        mock_resource = Mock()
+        mock_response = Mock()
+        mock_response.iter_content.side_effect = iter_content
+        mock_resource.return_value.get.return_value = (mock_response, None)
+
+        db = client.Database(mock_resource, "testdb")
+        result = db.query("test/view", stream=True, flat="value")
+
+        assert next(result) == 1
+        assert len(consumed) == 1
+        assert list(result) == [2]
+        mock_resource.return_value.get.assert_called_once_with(params={}, headers=None, stream=True)
+        mock_response.close.assert_called_once_with()
+
+    def test_database_query_stream_with_pagesize(self):
+        """Test Database query method rejects stream combined with pagesize."""
+        db = client.Database(Mock(), "testdb")
+
+        with pytest.raises(ValueError):
+            db.query("test/view", stream=True, pagesize=10)
+
     def test_database_changes_list_success(self):
         """Test Database changes_list method success."""
         mock_resource = Mock()
@@ -1067,4 +2107,72 @@ class TestDatabase:
             call_args = mock_listen.call_args
             assert call_args[1]['feed'] == "longpoll"
             assert call_args[1]['since'] == 100
-            assert call_args[1]['limit'] == 50
\ No newline at end of file
+            assert call_args[1]['limit'] == 50
+
+
+class TestStreamResponse:
+    """Test _StreamResponse proxy."""
+
+    def _response(self, body, headers=None):
+        """Build a stream response the way requests does, leaving decoding to the reader."""
+        response = requests.Response()
+        response.status_code = 200
+        response.headers.update(headers or {})
+        response.raw = urllib3.HTTPResponse(body=io.BytesIO(body), headers=headers,
+                                            preload_content=False, decode_content=False)
+        return client._StreamResponse(response)
+
+    def test_iter_content_default_chunk_size(self):
+        """Test iter_content reads 64KiB chunks by default."""
+        stream = self._response(b"x" * (client.DEFAULT_CHUNK_SIZE + 10))
+        assert [len(chunk) for chunk in stream.iter_content()] == [
+            client.DEFAULT_CHUNK_SIZE, 10]
+
+    def test_readinto(self):
+        """Test readinto fills caller buffers and memoryview slices."""
+        stream = self._response(b"Hello, World!")
+        buffer = bytearray(8)
+
+        assert stream.readinto(buffer) == 8
+        assert buffer == b"Hello, W"
+        assert stream.readinto(memoryview(buffer)[2:]) == 5
+        assert buffer == b"Heorld!W"
+        assert stream.readinto(buffer) == 0
+
+    def test_readinto_identity_reads_into_buffer(self):
+        """Test uncompressed content is read into the buffer without raw.read allocations."""
+        content = bytes(range(256)) * 100
+        stream = self._response(content)
+        target = io.BytesIO()
+
+        with patch.object(stream.raw, "read", side_effect=AssertionError("raw.read called")):
+            assert stream.write_to(target, buffer=bytearray(1000)) == len(content)
+        assert target.getvalue() == content
+
+    def test_write_to_file_and_fd(self, tmp_path):
+        """Test write_to copies the content to a file object and a file descriptor."""
+        content = bytes(range(256)) * 100
+        target = io.BytesIO()
+        assert self._response(content).write_to(target, chunk_size=1000) == len(content)
+        assert target.getvalue() == content
+
+        path = tmp_path / "out.bin"
+        fd = os.open(str(path), os.O_WRONLY | os.O_CREAT)
+        try:
+            written = self._response(content).write_to(fd, buffer=bytearray(4096))
+        finally:
+            os.close(fd)
+        assert written == len(content)
+        assert path.read_bytes() == content
+
+    def test_write_to_decodes_compressed_content(self):
+        """Test write_to writes the decoded content of a gzip response, like iter_content."""
+        content = bytes(range(256)) * 1000
+        body = gzip.compress(content)
+        target = io.BytesIO()
+
+        assert self._response(body, headers={"content-encoding": "gzip"}).write_to(
+            target, chunk_size=1000) == len(content)
+        assert target.getvalue() == content
+        stream = self._response(body, headers={"content-encoding": "gzip"})
+        assert b"".join(stream.iter_content()) == content
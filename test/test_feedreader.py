@@ -3,6 +3,8 @@ Unit tests for pycouchdb.feedreader module.
 """
 
 import pytest
+import requests
+from unittest.mock import Mock
 from pycouchdb import feedreader, exceptions
 
 
@@ -183,4 +185,68 @@ class TestFeedReaderIntegration:
         
         # Should propagate the exception
         with pytest.raises(ValueError, match="Callback failed"):
-            reader.on_message({"test": "message"})
\ No newline at end of file
+            reader.on_message({"test": "message"})
+
+
+class TestInvalidationFeedReader:
+    """Test InvalidationFeedReader class."""
+
+    def test_on_message_invalidates_and_tracks_seq(self):
+        """Test changes invalidate their documents and advance last_seq."""
+        mock_db = Mock()
+        mock_db.doc_cache = None
+        reader = feedreader.InvalidationFeedReader(mock_db, since="1-a")
+
+        reader.on_message({"seq": "2-b", "id": "doc1", "changes": [{"rev": "2-x"}]})
+        reader.on_message({"last_seq": "3-c"})
+
+        mock_db.invalidate.assert_called_once_with("doc1")
+        assert reader.last_seq == "3-c"
+        assert reader.processed == 2
+
+    def test_refresh_only_cached_documents(self):
+        """Test refresh only fetches again documents that are cached."""
+        mock_db = Mock()
+        mock_db.doc_cache = {"testdb/doc1"}
+        mock_db._doc_key = lambda doc_id: "testdb/" + doc_id
+        reader = feedreader.InvalidationFeedReader(mock_db, since="0", refresh=True)
+
+        reader.on_message({"seq": "1", "id": "doc1", "changes": [{"rev": "2-x"}]})
+        reader.on_message({"seq": "2", "id": "doc2", "changes": [{"rev": "1-x"}]})
+        reader.on_message({"seq": "3", "id": "doc1", "changes": [{"rev": "3-x"}],
+                           "deleted": True})
+
+        mock_db.get.assert_called_once_with("doc1")
+        assert mock_db.invalidate.call_count == 3
+
+    def test_resumes_from_last_seq_after_error(self):
+        """Test the reader reconnects from the last processed seq."""
+        mock_db = Mock()
+        mock_db.doc_cache = None
+        mock_db.config.return_value = {"update_seq": "10-a"}
+        reader = feedreader.InvalidationFeedReader(mock_db, reconnect_delay=0)
+        calls = []
+
+        def changes_feed(feed_reader, **kwargs):
+            calls.append(kwargs["since"])
+            if len(calls) == 1:
+                feed_reader.on_message({"seq": "11-b", "id": "doc1", "changes": []})
+                raise requests.ConnectionError("dropped")
+            reader._stopped.set()
+
+        mock_db.changes_feed.side_effect = changes_feed
+        reader.start()
+        reader._thread.join(5)
+
+        assert calls == ["10-a", "11-b"]
+        assert not reader.running
+        assert reader.reconnects == 1
+        assert isinstance(reader.last_error, requests.ConnectionError)
+
+    def test_stop_exits_on_heartbeat(self):
+        """Test a stopped reader exits on the next heartbeat."""
+        reader = feedreader.InvalidationFeedReader(Mock(), since="0")
+        reader.stop()
+
+        with pytest.raises(exceptions.FeedReaderExited):
+            reader.on_heartbeat()
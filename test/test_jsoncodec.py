@@ -0,0 +1,107 @@
+"""
+Unit tests for pycouchdb.jsoncodec module.
+"""
+
+import json
+import pytest
+from unittest.mock import Mock, patch
+from pycouchdb import client, jsoncodec, utils
+
+
+DOCUMENT = {"_id": "doc1", "name": "café", "values": [1, 2.5, None, True],
+            "nested": {"key": "value"}}
+
+
+class TestGetCodec:
+    """Test codec resolution."""
+
+    def test_default_is_stdlib(self):
+        """Test None resolves to the shared stdlib codec."""
+        assert jsoncodec.get_codec() is jsoncodec.default_codec
+        assert jsoncodec.get_codec().name == "json"
+
+    def test_by_name(self):
+        """Test resolving a codec by name."""
+        assert isinstance(jsoncodec.get_codec("json"), jsoncodec.JsonCodec)
+
+    def test_unknown_name(self):
+        """Test an unknown codec name raises ValueError."""
+        with pytest.raises(ValueError, match="Unknown json codec"):
+            jsoncodec.get_codec("yaml")
+
+    def test_instance_is_returned_as_is(self):
+        """Test custom codec objects are used untouched."""
+        codec = Mock()
+        assert jsoncodec.get_codec(codec) is codec
+
+    def test_auto_falls_back_to_stdlib(self):
+        """Test auto detection when no fast backend is installed."""
+        def missing():
+            raise ImportError()
+
+        with patch.dict(jsoncodec.CODECS, {"orjson": missing, "msgspec": missing,
+                                           "ujson": missing}):
+            assert jsoncodec.get_codec("auto").name == "json"
+
+
+class TestCodecs:
+    """Test every available backend round trips documents as bytes."""
+
+    @pytest.mark.parametrize("name", ["json", "orjson", "msgspec", "ujson"])
+    def test_round_trip(self, name):
+        """Test encoding to bytes and decoding bytes and str."""
+        try:
+            codec = jsoncodec.get_codec(name)
+        except ImportError:
+            pytest.skip("{0} is not installed".format(name))
+
+        data = codec.dumps(DOCUMENT)
+
+        assert isinstance(data, bytes)
+        assert json.loads(data) == DOCUMENT
+        assert codec.loads(data) == DOCUMENT
+        assert codec.loads(data.decode("utf-8")) == DOCUMENT
+
+
+class TestCodecIntegration:
+    """Test the codec is used by the client."""
+
+    def test_server_propagates_codec(self):
+        """Test the server codec reaches databases and resources."""
+        codec = jsoncodec.JsonCodec()
+        with patch('pycouchdb.client.Resource') as mock_resource_class:
+            mock_resource = Mock()
+            mock_resource.head.return_value = (Mock(status_code=200), None)
+            mock_resource_class.return_value = mock_resource
+
+            server = client.Server(codec=codec)
+            db = server.database("testdb")
+
+        assert mock_resource_class.call_args[1]["codec"] is codec
+        assert db.codec is codec
+
+    def test_database_save_uses_codec(self):
+        """Test Database.save encodes the document with its codec."""
+        codec = Mock()
+        codec.dumps.return_value = b'{}'
+        mock_resource = Mock()
+        mock_resource.return_value.put.return_value = (
+            Mock(status_code=201), {"ok": True, "id": "doc1", "rev": "1-abc"})
+
+        db = client.Database(mock_resource, "testdb", codec=codec)
+        db.save({"_id": "doc1"})
+
+        codec.dumps.assert_called_once()
+        assert codec.dumps.call_args[0][0]["_id"] == "doc1"
+        assert mock_resource.return_value.put.call_args[1]["data"] == b'{}'
+
+    def test_as_json_uses_codec(self):
+        """Test utils.as_json decodes with the given codec."""
+        codec = Mock()
+        codec.loads.return_value = {"ok": True}
+        response = Mock()
+        response.headers = {"content-type": "application/json"}
+        response.content = b'{"ok": true}'
+
+        assert utils.as_json(response, codec) == {"ok": True}
+        codec.loads.assert_called_once()
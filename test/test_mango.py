@@ -0,0 +1,78 @@
+"""
+Unit tests for pycouchdb.mango module.
+"""
+
+import json
+from unittest.mock import Mock
+from pycouchdb import client, mango
+
+
+class TestMango:
+    """Test mango index advisor helpers."""
+
+    def test_selector_fields(self):
+        selector = {"type": "movie", "year": {"$gte": 2000, "$lt": 2010},
+                    "rating": {"$eq": 5}, "tags": {"$elemMatch": {"$eq": "x"}},
+                    "$or": [{"genre": "war"}], "$and": [{"year": {"$lte": 2005}}]}
+
+        assert mango.selector_fields(selector) == (["type", "rating"], ["year"])
+
+    def test_selector_fields_equality_wins_over_range(self):
+        selector = {"$and": [{"n": {"$gt": 1}}, {"n": 3}]}
+
+        assert mango.selector_fields(selector) == (["n"], [])
+
+    def test_suggest_index_order(self):
+        selector = {"year": {"$gt": 2000}, "type": "movie", "director": {"name": "x"}}
+        sort = [{"year": "asc"}, "title"]
+
+        assert mango.suggest_index(selector, sort) == {
+            "fields": ["type", "director.name", "year", "title"]}
+
+    def test_suggest_index_nothing_indexable(self):
+        assert mango.suggest_index({"$or": [{"a": 1}, {"b": 2}]}) is None
+        assert mango.suggest_index({}, sort=["a"]) == {"fields": ["a"]}
+
+    def test_is_full_scan(self):
+        assert mango.is_full_scan({"ddoc": None, "name": "_all_docs", "type": "special"})
+        assert not mango.is_full_scan({"ddoc": "_design/idx", "name": "by-type", "type": "json"})
+
+
+class TestDatabaseExplain:
+    """Test Database.explain and Database.advise_index."""
+
+    def _database(self, index):
+        mock_resource = Mock()
+        mock_resource.post.return_value = (Mock(), {"dbname": "testdb", "index": index,
+                                                    "selector": {}, "limit": 25})
+        return client.Database(mock_resource, "testdb"), mock_resource
+
+    def test_explain(self):
+        db, mock_resource = self._database({"name": "_all_docs", "type": "special"})
+
+        result = db.explain({"type": "movie"}, sort=["year"], limit=10)
+
+        assert result["index"]["name"] == "_all_docs"
+        args, kwargs = mock_resource.post.call_args
+        assert args == ("_explain",)
+        assert json.loads(kwargs["data"]) == {"selector": {"type": "movie"},
+                                              "sort": ["year"], "limit": 10}
+
+    def test_advise_index_full_scan(self):
+        db, mock_resource = self._database({"ddoc": None, "name": "_all_docs",
+                                            "type": "special"})
+
+        advice = db.advise_index({"type": "movie", "year": {"$gt": 2000}})
+
+        assert advice["full_scan"]
+        assert advice["suggested_index"] == {"fields": ["type", "year"]}
+        assert advice["index"]["name"] == "_all_docs"
+
+    def test_advise_index_indexed(self):
+        db, mock_resource = self._database({"ddoc": "_design/idx", "name": "by-type",
+                                            "type": "json", "def": {"fields": [{"type": "asc"}]}})
+
+        advice = db.advise_index({"type": "movie"})
+
+        assert not advice["full_scan"]
+        assert advice["index"]["name"] == "by-type"
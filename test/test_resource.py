@@ -4,10 +4,43 @@ Unit tests for pycouchdb.resource module.
 
 import pytest
 import json
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from socketserver import ThreadingMixIn
 from unittest.mock import Mock, patch, MagicMock
 from pycouchdb import resource, exceptions
 
 
+class _ThreadingHTTPServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+
+class _JsonHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        body = b'{"ok": true}'
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def http_server():
+    """Run a local keep-alive http server answering json."""
+    server = _ThreadingHTTPServer(("127.0.0.1", 0), _JsonHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield "http://127.0.0.1:{0}/".format(server.server_address[1])
+    server.shutdown()
+    server.server_close()
+
+
 class TestResource:
     """Test Resource class."""
 
@@ -357,4 +390,51 @@ class TestResource:
             
             mock_session_instance.request.assert_called_with("GET", "http://localhost:5984/test", 
                                                            stream=False, data=None, params=params, 
-                                                           headers={'Accept': 'application/json'})
\ No newline at end of file
+                                                           headers={'Accept': 'application/json'})
+
+
+class TestPoolAdapter:
+    """Test connection pool configuration and counters."""
+
+    def test_resource_mounts_pool_adapter(self):
+        """Test Resource mounts a PoolAdapter with the given sizes."""
+        res = resource.Resource("http://localhost:5984/", pool_connections=4,
+                                pool_maxsize=64, pool_block=True)
+
+        adapter = res.session.get_adapter("http://localhost:5984/")
+        assert isinstance(adapter, resource.PoolAdapter)
+        assert res.session.get_adapter("https://localhost:6984/") is adapter
+
+        stats = res.pool_stats()
+        assert stats["pool_connections"] == 4
+        assert stats["pool_maxsize"] == 64
+        assert stats["pool_block"] is True
+        assert stats["requests"] == 0
+
+    def test_resource_keep_alive_disabled(self):
+        """Test keep_alive=False asks the server to close connections."""
+        res = resource.Resource("http://localhost:5984/", keep_alive=False)
+
+        assert res.session.headers["connection"] == "close"
+
+    def test_pool_stats_with_foreign_session(self):
+        """Test pool_stats returns None for user supplied sessions."""
+        session = Mock()
+        session.get_adapter.return_value = Mock()
+        res = resource.Resource("http://localhost:5984/", session=session)
+
+        assert res.pool_stats() is None
+
+    def test_pool_stats_counts_connections(self, http_server):
+        """Test connections are reused and counted across child resources."""
+        res = resource.Resource(http_server)
+
+        for i in range(5):
+            res("db", "doc{0}".format(i)).get()
+
+        stats = res.pool_stats()
+        assert stats["requests"] == 5
+        assert stats["in_flight"] == 0
+        assert stats["max_in_flight"] == 1
+        assert stats["connections"] == 1
+        assert stats["idle"] == 1
@@ -0,0 +1,180 @@
+"""
+Unit tests for pycouchdb.retry module and retries in Resource.request.
+"""
+
+import pytest
+import requests
+from unittest.mock import Mock, patch
+from pycouchdb import resource, exceptions
+from pycouchdb.retry import RetryPolicy
+
+
+def make_response(status_code, body=b'{"ok": true}', headers=None):
+    response = Mock()
+    response.status_code = status_code
+    response.headers = {'content-type': 'application/json'}
+    response.headers.update(headers or {})
+    response.content = body
+    return response
+
+
+@pytest.fixture
+def no_sleep():
+    with patch('pycouchdb.resource.time.sleep') as mock_sleep:
+        yield mock_sleep
+
+
+class TestRetryPolicy:
+    """Test RetryPolicy class."""
+
+    def test_idempotency(self):
+        """Test which requests are considered safe to repeat."""
+        policy = RetryPolicy()
+
+        assert policy.is_idempotent("GET")
+        assert policy.is_idempotent("head")
+        assert policy.is_idempotent("PUT", params={"rev": "1-abc"})
+        assert policy.is_idempotent("PUT", headers={"If-Match": "1-abc"})
+        assert not policy.is_idempotent("PUT")
+        assert not policy.is_idempotent("POST")
+        assert not policy.is_idempotent("DELETE", params={"rev": "1-abc"})
+
+    def test_exponential_backoff(self):
+        """Test delays double and are capped without jitter."""
+        policy = RetryPolicy(backoff_factor=0.5, max_backoff=3, jitter=False)
+
+        assert [policy.backoff(i) for i in range(1, 5)] == [0.5, 1, 2, 3]
+
+    def test_jitter(self):
+        """Test jittered delays stay within the backoff."""
+        policy = RetryPolicy(backoff_factor=1, jitter=True)
+
+        for i in range(20):
+            assert 0 <= policy.backoff(3) <= 4
+
+    def test_retry_after(self):
+        """Test Retry-After extends the delay up to max_backoff."""
+        policy = RetryPolicy(backoff_factor=0.1, max_backoff=5, jitter=False)
+
+        assert policy.backoff(1, retry_after=2) == 2
+        assert policy.backoff(1, retry_after=60) == 5
+
+    def test_max_attempts(self):
+        """Test retries stop after max_attempts."""
+        policy = RetryPolicy(max_attempts=2, jitter=False)
+
+        assert policy.next_delay(1, 0) is not None
+        assert policy.next_delay(2, 0) is None
+        assert policy.stats() == {"retries": 1, "recovered": 0, "exhausted": 1}
+
+    def test_deadline(self):
+        """Test retries stop when the deadline would be exceeded."""
+        policy = RetryPolicy(max_attempts=10, backoff_factor=1, jitter=False,
+                             deadline=1.5)
+
+        with patch('pycouchdb.retry.time.monotonic', return_value=100.0):
+            assert policy.next_delay(1, started=100.0) == 1
+            assert policy.next_delay(2, started=100.0) is None
+
+
+class TestResourceRetry:
+    """Test Resource.request with a retry policy."""
+
+    def test_retry_on_transient_status(self, no_sleep):
+        """Test a 503 is retried and the request succeeds."""
+        policy = RetryPolicy(max_attempts=3, jitter=False)
+        session = Mock()
+        failed = make_response(503, b'{"error": "unavailable"}')
+        session.request.side_effect = [failed, make_response(200)]
+
+        res = resource.Resource("http://localhost:5984/", session=session,
+                                retry=policy)
+        response, result = res.get("doc")
+
+        assert result == {"ok": True}
+        assert session.request.call_count == 2
+        failed.close.assert_called_once_with()
+        no_sleep.assert_called_once_with(0.1)
+        assert policy.stats() == {"retries": 1, "recovered": 1, "exhausted": 0}
+
+    def test_retry_on_connection_error(self, no_sleep):
+        """Test connection errors are retried."""
+        policy = RetryPolicy(max_attempts=3)
+        session = Mock()
+        session.request.side_effect = [requests.ConnectionError(),
+                                       requests.Timeout(),
+                                       make_response(200)]
+
+        res = resource.Resource("http://localhost:5984/", session=session,
+                                retry=policy)
+        response, result = res.head("doc")
+
+        assert session.request.call_count == 3
+        assert policy.stats()["retries"] == 2
+
+    def test_retries_exhausted(self, no_sleep):
+        """Test the last error surfaces once attempts are exhausted."""
+        policy = RetryPolicy(max_attempts=2)
+        session = Mock()
+        session.request.return_value = make_response(500, b'{"error": "unknown"}')
+
+        res = resource.Resource("http://localhost:5984/", session=session,
+                                retry=policy)
+
+        with pytest.raises(exceptions.GenericError):
+            res.get("doc")
+
+        assert session.request.call_count == 2
+        assert policy.stats()["exhausted"] == 1
+
+    def test_non_idempotent_not_retried(self, no_sleep):
+        """Test POST and PUT without rev are not retried."""
+        policy = RetryPolicy(max_attempts=3)
+        session = Mock()
+        session.request.side_effect = requests.ConnectionError()
+
+        res = resource.Resource("http://localhost:5984/", session=session,
+                                retry=policy)
+
+        with pytest.raises(requests.ConnectionError):
+            res.post("_bulk_docs", data=b'{}')
+        with pytest.raises(requests.ConnectionError):
+            res.put("doc", data=b'{}')
+
+        assert session.request.call_count == 2
+        no_sleep.assert_not_called()
+
+    def test_idempotent_override(self, no_sleep):
+        """Test callers can declare a request idempotent."""
+        policy = RetryPolicy(max_attempts=2)
+        session = Mock()
+        session.request.side_effect = [requests.ConnectionError(),
+                                       make_response(201)]
+
+        res = resource.Resource("http://localhost:5984/", session=session,
+                                retry=policy)
+        res.put("doc", data=b'{"_rev": "1-abc"}', idempotent=True)
+
+        assert session.request.call_count == 2
+
+    def test_stream_body_not_retried(self, no_sleep):
+        """Test requests with a generator body are never replayed."""
+        policy = RetryPolicy(max_attempts=3)
+        session = Mock()
+        session.request.side_effect = requests.ConnectionError()
+
+        res = resource.Resource("http://localhost:5984/", session=session,
+                                retry=policy)
+
+        with pytest.raises(requests.ConnectionError):
+            res.put("doc/file", data=iter([b"a"]), params={"rev": "1-abc"})
+
+        assert session.request.call_count == 1
+
+    def test_child_resources_share_policy(self):
+        """Test resources created with __call__ keep the policy."""
+        policy = RetryPolicy()
+        res = resource.Resource("http://localhost:5984/", session=Mock(),
+                                retry=policy)
+
+        assert res("db", "doc").retry is policy
@@ -5,7 +5,7 @@ Unit tests for pycouchdb.client.Server class.
 import pytest
 import json
 from unittest.mock import Mock, patch, MagicMock
-from pycouchdb import client, exceptions
+from pycouchdb import client, exceptions, jsoncodec
 
 
 class TestServer:
@@ -21,7 +21,13 @@ class TestServer:
                 True,  # full_commit as positional argument
                 credentials=None,
                 authmethod="basic",
-                verify=False
+                verify=False,
+                codec=jsoncodec.default_codec,
+                pool_connections=10,
+                pool_maxsize=10,
+                pool_block=False,
+                keep_alive=True,
+                retry=None
             )
 
     def test_server_initialization_custom_url(self):
@@ -34,7 +40,13 @@ class TestServer:
                 True,  # full_commit as positional argument
                 credentials=None,
                 authmethod="basic",
-                verify=False
+                verify=False,
+                codec=jsoncodec.default_codec,
+                pool_connections=10,
+                pool_maxsize=10,
+                pool_block=False,
+                keep_alive=True,
+                retry=None
             )
 
     def test_server_initialization_with_credentials(self):
@@ -48,7 +60,13 @@ class TestServer:
                     True,  # full_commit as positional argument
                     credentials=("user", "pass"),
                     authmethod="basic",
-                    verify=False
+                    verify=False,
+                    codec=jsoncodec.default_codec,
+                    pool_connections=10,
+                    pool_maxsize=10,
+                    pool_block=False,
+                    keep_alive=True,
+                    retry=None
                 )
 
     def test_server_initialization_with_verify(self):
@@ -61,7 +79,13 @@ class TestServer:
                 True,  # full_commit as positional argument
                 credentials=None,
                 authmethod="basic",
-                verify=True
+                verify=True,
+                codec=jsoncodec.default_codec,
+                pool_connections=10,
+                pool_maxsize=10,
+                pool_block=False,
+                keep_alive=True,
+                retry=None
             )
 
     def test_server_repr(self):
@@ -392,6 +416,7 @@ class TestServerHelperFunctions:
     def test_listen_feed_with_callable(self):
         """Test _listen_feed with callable feed reader."""
         mock_object = Mock()
+        mock_object.codec = jsoncodec.default_codec
         mock_resource = Mock()
         mock_object.resource.return_value = mock_resource
         
@@ -430,6 +455,7 @@ class TestServerHelperFunctions:
     def test_listen_feed_with_feed_reader_class(self):
         """Test _listen_feed with BaseFeedReader class."""
         mock_object = Mock()
+        mock_object.codec = jsoncodec.default_codec
         mock_resource = Mock()
         mock_object.resource.return_value = mock_resource
         
@@ -108,6 +108,69 @@ class TestUtils:
         with pytest.raises(json.JSONDecodeError):  # json.loads raises JSONDecodeError for invalid JSON
             utils.as_json(response)
 
+    def test_as_json_empty_body(self):
+        """Test as_json returns an empty string for empty bodies."""
+        class MockResponse:
+            headers = {'content-type': 'application/json', 'content-length': '0'}
+
+            @property
+            def content(self):
+                raise AssertionError("body should not be read")
+
+        assert utils.as_json(MockResponse()) == ''
+
+    @pytest.mark.parametrize("codec_name", ["msgspec", "orjson"])
+    @pytest.mark.parametrize("payload", ["bulk_docs", "all_docs"])
+    def test_as_json_allocation(self, codec_name, payload):
+        """Benchmark transient allocations of as_json on large payloads.
+
+        The body is handed to the codec as bytes, so on top of what the
+        codec itself needs no str copy of the body is allocated. The
+        previous decode-then-loads implementation added roughly one body
+        size to the peak. orjson is part of the dev extras, msgspec is
+        only benchmarked when installed.
+        """
+        import tracemalloc
+        from pycouchdb import jsoncodec
+
+        try:
+            codec = jsoncodec.get_codec(codec_name)
+        except ImportError:
+            pytest.skip("{0} is not installed".format(codec_name))
+
+        if payload == "bulk_docs":
+            body = [{"ok": True, "id": "doc{0}".format(i), "rev": "1-" + "a" * 32}
+                    for i in range(20000)]
+        else:
+            body = {"total_rows": 20000, "offset": 0, "rows": [
+                {"id": "doc{0}".format(i), "key": "doc{0}".format(i),
+                 "value": {"rev": "1-abc"}, "doc": {"_id": "doc{0}".format(i), "name": "x" * 50}}
+                for i in range(20000)]}
+
+        class MockResponse:
+            headers = {'content-type': 'application/json'}
+            content = json.dumps(body).encode('utf-8')
+
+        response = MockResponse()
+        size = len(response.content)
+
+        def transient(func):
+            tracemalloc.start()
+            try:
+                result = func()
+                current, peak = tracemalloc.get_traced_memory()
+            finally:
+                tracemalloc.stop()
+            del result
+            return peak - current
+
+        codec_only = transient(lambda: codec.loads(response.content))
+        previous = transient(lambda: codec.loads(response.content.decode('utf-8')))
+        current = transient(lambda: utils.as_json(response, codec))
+
+        assert previous - codec_only >= size * 0.9
+        assert current - codec_only < size * 0.1
+
     def test_encode_view_options(self):
         """Test encoding view options."""
         options = {
@@ -172,4 +235,74 @@ class TestUtils:
         result = utils.encode_view_options(options)
         assert result['limit'] == 100
         assert result['skip'] == 0
-        assert result['group_level'] == 2
\ No newline at end of file
+        assert result['group_level'] == 2
+
+    def test_iter_json_rows_small_chunks(self):
+        """Test decoding rows split at every possible byte boundary."""
+        body = json.dumps({
+            "total_rows": 12345,
+            "offset": 0,
+            "rows": [{"id": "d\u00e9j\u00e0", "key": [1, 2.5, None], "value": {"a": "\u00fc"}},
+                     {"id": "doc2", "key": 10, "value": None}]
+        }, ensure_ascii=False).encode("utf-8")
+
+        for size in (1, 2, 3, 7, len(body)):
+            chunks = [body[i:i + size] for i in range(0, len(body), size)]
+            assert list(utils.iter_json_rows(chunks)) == json.loads(body)["rows"]
+
+    def test_iter_json_rows_empty(self):
+        """Test decoding an empty rows array."""
+        assert list(utils.iter_json_rows([b'{"total_rows": 0, "rows": [ ]}'])) == []
+
+    def test_iter_json_rows_trailing_error(self):
+        """Test an error reported after the rows is raised."""
+        from pycouchdb import exceptions
+
+        rows = utils.iter_json_rows([b'{"rows":[{"id":"doc1"}],\r\n"error":"timeout","reason":"x"}'])
+
+        assert next(rows) == {"id": "doc1"}
+        with pytest.raises(exceptions.GenericError):
+            next(rows)
+
+    def test_iter_json_rows_truncated(self):
+        """Test a truncated body raises ValueError."""
+        with pytest.raises(ValueError):
+            list(utils.iter_json_rows([b'{"rows":[{"id":"doc1"},{"id"']))
+
+    def test_collation_key_couchdb_order(self):
+        """Test values sort like the couchdb view collation example."""
+        ordered = [
+            None, False, True,
+            1, 2, 3.0, 4,
+            "a", "A", "aa", "b", "B", "ba", "bb",
+            ["a"], ["b"], ["b", "c"], ["b", "c", "a"], ["b", "d"], ["b", "d", "e"],
+            {"a": 1}, {"a": 2}, {"b": 1}, {"b": 2}, {"b": 2, "a": 1}, {"b": 2, "c": 2},
+        ]
+        shuffled = list(reversed(ordered))
+
+        assert sorted(shuffled, key=utils.collation_key) == ordered
+
+    def test_collation_key_strings(self):
+        """Test punctuation, digits, accents and case in strings."""
+        ordered = [" ", "_", "-", "!", ".", "~", "1", "10", "2", "a", "A", "á", "Á", "b"]
+
+        assert sorted(reversed(ordered), key=utils.collation_key) == ordered
+
+    def test_collate(self):
+        """Test the three way comparison."""
+        assert utils.collate(None, False) == -1
+        assert utils.collate({"a": 1}, ["a"]) == 1
+        assert utils.collate(["a", 1], ("a", 1.0)) == 0
+        with pytest.raises(TypeError):
+            utils.collation_key(object())
+
+    def test_merge_rows(self):
+        """Test sorted view rows are merged by key, then doc id."""
+        a = [{"key": None, "id": "b"}, {"key": 1, "id": "a"}, {"key": "a", "id": "c"}]
+        b = [{"key": None, "id": "a"}, {"key": "A", "id": "d"}, {"key": [1], "id": "e"}]
+
+        merged = [row["id"] for row in utils.merge_rows(a, b)]
+        assert merged == ["a", "b", "a", "c", "d", "e"]
+
+        merged = utils.merge_rows(reversed(a), reversed(b), descending=True)
+        assert [row["id"] for row in merged] == ["e", "d", "c", "a", "b", "a"]